@@ -0,0 +1,143 @@
+"""SQLite cache of report plans keyed by topic and report configuration.
+
+Set ``PLAN_CACHE_MODE`` to let repeat reports skip the ``ReportPlanner`` call:
+
+- ``off`` (default): always run the planner.
+- ``exact``: reuse a stored plan when the normalized topic (case, whitespace and
+  trailing punctuation ignored) and the ``ReportConfig`` hash match.
+- ``semantic``: additionally reuse the closest stored plan for the same report
+  configuration when the topics' embedding cosine similarity is at least
+  ``PLAN_CACHE_THRESHOLD`` (default 0.92).
+
+Plans are stored as ``Sections`` JSON in ``PLAN_CACHE_PATH`` (default
+``storage/plan_cache.sqlite``).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Callable
+from dataclasses import asdict
+from datetime import datetime
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from config import ReportConfig
+from core.schemas import Sections
+
+_DEFAULT_PLAN_CACHE_PATH = "storage/plan_cache.sqlite"
+_DEFAULT_THRESHOLD = 0.92
+
+EmbedFn = Callable[[str], list[float]]
+
+
+def normalize_topic(topic: str) -> str:
+    return re.sub(r"\s+", " ", topic).strip().strip(".?!;:").strip().lower()
+
+
+def report_config_hash(report_cfg: ReportConfig) -> str:
+    payload = json.dumps(asdict(report_cfg), sort_keys=True)
+    return sha256(payload.encode()).hexdigest()[:16]
+
+
+class PlanCache:
+    """Stored ``Sections`` per (normalized topic, report configuration)."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        embed: EmbedFn | None = None,
+        threshold: float = _DEFAULT_THRESHOLD,
+    ):
+        self.path = Path(path)
+        self.embed = embed
+        self.threshold = threshold
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_cache ("
+            "topic TEXT, config_hash TEXT, embedding BLOB, plan TEXT, "
+            "created_at TEXT, PRIMARY KEY (topic, config_hash))"
+        )
+        self._conn.commit()
+
+    def _embedding(self, topic: str) -> np.ndarray | None:
+        if self.embed is None:
+            return None
+        vector = np.asarray(self.embed(topic), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def lookup(self, topic: str, report_cfg: ReportConfig) -> Sections | None:
+        key, config_hash = normalize_topic(topic), report_config_hash(report_cfg)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT plan FROM plan_cache WHERE topic = ? AND config_hash = ?",
+                (key, config_hash),
+            ).fetchone()
+        if row is not None:
+            logger.info(f"Plan cache hit for '{key}'")
+            return Sections.model_validate_json(row[0])
+        return self._nearest(key, config_hash)
+
+    def _nearest(self, key: str, config_hash: str) -> Sections | None:
+        query = self._embedding(key)
+        if query is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT topic, embedding, plan FROM plan_cache "
+                "WHERE config_hash = ? AND embedding IS NOT NULL",
+                (config_hash,),
+            ).fetchall()
+        best_score, best = 0.0, None
+        for topic, blob, plan in rows:
+            score = float(np.dot(query, np.frombuffer(blob, dtype=np.float32)))
+            if score > best_score:
+                best_score, best = score, (topic, plan)
+        if best is None or best_score < self.threshold:
+            return None
+        logger.info(
+            f"Plan cache near-duplicate hit for '{key}': reusing '{best[0]}' "
+            f"(similarity {best_score:.3f})"
+        )
+        return Sections.model_validate_json(best[1])
+
+    def store(self, topic: str, report_cfg: ReportConfig, plan: Sections) -> None:
+        key = normalize_topic(topic)
+        embedding = self._embedding(key)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plan_cache VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    report_config_hash(report_cfg),
+                    embedding.tobytes() if embedding is not None else None,
+                    plan.model_dump_json(),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+            self._conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_plan_cache() -> PlanCache | None:
+    """Return the process-wide plan cache configured by ``PLAN_CACHE_MODE``."""
+    mode = os.environ.get("PLAN_CACHE_MODE", "off").strip().lower()
+    if mode not in ("exact", "semantic"):
+        return None
+    path = os.environ.get("PLAN_CACHE_PATH", "").strip() or _DEFAULT_PLAN_CACHE_PATH
+    embed = None
+    if mode == "semantic":
+        from rag.retrieval_builder import get_embeddings
+
+        embed = get_embeddings().embed_query
+    threshold = float(os.environ.get("PLAN_CACHE_THRESHOLD") or _DEFAULT_THRESHOLD)
+    return PlanCache(path, embed, threshold)
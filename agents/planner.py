@@ -3,13 +3,36 @@
 import asyncio
 import uuid
 
-from dspy import Predict
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
 
-from config import ReportConfig
-from core.signatures import FinalInstructions, ReportPlanner
+from agents.plan_cache import get_plan_cache
+from config import ReportConfig, config, get_dspy_lm
+from core.schemas import Sections
+from core.section_schedule import close_section_schedule, section_schedule
 from core.states import ReportState, SectionState
+from core.streaming import emit_section
+from core.tracing import emit_lm_usage
+from utils.dspy_async import apredict
+
+
+def predictor(signature: str):
+    """``dspy.Predict`` for the named signature in ``core.signatures``.
+
+    DSPy takes seconds to import and pulls in IPython, so it loads on the first
+    planner call instead of with the graph.
+    """
+    from dspy import Predict
+
+    from core import signatures
+
+    return Predict(getattr(signatures, signature))
+
+
+async def _acquire_llm_slot() -> None:
+    """Wait for the DeepSeek rate limit the chat model also draws from."""
+    if (limiter := config.rate_limiter) is not None:
+        await limiter.aacquire()
 
 
 def _extract_text(content) -> str:
@@ -35,8 +58,10 @@ def _topic_from_messages(state: ReportState) -> str:
 
 async def generate_plan(state: ReportState, config: RunnableConfig) -> dict:
     """Generate a structured research plan using DSPy's ReportPlanner."""
+    # The research budget and the run's PubMed CSV are keyed on the run id.
+    run_id = state.get("run_id") or str(uuid.uuid4())[:8]
     if state.get("sections"):
-        return {"sections": state["sections"]}
+        return {"sections": state["sections"], "run_id": run_id}
 
     report_cfg = ReportConfig.from_runnable_config(config)
 
@@ -52,15 +77,24 @@ async def generate_plan(state: ReportState, config: RunnableConfig) -> dict:
             "messages": [AIMessage(content=prompt_msg)],
         }
 
-    run_id = str(uuid.uuid4())[:8]
+    plan_cache = get_plan_cache()
+    if plan_cache is not None:
+        cached = await asyncio.to_thread(plan_cache.lookup, topic, report_cfg)
+        if cached is not None:
+            return {"sections": cached.sections, "run_id": run_id}
 
-    planner = Predict(ReportPlanner)
-    result = await asyncio.to_thread(
+    get_dspy_lm()
+    planner = predictor("ReportPlanner")
+    await _acquire_llm_slot()
+    result = await apredict(
         planner,
         topic=topic,
         context=report_cfg.context,
         report_organization=report_cfg.report_organization,
     )
+    await emit_lm_usage(result)
+    if plan_cache is not None and isinstance(result.plan, Sections):
+        await asyncio.to_thread(plan_cache.store, topic, report_cfg, result.plan)
     return {"sections": result.plan.sections, "run_id": run_id}
 
 
@@ -69,13 +103,38 @@ async def write_final_sections(state: SectionState) -> dict:
     section = state["section"]
     completed_context = state.get("completed_sections_context", "")
 
-    final_instructions = Predict(FinalInstructions)
-    result = await asyncio.to_thread(
+    get_dspy_lm()
+    final_instructions = predictor("FinalInstructions")
+    await _acquire_llm_slot()
+    result = await apredict(
         final_instructions,
         section_title=section.name,
         section_topic=section.description,
         context=completed_context,
     )
+    await emit_lm_usage(result)
     section.content = result.section_content
+    emit_section(section, "final")
 
     return {"completed_sections": [section]}
+
+
+async def write_scheduled_sections(state: SectionState) -> dict:
+    """Write a non-research section as soon as the sections it depends on are done.
+
+    The section is written from copies of those completed sections, and is then
+    recorded as completed for the sections that depend on it in turn.
+    """
+    run_id = state.get("run_id", "")
+    schedule = section_schedule(run_id)
+    try:
+        context = await schedule.dependencies_of(state["section"]) if schedule else []
+        update = await write_final_sections(
+            {**state, "completed_sections_context": context}
+        )
+    except BaseException:
+        close_section_schedule(run_id)
+        raise
+    if schedule is not None:
+        schedule.complete(state["section"])
+    return update
@@ -1,12 +1,21 @@
 """Entry point for MedReportAI.
 
-Boots the environment, constructs the LangGraph pipeline, and exposes
-``graph`` so that ``langgraph.json`` can reference ``app:graph``.
+Constructs the LangGraph pipeline and exposes ``graph`` so that
+``langgraph.json`` can reference ``app:graph``. LLM clients, DSPy and the
+retrieval models are created on first use, so importing this module stays cheap.
 """
 
+from collections.abc import AsyncIterator
+
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import END, StateGraph
-from agents.planner import generate_plan, write_final_sections
-from config import ReportConfig, config
+
+from agents.planner import (
+    generate_plan,
+    write_final_sections,
+    write_scheduled_sections,
+)
+from config import ReportConfig
 from core.nodes import (
     compile_final_report,
     gather_completed_sections,
@@ -22,9 +31,9 @@ from core.states import (
     SectionState,
     SectionStateOutput,
 )
+from core.streaming import stream_report
 from core.tool_node import tool_node, tools_condition
-
-config.initialize_dspy()
+from core.tracing import RunTrace, traced_invoke
 
 
 # Section sub-graph
@@ -51,6 +60,7 @@ _builder = StateGraph(
 _builder.add_node("generate_report_plan", generate_plan)
 _builder.add_node("build_section_with_tools", _section_builder.compile())
 _builder.add_node("gather_sections", gather_completed_sections)
+_builder.add_node("write_scheduled_sections", write_scheduled_sections)
 _builder.add_node("write_final_sections", write_final_sections)
 _builder.add_node("compile_final_report", compile_final_report)
 _builder.add_node("validate_report_quality", validate_report_quality)
@@ -60,10 +70,12 @@ _builder.add_conditional_edges(
     initiate_section_writing,
     {
         "build_section_with_tools": "build_section_with_tools",
+        "write_scheduled_sections": "write_scheduled_sections",
         "gather_sections": "gather_sections",
     },
 )
 _builder.add_edge("build_section_with_tools", "gather_sections")
+_builder.add_edge("write_scheduled_sections", "gather_sections")
 _builder.add_conditional_edges(
     "gather_sections",
     initiate_final_section_writing,
@@ -77,3 +89,24 @@ _builder.add_edge("compile_final_report", "validate_report_quality")
 _builder.set_entry_point("generate_report_plan")
 
 graph = _builder.compile()
+
+
+async def astream_report(
+    inputs: dict, config: RunnableConfig | None = None
+) -> AsyncIterator[dict]:
+    """Stream section content and synthesis tokens while a report is generated."""
+    async for event in stream_report(graph, inputs, config):
+        yield event
+
+
+async def run_report(
+    inputs: dict,
+    config: RunnableConfig | None = None,
+    *,
+    run_name: str = "report",
+) -> tuple[dict, RunTrace]:
+    """Generate a report and return it with its per-node timing and token trace.
+
+    The trace is written to ``outputs/traces`` and summarised in the log.
+    """
+    return await traced_invoke(graph, inputs, config, run_name=run_name)
@@ -1,16 +1,20 @@
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
+from typing import TYPE_CHECKING, Literal
 
-import dspy
 from dotenv import load_dotenv
-from dspy import LM, configure
+from langchain_core.rate_limiters import InMemoryRateLimiter
 from langchain_core.runnables import RunnableConfig
-from langchain_deepseek import ChatDeepSeek
 
 from prompts.planner import context, report_organization
 from utils.dspy_bootstrap import ensure_dspy_cache_dir
+from utils.llm_cache import cached_model_kwargs
+
+if TYPE_CHECKING:
+    from dspy import LM
+    from langchain_deepseek import ChatDeepSeek
 
 ensure_dspy_cache_dir()
 
@@ -22,6 +26,7 @@ class ModelConfig:
     deepseek_model: Literal["deepseek-chat", "deepseek-reasoner"] = "deepseek-chat"
     deepseek_temperature: float = 0.4
     max_tokens: int = 1200
+    requests_per_second: float | None = None
     embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
     embedding_cache_dir: str = "~/.cache/fastembed"
 
@@ -38,6 +43,35 @@ class RetrieverConfig:
     top_n: int = 5
     reranker_model: str = "Xenova/ms-marco-miniLM-L-6-v2"
     reranker_cache_dir: str = "~/.cache/fastembed"
+    report_token_budget: int | None = 6000
+    report_max_chunks_per_doc: int | None = 3
+    report_max_doc_tokens: int | None = 1500
+    chunk_near_duplicate_threshold: float | None = 0.85
+    source_near_duplicate_threshold: float | None = 0.7
+
+
+@dataclass
+class ResearchConfig:
+    """Configuration for the section research loop.
+
+    Round, token and deadline limits are shared by all research sections of a
+    report (see ``core.budget``); ``None`` leaves that limit off. The request
+    rates throttle the Tavily and PubMed tools across every report in the
+    process.
+    """
+
+    context_token_budget: int = 12000
+    rounds_per_section: int = 4
+    max_rounds_per_section: int = 4
+    min_rounds_before_verification: int = 3
+    total_round_budget: int | None = None
+    token_budget: int | None = None
+    deadline_seconds: float | None = None
+    scratchpad_read_top_k: int = 5
+    scratchpad_read_token_budget: int = 2000
+    web_extract_tokens_per_source: int | None = 600
+    web_search_requests_per_second: float | None = None
+    pubmed_requests_per_second: float | None = None
 
 
 @dataclass
@@ -66,28 +100,69 @@ class AppConfig:
         # Initialize sub-configs
         self.model = ModelConfig()
         self.retriever = RetrieverConfig()
+        self.research = ResearchConfig()
         self.paths = PathConfig()
 
         # API keys
         self.deepseek_api_key = os.getenv("DEEPSEEK_API_KEY")
 
-    def initialize_llm(self) -> ChatDeepSeek:
+        self._rate_limiters: dict[str, InMemoryRateLimiter] = {}
+
+    def _shared_limiter(
+        self, provider: str, requests_per_second: float | None
+    ) -> InMemoryRateLimiter | None:
+        if requests_per_second is None:
+            return None
+        if provider not in self._rate_limiters:
+            self._rate_limiters[provider] = InMemoryRateLimiter(
+                requests_per_second=requests_per_second
+            )
+        return self._rate_limiters[provider]
+
+    @property
+    def rate_limiter(self) -> InMemoryRateLimiter | None:
+        """Shared DeepSeek rate limiter for the chat model and DSPy, or None."""
+        return self._shared_limiter("deepseek", self.model.requests_per_second)
+
+    @property
+    def web_search_rate_limiter(self) -> InMemoryRateLimiter | None:
+        """Shared Tavily rate limiter, or None when searches are unthrottled."""
+        return self._shared_limiter(
+            "tavily", self.research.web_search_requests_per_second
+        )
+
+    @property
+    def pubmed_rate_limiter(self) -> InMemoryRateLimiter | None:
+        """Shared NCBI Entrez rate limiter, or None when queries are unthrottled."""
+        return self._shared_limiter("pubmed", self.research.pubmed_requests_per_second)
+
+    def initialize_llm(self) -> "ChatDeepSeek":
         """Initialize the main LLM."""
+        from langchain_deepseek import ChatDeepSeek
+
         return ChatDeepSeek(
             model=self.model.deepseek_model,
             temperature=self.model.deepseek_temperature,
             max_tokens=self.model.max_tokens,
+            rate_limiter=self.rate_limiter,
+            stream_usage=True,
+            **cached_model_kwargs(),
         )
 
-    def initialize_dspy(self):
+    def initialize_dspy(self) -> "LM":
         """Initialize DSPy configuration."""
-        dspy_lm = LM(
+        import dspy
+
+        if dspy.settings.lm is not None:
+            # Already configured by the caller (e.g. a notebook or a test).
+            return dspy.settings.lm
+        dspy_lm = dspy.LM(
             "deepseek/deepseek-chat",
             api_key=self.deepseek_api_key,
             base_url="https://api.deepseek.com",
         )
-        configure(lm=dspy_lm)
-        dspy.settings.configure(track_usage=True)
+        # One call: DSPy only lets the owning thread or task configure it.
+        dspy.configure(lm=dspy_lm, track_usage=True)
         return dspy_lm
 
 
@@ -115,3 +190,9 @@ class ReportConfig:
 
 # Global config instance
 config = AppConfig()
+
+
+@lru_cache(maxsize=1)
+def get_dspy_lm() -> "LM":
+    """Configure DSPy on first use rather than when the graph is imported."""
+    return config.initialize_dspy()
@@ -0,0 +1,134 @@
+"""Report-level research budget shared by parallel section workers.
+
+Every research section used to get a fixed number of LLM+tool rounds. Instead,
+``initiate_section_writing`` opens one ``ResearchBudget`` per run that holds the
+report's total research rounds, an optional token budget and an optional
+wall-clock deadline. Each ``write_sections`` turn asks the budget whether to keep
+researching:
+
+- a section whose scratchpad passes ``verify_scratchpad`` stops immediately and
+  releases the rounds it did not use;
+- a section that reaches its allotment while still failing verification may
+  borrow released rounds, up to ``max_rounds_per_section``;
+- once the token budget or deadline is spent, every section synthesises with
+  what it has.
+
+Workers of one run share the event loop, so the budget lives in a process-level
+registry keyed by ``run_id`` rather than in graph state. ``gather_completed_sections``
+closes it, and ``write_sections`` closes it if a round raises, so a failed run
+does not leave its budget behind.
+"""
+
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+
+from config import ResearchConfig
+from core.verification import VerificationResult
+
+
+@dataclass
+class BudgetDecision:
+    synthesize: bool
+    reason: str
+
+
+class ResearchBudget:
+    """Research rounds, tokens and wall-clock time shared across sections."""
+
+    def __init__(self, section_names: list[str], cfg: ResearchConfig):
+        self.cfg = cfg
+        sections = max(1, len(section_names))
+        self.total_rounds = cfg.total_round_budget or cfg.rounds_per_section * sections
+        self.allotment = max(
+            1, min(cfg.rounds_per_section, self.total_rounds // sections)
+        )
+        self.deadline = (
+            time.monotonic() + cfg.deadline_seconds if cfg.deadline_seconds else None
+        )
+        self.tokens_used = 0
+        self.rounds: dict[str, int] = {name: 0 for name in section_names}
+        self.finished: set[str] = set()
+        self.stopped_early: set[str] = set()
+
+    def _committed_rounds(self) -> int:
+        return sum(
+            used if name in self.finished else max(used, self.allotment)
+            for name, used in self.rounds.items()
+        )
+
+    @property
+    def spare_rounds(self) -> int:
+        return max(0, self.total_rounds - self._committed_rounds())
+
+    def _out_of_time_or_tokens(self) -> str | None:
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return "research deadline reached"
+        if self.cfg.token_budget and self.tokens_used >= self.cfg.token_budget:
+            return "research token budget spent"
+        return None
+
+    def next_step(
+        self, section: str, rounds: int, verification: VerificationResult | None
+    ) -> BudgetDecision:
+        """Decide whether ``section`` researches another round or synthesises."""
+        self.rounds[section] = max(rounds, self.rounds.get(section, 0))
+        if verification is not None and verification.passed:
+            if rounds < self.allotment:
+                self.stopped_early.add(section)
+            return BudgetDecision(True, "verification passed")
+        if reason := self._out_of_time_or_tokens():
+            return BudgetDecision(True, reason)
+        if rounds < self.allotment:
+            return BudgetDecision(False, f"round {rounds + 1} of {self.allotment}")
+        if rounds < self.cfg.max_rounds_per_section and self.spare_rounds > 0:
+            # Claim one spare round; it is counted as used from now on.
+            self.rounds[section] = rounds + 1
+            return BudgetDecision(False, f"borrowed round {rounds + 1}")
+        return BudgetDecision(True, "research rounds exhausted")
+
+    def record_usage(self, message) -> None:
+        usage = getattr(message, "usage_metadata", None) or {}
+        self.tokens_used += int(usage.get("total_tokens") or 0)
+
+    def finish(self, section: str) -> None:
+        self.finished.add(section)
+
+    def summary(self) -> str:
+        used = sum(self.rounds.values())
+        return (
+            f"{used}/{self.total_rounds} research rounds, {self.tokens_used} tokens, "
+            f"{len(self.stopped_early)} of {len(self.rounds)} sections stopped early"
+        )
+
+
+_budgets: dict[str, ResearchBudget] = {}
+
+
+def open_research_budget(
+    run_id: str, section_names: list[str], cfg: ResearchConfig
+) -> ResearchBudget:
+    budget = ResearchBudget(section_names, cfg)
+    if run_id:
+        _budgets[run_id] = budget
+    return budget
+
+
+def research_budget(run_id: str, cfg: ResearchConfig) -> ResearchBudget:
+    """Return the run's budget, opening a single-section one on first use.
+
+    A section graph run on its own has no report budget; the one opened here is
+    kept under ``run_id`` so its rounds, tokens and deadline carry across rounds.
+    """
+    budget = _budgets.get(run_id)
+    if budget is None:
+        budget = open_research_budget(run_id, [], cfg)
+    return budget
+
+
+def close_research_budget(run_id: str) -> ResearchBudget | None:
+    budget = _budgets.pop(run_id, None)
+    if budget is not None:
+        logger.info(f"Research budget for run {run_id}: {budget.summary()}")
+    return budget
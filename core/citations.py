@@ -0,0 +1,77 @@
+"""Indexed citation registry: URL -> citation number with O(1) numbering.
+
+Section workers and the report-level reducer keep a mapping from normalized
+source URL to its ``[N]`` citation number. Numbering the next URL used to take
+``max(registry.values()) + 1``, so registering or merging n sources cost O(n²).
+``CitationRegistry`` is still a ``dict[str, int]`` (prompts, JSON and checkpoints
+see a plain mapping) but also tracks the next free number and a number -> URL
+index. Checkpoint round-trips hand back plain dicts, so callers wrap incoming
+state with ``CitationRegistry.of``.
+"""
+
+import sys
+from collections.abc import Iterable, Mapping
+
+
+class CitationRegistry(dict[str, int]):
+    """Mapping of normalized URL to citation number, with a reverse index."""
+
+    def __init__(self, entries: Mapping[str, int] | None = None):
+        super().__init__()
+        self._by_number: dict[int, str] = {}
+        self._next = 1
+        for url, number in (entries or {}).items():
+            self[url] = number
+
+    @classmethod
+    def of(cls, registry: Mapping[str, int] | None) -> "CitationRegistry":
+        """Return ``registry`` itself if already indexed, else an indexed copy."""
+        if isinstance(registry, cls):
+            return registry
+        return cls(registry)
+
+    def __setitem__(self, url: str, number: int) -> None:
+        previous = self.get(url)
+        if previous is not None and self._by_number.get(previous) == url:
+            del self._by_number[previous]
+        super().__setitem__(sys.intern(url), number)
+        self._by_number[number] = url
+        self._next = max(self._next, number + 1)
+
+    @property
+    def next_number(self) -> int:
+        return self._next
+
+    def register(self, url: str) -> int:
+        """Return ``url``'s number, assigning the next free one if it is new."""
+        number = self.get(url)
+        if number is None:
+            number = self._next
+            self[url] = number
+        return number
+
+    def register_all(self, urls: Iterable[str]) -> "CitationRegistry":
+        for url in urls:
+            self.register(url)
+        return self
+
+    def url_for(self, number: int) -> str | None:
+        return self._by_number.get(number)
+
+    def copy(self) -> "CitationRegistry":
+        return CitationRegistry(self)
+
+    def __reduce__(self):
+        # Rebuild through __init__ so copies and pickles get the indexes too.
+        return CitationRegistry, (dict(self),)
+
+    def merge(self, other: Mapping[str, int] | None) -> "CitationRegistry":
+        """Numbers from ``self`` win; URLs only in ``other`` are numbered after them.
+
+        ``other``'s own numbers are ignored because parallel workers number their
+        URLs independently. Returns ``self`` unchanged when ``other`` adds nothing.
+        """
+        new_urls = [url for url in other or () if url not in self]
+        if not new_urls:
+            return self
+        return self.copy().register_all(new_urls)
@@ -0,0 +1,103 @@
+"""Context compaction for the section research loop.
+
+Every research round re-sends the whole conversation, including multi-KB tool
+outputs whose evidence the agent has already copied into the scratchpad. Before
+each round the request is compacted: once a ``WriteToScratchpad`` call follows a
+tool output, that output (and the write's echoed notes) is replaced with a short
+stub, oldest first, until the request fits the per-round token budget. The full
+history stays in graph state; only the outgoing request is compacted.
+"""
+
+from dataclasses import dataclass
+
+from langchain_core.messages import AIMessage, BaseMessage, ToolMessage
+
+from utils.helpers import content_to_text
+from utils.tokens import count_message_tokens, estimate_tokens
+
+_SCRATCHPAD_WRITE = "WriteToScratchpad"
+_EXTERNAL_STUB = (
+    "[Compacted {name} output ({tokens} tokens). Its evidence is already in the "
+    "scratchpad; use ReadFromScratchpad to review it.]"
+)
+_WRITE_STUB = "[Compacted scratchpad write ({tokens} tokens).]"
+
+
+@dataclass
+class CompactionStats:
+    before_tokens: int
+    after_tokens: int
+    stubbed: int
+
+    @property
+    def saved_tokens(self) -> int:
+        return self.before_tokens - self.after_tokens
+
+
+def _tool_names_by_call_id(messages: list[BaseMessage]) -> dict[str, str]:
+    names: dict[str, str] = {}
+    for message in messages:
+        for call in getattr(message, "tool_calls", None) or []:
+            names[str(call.get("id", ""))] = str(call.get("name", ""))
+    return names
+
+
+def _last_write_index(messages: list[BaseMessage]) -> int:
+    for index in range(len(messages) - 1, -1, -1):
+        calls = getattr(messages[index], "tool_calls", None) or []
+        if any(call.get("name") == _SCRATCHPAD_WRITE for call in calls):
+            return index
+    return -1
+
+
+def _stub_tool_message(message: ToolMessage, name: str) -> ToolMessage:
+    tokens = estimate_tokens(content_to_text(message.content))
+    template = _WRITE_STUB if name == _SCRATCHPAD_WRITE else _EXTERNAL_STUB
+    return message.model_copy(
+        update={"content": template.format(name=name, tokens=tokens)}
+    )
+
+
+def _stub_write_args(message: AIMessage) -> AIMessage:
+    tool_calls = []
+    for call in message.tool_calls:
+        if call.get("name") == _SCRATCHPAD_WRITE:
+            notes = str(call.get("args", {}).get("notes", ""))
+            args = {**call["args"], "notes": f"[{estimate_tokens(notes)} tokens]"}
+            call = {**call, "args": args}
+        tool_calls.append(call)
+    return message.model_copy(update={"tool_calls": tool_calls})
+
+
+def compact_messages(
+    messages: list[BaseMessage], token_budget: int
+) -> tuple[list[BaseMessage], CompactionStats]:
+    """Stub scratchpad-captured tool outputs until ``messages`` fit the budget."""
+    compacted = list(messages)
+    before = after = count_message_tokens(compacted)
+    stubbed = 0
+    last_write = _last_write_index(compacted)
+    if after <= token_budget or last_write < 0:
+        return compacted, CompactionStats(before, after, stubbed)
+
+    names = _tool_names_by_call_id(compacted)
+    for index in range(last_write):
+        if after <= token_budget:
+            break
+        message = compacted[index]
+        if isinstance(message, ToolMessage):
+            replacement = _stub_tool_message(
+                message, names.get(message.tool_call_id, "tool")
+            )
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            replacement = _stub_write_args(message)
+        else:
+            continue
+        saved = count_message_tokens([message]) - count_message_tokens([replacement])
+        if saved <= 0:
+            continue
+        compacted[index] = replacement
+        after -= saved
+        stubbed += 1
+
+    return compacted, CompactionStats(before, after, stubbed)
@@ -4,34 +4,76 @@ All infrastructure concerns (tool dispatch, scratchpad I/O) live in core.tool_no
 These nodes focus purely on LLM orchestration logic.
 """
 
+import asyncio
 from datetime import datetime
+from functools import lru_cache
 
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langgraph.types import Send
 from loguru import logger
 
 from config import config
+from core.budget import (
+    ResearchBudget,
+    close_research_budget,
+    open_research_budget,
+    research_budget,
+)
+from core.compaction import compact_messages
 from core.quality import (
     build_references_block,
     enforce_source_linkage,
     register_sources_in_citation_registry,
     validate_report_sections,
 )
+from core.section_cache import CachedSection, SectionCache, get_section_cache
+from core.section_schedule import (
+    close_section_schedule,
+    open_section_schedule,
+    schedulable_sections,
+    section_schedule,
+)
 from core.states import ReportState, SectionState
-from core.tool_node import SECTION_TOOLS, save_scratchpad_async
-from core.verification import build_conservative_instruction, verify_scratchpad
+from core.streaming import emit_section, synthesis_config
+from core.tool_node import (
+    SECTION_TOOLS,
+    append_scratchpad_async,
+    near_duplicate_key,
+)
+from core.verification import (
+    ScratchpadStats,
+    VerificationResult,
+    build_conservative_instruction,
+    scratchpad_stats,
+)
 from prompts.section_writer import (
     get_initial_prompt,
     get_synthesis_prompt,
     section_writer_prompt,
 )
 from utils.helpers import content_to_text
+from utils.near_dedup import close_near_duplicate_scope
+from utils.scratchpad_helpers import SCRATCHPAD_RESET, new_entry, render_scratchpad
+
+MIN_SCRATCHPAD_FOR_VERIFICATION = 100
+MAX_SYNTHESIS_CONTINUATIONS = 2
 
-_llm = config.initialize_llm()
-_llm_with_tools = _llm.bind_tools(SECTION_TOOLS)
+_CONTINUATION_PROMPT = (
+    "Your previous reply was cut off by the output length limit. Continue the "
+    "section exactly where it stopped. Do not repeat earlier text, do not restart "
+    "the heading, and finish with a complete sentence."
+)
 
-MAX_RESEARCH_ROUNDS = 4
-MIN_SCRATCHPAD_FOR_EARLY_SYNTHESIS = 100
+
+@lru_cache(maxsize=1)
+def get_llm():
+    """Chat model shared by every section, created on first use."""
+    return config.initialize_llm()
+
+
+@lru_cache(maxsize=1)
+def get_llm_with_tools():
+    return get_llm().bind_tools(SECTION_TOOLS)
 
 
 # Section sub-graph node
@@ -42,52 +84,120 @@ def _default_scratchpad_file(section) -> str:
     return f"scratchpad_{slug}_{datetime.now():%Y%m%d_%H%M%S}.md"
 
 
-def _should_synthesize(tool_rounds: int, scratchpad_len: int) -> bool:
-    return tool_rounds >= MAX_RESEARCH_ROUNDS or (
-        scratchpad_len > MIN_SCRATCHPAD_FOR_EARLY_SYNTHESIS and tool_rounds >= 3
+def _gap_note(failures: list[str]) -> HumanMessage:
+    return HumanMessage(
+        content="The following quality criteria were not yet met:\n"
+        + "\n".join(f"- {f}" for f in failures)
+        + "\nContinue researching to address these gaps."
     )
 
 
-async def _handle_verification_gap(
-    section,
-    scratchpad,
-    messages,
-    scratchpad_file,
-    sources,
-    tool_messages,
-    citation_registry,
-    tool_rounds,
-):
-    """Verify scratchpad and decide next phase."""
-    verification = verify_scratchpad(scratchpad)
-    if not verification.passed and tool_rounds < MAX_RESEARCH_ROUNDS:
-        logger.info(
-            f"Section '{section.name}': verification failed, returning to research. "
-            f"Failures: {verification.failures}"
-        )
-        gap_note = (
-            "The following quality criteria were not yet met:\n"
-            + "\n".join(f"- {f}" for f in verification.failures)
-            + "\nContinue researching to address these gaps."
-        )
+def _verify_if_due(
+    tool_rounds: int, stats: ScratchpadStats
+) -> VerificationResult | None:
+    if (
+        tool_rounds < config.research.min_rounds_before_verification
+        or stats.length <= MIN_SCRATCHPAD_FOR_VERIFICATION
+    ):
+        return None
+    return stats.verify()
+
+
+async def write_sections(state: SectionState) -> dict:
+    """Two-phase (research -> synthesis) section writer node.
+
+    The run's ``ResearchBudget`` decides each turn whether the section keeps
+    researching or moves to synthesis. A completed section is recorded in the
+    run's ``SectionSchedule`` for the sections that depend on it, and its tool
+    calls' near-duplicate index is dropped. A round that raises closes the
+    budget, schedule and index so a failed run does not leave them behind.
+    """
+    scratchpad_file = state.get("scratchpad_file", "") or _default_scratchpad_file(
+        state["section"]
+    )
+    # Outside a report run the section's scratchpad file identifies its budget.
+    run_id = state.get("run_id") or scratchpad_file
+    try:
+        update = await _write_section_round(state, scratchpad_file, run_id)
+    except BaseException:
+        close_research_budget(run_id)
+        close_section_schedule(run_id)
+        close_near_duplicate_scope(near_duplicate_key(state))
+        raise
+    if "completed_sections" in update:
+        close_near_duplicate_scope(near_duplicate_key(state))
+        if (schedule := section_schedule(run_id)) is not None:
+            for section in update["completed_sections"]:
+                schedule.complete(section)
+        if not state.get("run_id"):
+            close_research_budget(run_id)
+    return update
+
+
+async def _write_section_round(
+    state: SectionState, scratchpad_file: str, run_id: str
+) -> dict:
+    messages = state.get("messages", [])
+    section = state["section"]
+    scratchpad = state.get("scratchpad", [])
+    # Kept up to date by the tool node, so the gate does not re-scan the scratchpad.
+    stats = scratchpad_stats(scratchpad, state.get("scratchpad_stats"))
+    sources = state.get("sources", [])
+    citation_registry = state.get("citation_registry", {}) or {}
+
+    tool_rounds = len([m for m in messages if getattr(m, "tool_calls", None)])
+    tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
+
+    seeded = None
+    if not messages and (cache := get_section_cache()) is not None:
+        cached = await asyncio.to_thread(cache.lookup, section)
+        if cached is not None and cached.reusable:
+            return _reuse_cached_section(cache, section, cached, scratchpad_file)
+        if cached is not None:
+            seeded = cached
+            scratchpad = [new_entry(cached.scratchpad)]
+            sources = list(cached.sources)
+            stats = ScratchpadStats.of(cached.scratchpad)
+
+    budget = research_budget(run_id, config.research)
+    verification = _verify_if_due(tool_rounds, stats)
+    decision = budget.next_step(section.name, tool_rounds, verification)
+
+    logger.info(
+        f"Section '{section.name}': round {tool_rounds}, "
+        f"{len(tool_messages)} tool results, scratchpad {stats.length} chars, "
+        f"{state.get('context_tokens_saved', 0)} prompt tokens saved by compaction "
+        f"-> {'synthesis' if decision.synthesize else 'research'} ({decision.reason})"
+    )
+
+    if not decision.synthesize:
+        if verification is not None and not verification.passed:
+            logger.info(
+                f"Section '{section.name}': verification failed, continuing research. "
+                f"Failures: {verification.failures}"
+            )
+            messages = messages + [_gap_note(verification.failures)]
+        if seeded is not None:
+            return await _seeded_research_phase(
+                section, seeded, scratchpad_file, budget
+            )
         return await _research_phase(
-            section,
-            messages + [HumanMessage(content=gap_note)],
-            scratchpad_file,
-            sources,
+            section, messages, scratchpad_file, sources, budget
         )
 
     research_context_prefix = ""
+    verification = verification or stats.verify()
     if not verification.passed:
         logger.warning(
-            f"Section '{section.name}': verification failed but no rounds remain. "
+            f"Section '{section.name}': verification failed and {decision.reason}. "
             f"Proceeding with conservative synthesis."
         )
         research_context_prefix = build_conservative_instruction(verification.failures)
 
+    budget.finish(section.name)
     return await _synthesis_phase(
         section,
-        scratchpad,
+        render_scratchpad(scratchpad),
         tool_messages,
         scratchpad_file,
         sources,
@@ -96,41 +206,56 @@ async def _handle_verification_gap(
     )
 
 
-async def write_sections(state: SectionState) -> dict:
-    """Two-phase (research -> synthesis) section writer node."""
-    messages = state.get("messages", [])
-    section = state["section"]
-    scratchpad = state.get("scratchpad", "")
-    scratchpad_file = state.get("scratchpad_file", "") or _default_scratchpad_file(
-        section
-    )
-    sources = state.get("sources", [])
-    citation_registry = state.get("citation_registry", {}) or {}
+def _reuse_cached_section(
+    cache: SectionCache, section, cached: CachedSection, scratchpad_file: str
+) -> dict:
+    """End the section sub-graph with a cached section instead of researching."""
+    reused, citation_registry = cache.reuse(section, cached)
+    emit_section(reused, "cache")
+    return {
+        # A final AI reply without tool calls routes the sub-graph to END.
+        "messages": [AIMessage(content=reused.content)],
+        "completed_sections": [reused],
+        "scratchpad_file": scratchpad_file,
+        "sources": reused.sources,
+        "citation_registry": citation_registry,
+    }
 
-    tool_rounds = len([m for m in messages if getattr(m, "tool_calls", None)])
-    tool_messages = [m for m in messages if isinstance(m, ToolMessage)]
 
-    logger.info(
-        f"Section '{section.name}': round {tool_rounds}, "
-        f"{len(tool_messages)} tool results, scratchpad {len(scratchpad)} chars"
+async def _seeded_research_phase(
+    section, cached: CachedSection, scratchpad_file: str, budget: ResearchBudget
+) -> dict:
+    """Start research from a related cached section's notes and sources."""
+    messages = [
+        SystemMessage(content=section_writer_prompt),
+        HumanMessage(content=get_initial_prompt(section)),
+        HumanMessage(
+            content=(
+                f"Your scratchpad already holds research notes from a closely "
+                f"related section ('{cached.section.name}'). Read them first and "
+                "only research what they do not cover for this section."
+            )
+        ),
+    ]
+    update = await _research_phase(
+        section, messages, scratchpad_file, list(cached.sources), budget
     )
-
-    if _should_synthesize(tool_rounds, len(scratchpad)):
-        return await _handle_verification_gap(
-            section,
-            scratchpad,
-            messages,
-            scratchpad_file,
-            sources,
-            tool_messages,
-            citation_registry,
-            tool_rounds,
-        )
-    return await _research_phase(section, messages, scratchpad_file, sources)
+    delta = [SCRATCHPAD_RESET, new_entry(cached.scratchpad)]
+    await append_scratchpad_async(delta, False, scratchpad_file)
+    return {
+        **update,
+        "scratchpad": delta,
+        "scratchpad_stats": ScratchpadStats.of(cached.scratchpad),
+        "sources": cached.sources,
+    }
 
 
 async def _research_phase(
-    section, messages: list, scratchpad_file: str, sources: list[dict[str, str]]
+    section,
+    messages: list,
+    scratchpad_file: str,
+    sources: list[dict[str, str]],
+    budget: ResearchBudget | None = None,
 ) -> dict:
     """Phase 1: gather information via tool calls."""
     if not messages:
@@ -139,17 +264,29 @@ async def _research_phase(
             HumanMessage(content=get_initial_prompt(section)),
         ]
 
-    response = await _llm_with_tools.ainvoke(messages)
+    request, stats = compact_messages(messages, config.research.context_token_budget)
+    if stats.stubbed:
+        logger.info(
+            f"Section '{section.name}': compacted request {stats.before_tokens} -> "
+            f"{stats.after_tokens} tokens ({stats.stubbed} messages stubbed)"
+        )
+    response = await get_llm_with_tools().ainvoke(request)
+    if budget is not None:
+        budget.record_usage(response)
+    update = {
+        "messages": messages + [response],
+        "scratchpad_file": scratchpad_file,
+        "context_tokens_saved": stats.saved_tokens,
+    }
 
     if not getattr(response, "tool_calls", None):
         section.content = response.content
-        return {
-            "messages": messages + [response],
-            "completed_sections": [section],
-            "scratchpad_file": scratchpad_file,
-        }
+        if budget is not None:
+            budget.finish(section.name)
+        emit_section(section, "research")
+        update["completed_sections"] = [section]
 
-    return {"messages": messages + [response], "scratchpad_file": scratchpad_file}
+    return update
 
 
 async def _synthesis_phase(
@@ -186,6 +323,7 @@ async def _synthesis_phase(
             "Please rerun research with a more specific query or broader date range."
         )
         section.sources = sources
+        emit_section(section, "synthesis")
         return {
             "completed_sections": [section],
             "scratchpad_file": scratchpad_file,
@@ -206,14 +344,18 @@ async def _synthesis_phase(
             )
         ),
     ]
-    response = await _llm.ainvoke(phase2_messages)
+    response = await _stream_synthesis(section, phase2_messages)
     section.content = enforce_source_linkage(
         content_to_text(response.content), sources, citation_registry
     )
     section.sources = sources
+    emit_section(section, "synthesis")
 
-    if scratchpad:
-        await save_scratchpad_async(scratchpad, scratchpad_file)
+    if not research_context_prefix and (cache := get_section_cache()) is not None:
+        # Only sections that passed verification are worth reusing elsewhere.
+        await asyncio.to_thread(
+            cache.store, section, research_context, citation_registry
+        )
 
     return {
         "messages": phase2_messages + [response],
@@ -223,6 +365,53 @@ async def _synthesis_phase(
     }
 
 
+def _hit_token_cap(message) -> bool:
+    if (message.response_metadata or {}).get("finish_reason") == "length":
+        return True
+    usage = getattr(message, "usage_metadata", None) or {}
+    return usage.get("output_tokens", 0) >= config.model.max_tokens
+
+
+async def _stream_synthesis(section, messages: list) -> AIMessage:
+    """Stream the synthesis reply, requesting continuations when it is truncated.
+
+    Each streamed reply is checked for ``finish_reason == "length"`` as soon as it
+    ends, so a section cut off by ``max_tokens`` is continued immediately rather
+    than being flagged by ``detect_truncation`` after the report is compiled.
+    """
+    parts: list[str] = []
+    request = list(messages)
+    for attempt in range(MAX_SYNTHESIS_CONTINUATIONS + 1):
+        reply = None
+        async for chunk in get_llm().astream(
+            request, config=synthesis_config(section.name)
+        ):
+            reply = chunk if reply is None else reply + chunk
+        if reply is None:
+            break
+
+        text = content_to_text(reply.content)
+        parts.append(text)
+        if not _hit_token_cap(reply):
+            break
+        if attempt == MAX_SYNTHESIS_CONTINUATIONS:
+            logger.warning(
+                f"Section '{section.name}': synthesis still truncated after "
+                f"{MAX_SYNTHESIS_CONTINUATIONS} continuations"
+            )
+            break
+        logger.info(
+            f"Section '{section.name}': synthesis hit the token cap, "
+            f"requesting continuation {attempt + 1}"
+        )
+        request = request + [
+            AIMessage(content=text),
+            HumanMessage(content=_CONTINUATION_PROMPT),
+        ]
+
+    return AIMessage(content="".join(parts))
+
+
 # Top-level report graph nodes
 
 
@@ -233,7 +422,7 @@ def _fan_out(node: str, sections: list, extra_state: dict) -> list[Send]:
             {
                 "section": s,
                 "messages": [],
-                "scratchpad": "",
+                "scratchpad": [],
                 "scratchpad_file": "",
                 "active_csv_path": "",
                 "sources": [],
@@ -246,19 +435,33 @@ def _fan_out(node: str, sections: list, extra_state: dict) -> list[Send]:
 
 
 def initiate_section_writing(state: ReportState) -> list[Send] | str:
-    """Fan out research-intensive sections to parallel workers via Send."""
+    """Fan out research sections, and non-research sections that can start, via Send.
+
+    Non-research sections run alongside the research workers and each waits only
+    for the sections it depends on (see ``core.section_schedule``).
+    """
     sections = [s for s in state["sections"] if s.research]
-    extra = {"run_id": state.get("run_id", "")}
-    return _fan_out("build_section_with_tools", sections, extra) or "gather_sections"
+    run_id = state.get("run_id", "")
+    if sections:
+        open_research_budget(run_id, [s.name for s in sections], config.research)
+    open_section_schedule(run_id, state["sections"])
+    extra = {"run_id": run_id}
+    sends = _fan_out("build_section_with_tools", sections, extra) + _fan_out(
+        "write_scheduled_sections", schedulable_sections(state["sections"]), extra
+    )
+    return sends or "gather_sections"
 
 
 def gather_completed_sections(state: ReportState) -> dict:
+    close_research_budget(state.get("run_id", ""))
+    close_section_schedule(state.get("run_id", ""))
     return {"completed_sections_context": state.get("completed_sections", [])}
 
 
 def initiate_final_section_writing(state: ReportState) -> list[Send] | str:
-    """Fan out non-research sections to write_final_sections via Send."""
-    sections = [s for s in state["sections"] if not s.research]
+    """Fan out the remaining non-research sections to write_final_sections."""
+    done = {s.name for s in state.get("completed_sections", [])}
+    sections = [s for s in state["sections"] if not s.research and s.name not in done]
     ctx = {
         "completed_sections_context": state["completed_sections_context"],
         "run_id": state.get("run_id", ""),
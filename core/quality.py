@@ -3,55 +3,36 @@
 from __future__ import annotations
 
 import re
+from collections.abc import Iterable
 from typing import Any
 from urllib.parse import urlparse
 
+from core.citations import CitationRegistry
+
 NUMBERED_CITATION_PATTERN = re.compile(r"\[\d+\]")
 URL_PATTERN = re.compile(r"https?://[^\s)\]>]+")
-RETRIEVER_SOURCE_PATTERN = re.compile(
-    r"##\s*\d+\.\s*(?P<title>[^\n]+)\n"
-    r"\*\*Authors:\*\*\s*(?P<authors>[^\n]+).*?\n"
-    r"\*\*URL:\*\*\s*(?P<url>https?://[^\s)\]>]+)",
-    re.DOTALL,
-)
-PUBMED_ROW_PATTERN = re.compile(
-    r"-\s+\*\*(?P<title>.+?)\*\*\s*\([^\n]*\)\s*\n\s*-\s*(?P<url>https?://[^\s)\]>]+)",
-    re.DOTALL,
-)
-WEB_SOURCE_PATTERN = re.compile(
-    r"Source\s+\d+:\s*(?P<title>[^\n]+)\nURL:\s*(?P<url>https?://[^\s)\]>]+)",
-)
-WEB_SOURCE_MD_PATTERN = re.compile(
-    r"##\s*Source\s+\d+:\s*(?P<title>[^\n]+)\n\*\*URL:\*\*\s*(?P<url>https?://[^\s)\]>]+)",
-)
-
 # Keep legacy pattern available for backwards compatibility in quality checks
 SOURCE_CITATION_PATTERN = NUMBERED_CITATION_PATTERN
 
-_INVALID_URL_PATTERNS = [
-    re.compile(p)
-    for p in [
-        r"\.svg$",
-        r"\.png$",
-        r"\.jpg$",
-        r"\.jpeg$",
-        r"\.gif$",
-        r"\.ico$",
-        r"\.css$",
-        r"\.js$",
-        r"\.woff",
-        r"\.ttf$",
-        r"/favicon",
-        r"/icon",
-        r"/logo",
-        r"cdn\.",
-        r"static\.",
-        r"assets\.",
-        r"fonts\.googleapis",
-        r"maxcdn\.",
-        r"cloudflare",
-    ]
-]
+# Layout lines that carry metadata for the URL line that follows them:
+#   web (plain):    "Source N: <title>" / "URL: <url>"
+#   web (markdown): "## Source N: <title>" / "**URL:** <url>"
+#   retriever:      "## N. <title>" / "**Authors:** <authors>" / ... / "**URL:** <url>"
+#   PubMed rows:    "- **<title>** (<journal>, <date>)" / "  - <url>"
+_WEB_HEADER_PATTERN = re.compile(r"(?:##\s*)?Source\s+\d+:\s*(?P<title>.+)")
+_DOC_HEADER_PATTERN = re.compile(r"##\s*\d+\.\s*(?P<title>.+)")
+_AUTHORS_PATTERN = re.compile(r"\*\*Authors:\*\*\s*(?P<authors>.+)")
+_ROW_PATTERN = re.compile(r"-\s+\*\*(?P<title>.+?)\*\*\s*\([^\n]*\)\s*$")
+_MAX_DOC_FIELD_LINES = 8
+
+_INVALID_URL_PATTERN = re.compile(
+    r"\.(?:svg|png|jpe?g|gif|ico|css|js|ttf)$"
+    r"|\.woff|/favicon|/icon|/logo"
+    r"|cdn\.|static\.|assets\.|fonts\.googleapis|maxcdn\.|cloudflare"
+)
+_PUBMED_ID_PATTERN = re.compile(
+    r"(?:pubmed\.ncbi\.nlm\.nih\.gov/|ncbi\.nlm\.nih\.gov/pubmed/)(\d+)"
+)
 
 
 def is_valid_source_url(url: str) -> bool:
@@ -59,20 +40,12 @@ def is_valid_source_url(url: str) -> bool:
     link."""
     if not url or not url.startswith("http"):
         return False
-    lower = url.lower()
-    for pattern in _INVALID_URL_PATTERNS:
-        if pattern.search(lower):
-            return False
-    return True
+    return _INVALID_URL_PATTERN.search(url.lower()) is None
 
 
 def normalize_pubmed_url(url: str) -> str:
     """Normalize PubMed URLs to canonical form to deduplicate by PMID."""
-    match = re.search(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)", url)
-    if match:
-        return f"https://pubmed.ncbi.nlm.nih.gov/{match.group(1)}/"
-    match = re.search(r"ncbi\.nlm\.nih\.gov/pubmed/(\d+)", url)
-    if match:
+    if match := _PUBMED_ID_PATTERN.search(url):
         return f"https://pubmed.ncbi.nlm.nih.gov/{match.group(1)}/"
     return url
 
@@ -111,24 +84,68 @@ def _normalize_field(value: str) -> str:
     return " ".join(value.replace("**", "").split()).strip()
 
 
-def _extract_source_metadata(text: str) -> dict[str, dict[str, str]]:
-    """Extract source title/author metadata from known tool output layouts."""
-    extracted: dict[str, dict[str, str]] = {}
-
-    for match in RETRIEVER_SOURCE_PATTERN.finditer(text):
-        url = normalize_pubmed_url(_strip_trailing_punctuation(match.group("url")))
-        extracted[url] = {
-            "title": _normalize_field(match.group("title")),
-            "authors": _normalize_field(match.group("authors")),
-        }
-
-    for pattern in (PUBMED_ROW_PATTERN, WEB_SOURCE_PATTERN, WEB_SOURCE_MD_PATTERN):
-        for match in pattern.finditer(text):
-            url = normalize_pubmed_url(_strip_trailing_punctuation(match.group("url")))
-            extracted.setdefault(url, {})
-            extracted[url]["title"] = _normalize_field(match.group("title"))
-
-    return extracted
+def _previous_line(text: str, line_start: int) -> tuple[int, str]:
+    start = text.rfind("\n", 0, max(line_start - 1, 0)) + 1
+    return start, text[start : max(line_start - 1, 0)].strip()
+
+
+def _doc_metadata(text: str, line_start: int) -> dict[str, str] | None:
+    """Walk back from a retriever ``**URL:**`` line to its ``## N.`` header."""
+    authors = ""
+    for _ in range(_MAX_DOC_FIELD_LINES):
+        if line_start == 0:
+            return None
+        line_start, line = _previous_line(text, line_start)
+        if not line:
+            return None
+        if match := _AUTHORS_PATTERN.match(line):
+            authors = match.group("authors")
+        elif match := _DOC_HEADER_PATTERN.match(line):
+            if not authors:
+                return None
+            return {
+                "title": _normalize_field(match.group("title")),
+                "authors": _normalize_field(authors),
+            }
+        else:
+            # The authors line must directly follow the header.
+            authors = ""
+    return None
+
+
+def _line_metadata(text: str, url_start: int) -> dict[str, str] | None:
+    """Metadata for a URL that sits on one of the labelled tool-output lines."""
+    line_start = text.rfind("\n", 0, url_start) + 1
+    label = text[line_start:url_start].strip()
+    if label not in ("URL:", "**URL:**", "-") or line_start == 0:
+        return None
+    _, previous = _previous_line(text, line_start)
+    if label == "-":
+        match = _ROW_PATTERN.match(previous)
+    else:
+        match = _WEB_HEADER_PATTERN.match(previous)
+        if label == "**URL:**" and not (match and previous.startswith("##")):
+            return _doc_metadata(text, line_start)
+    return {"title": _normalize_field(match.group("title"))} if match else None
+
+
+def scan_sources(text: str) -> tuple[list[str], dict[str, dict[str, str]]]:
+    """Extract URLs and their title/author metadata from tool output in one scan.
+
+    Returns the unique URLs in order of appearance and the metadata found for
+    each (PubMed-normalized) URL. Only URLs on a labelled line look at the
+    neighbouring header lines, so large raw web content costs a single regex pass.
+    """
+    urls: dict[str, None] = {}
+    metadata: dict[str, dict[str, str]] = {}
+    for match in URL_PATTERN.finditer(text):
+        url = _strip_trailing_punctuation(match.group(0))
+        if not url:
+            continue
+        urls.setdefault(url)
+        if found := _line_metadata(text, match.start()):
+            metadata.setdefault(normalize_pubmed_url(url), {}).update(found)
+    return list(urls), metadata
 
 
 def deduplicate_sources(sources: list[dict[str, str]]) -> list[dict[str, str]]:
@@ -158,19 +175,17 @@ def deduplicate_sources(sources: list[dict[str, str]]) -> list[dict[str, str]]:
     return deduplicated
 
 
-def merge_sources(
-    existing_sources: list[dict[str, str]], text: str
+def _merge_source_entries(
+    existing_sources: list[dict[str, str]],
+    entries: Iterable[tuple[str, dict[str, str]]],
 ) -> list[dict[str, str]]:
-    """Merge URLs found in text into a stable per-section source registry."""
     merged = [dict(source) for source in existing_sources]
     by_url = {source.get("url", ""): source for source in merged}
-    metadata_by_url = _extract_source_metadata(text)
 
-    for url in extract_urls(text):
+    for url, metadata in entries:
         if not is_valid_source_url(url):
             continue
         url = normalize_pubmed_url(url)
-        metadata = metadata_by_url.get(url, {})
         if url in by_url:
             existing = by_url[url]
             for field in ("title", "authors"):
@@ -192,20 +207,47 @@ def merge_sources(
     return merged
 
 
+def merge_sources(
+    existing_sources: list[dict[str, str]], text: str
+) -> list[dict[str, str]]:
+    """Merge URLs found in text into a stable per-section source registry."""
+    urls, metadata_by_url = scan_sources(text)
+    return _merge_source_entries(
+        existing_sources,
+        ((url, metadata_by_url.get(normalize_pubmed_url(url), {})) for url in urls),
+    )
+
+
+def merge_source_records(
+    existing_sources: list[dict[str, str]], records: Iterable[dict[str, str]]
+) -> list[dict[str, str]]:
+    """Merge structured ``{"url", "title", "authors"}`` records from a tool artifact."""
+    return _merge_source_entries(
+        existing_sources,
+        (
+            (
+                _strip_trailing_punctuation(str(record.get("url") or "").strip()),
+                {
+                    field: _normalize_field(str(record.get(field) or ""))
+                    for field in ("title", "authors")
+                },
+            )
+            for record in records
+        ),
+    )
+
+
 def register_sources_in_citation_registry(
     sources: list[dict[str, str]],
-    citation_registry: dict[str, int],
-) -> dict[str, int]:
+    citation_registry: dict[str, int] | None,
+) -> CitationRegistry:
     """Register all source URLs into the citation registry, returning updated
     registry."""
-    registry = dict(citation_registry) if citation_registry else {}
+    registry = CitationRegistry(citation_registry)
     for source in sources:
         url = source.get("url", "")
-        if not url or not is_valid_source_url(url):
-            continue
-        url = normalize_pubmed_url(url)
-        if url not in registry:
-            registry[url] = max(registry.values(), default=0) + 1
+        if url and is_valid_source_url(url):
+            registry.register(normalize_pubmed_url(url))
     return registry
 
 
@@ -298,18 +340,20 @@ def build_numbered_references(
         if url not in source_by_url:
             source_by_url[url] = source
 
-    lines: list[tuple[int, str]] = []
-    for url, num in citation_registry.items():
-        if num not in referenced_numbers:
+    # Look up the few cited numbers instead of scanning the whole registry.
+    registry = CitationRegistry.of(citation_registry)
+    lines: list[str] = []
+    for num in sorted(referenced_numbers):
+        url = registry.url_for(num)
+        if url is None:
             continue
         source = source_by_url.get(url, {"url": url})
-        lines.append((num, _format_reference(source, num)))
+        lines.append(_format_reference(source, num))
 
     if not lines:
         return ""
 
-    lines.sort(key=lambda x: x[0])
-    return "## References\n\n" + "\n".join(line for _, line in lines)
+    return "## References\n\n" + "\n".join(lines)
 
 
 def _strip_existing_refs(body: str) -> str:
@@ -4,12 +4,16 @@ from langchain_core.messages import AnyMessage
 from langgraph.graph import add_messages
 from pydantic import BaseModel, Field
 
+from utils.scratchpad_helpers import merge_scratchpad
+
 
 class ScratchpadState(BaseModel):
     """Conversation messages plus a persistent scratchpad."""
 
     messages: Annotated[list[AnyMessage], add_messages]
-    scratchpad: str = Field(default="")
+    scratchpad: Annotated[list[dict[str, str]], merge_scratchpad] = Field(
+        default_factory=list
+    )
 
 
 class WriteToScratchpad(BaseModel):
@@ -24,7 +28,10 @@ class ReadFromScratchpad(BaseModel):
 
     query: str = Field(
         default="all",
-        description="What to look for. Use 'all' for everything.",
+        description=(
+            "Keywords to find in your notes; the best-matching entries are "
+            "returned. Use 'all' for a one-line-per-entry coverage summary."
+        ),
     )
 
 
@@ -0,0 +1,219 @@
+"""Semantic cache of completed research sections across reports.
+
+Overlapping topics plan near-identical sections ("Mechanism of Action" for
+GLP-1 in NAFLD and in obesity), and each used to be researched from scratch.
+With ``SECTION_CACHE_MODE=on`` every research section that passes verification
+is stored with its sources, citation numbers and scratchpad, keyed by the
+embedding of its name and description. When a later section is planned:
+
+- a match with cosine similarity of at least ``SECTION_CACHE_REUSE_THRESHOLD``
+  (default 0.95) is reused as-is and ``build_section_with_tools`` ends without
+  calling the LLM;
+- a match of at least ``SECTION_CACHE_SEED_THRESHOLD`` (default 0.85) seeds the
+  section's scratchpad and sources, so research starts from the cached notes.
+
+Entries older than ``SECTION_CACHE_MAX_AGE_DAYS`` (default 180) are ignored so
+that stale evidence is re-researched. Entries live in ``SECTION_CACHE_PATH``
+(default ``storage/section_cache.sqlite``).
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from core.quality import register_sources_in_citation_registry
+from core.schemas import Section
+
+_DEFAULT_SECTION_CACHE_PATH = "storage/section_cache.sqlite"
+_DEFAULT_REUSE_THRESHOLD = 0.95
+_DEFAULT_SEED_THRESHOLD = 0.85
+_DEFAULT_MAX_AGE_DAYS = 180
+
+_CITATION_GROUP = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\]")
+
+EmbedFn = Callable[[str], list[float]]
+
+
+@dataclass
+class CachedSection:
+    section: Section
+    scratchpad: str
+    citation_registry: dict[str, int]
+    similarity: float
+    reusable: bool
+
+    @property
+    def sources(self) -> list[dict[str, str]]:
+        return self.section.sources or []
+
+
+def section_key(section) -> str:
+    return f"{section.name}\n{section.description}".strip()
+
+
+def remap_citations(
+    content: str, old_registry: dict[str, int], new_registry: dict[str, int]
+) -> str:
+    """Renumber ``[N]`` and ``[N, M]`` markers from one citation registry to another."""
+    mapping = {
+        old: new_registry[url]
+        for url, old in old_registry.items()
+        if url in new_registry and new_registry[url] != old
+    }
+    if not mapping:
+        return content
+
+    def renumber(match: re.Match) -> str:
+        numbers = [int(n) for n in match.group(1).split(",")]
+        return "[" + ", ".join(str(mapping.get(n, n)) for n in numbers) + "]"
+
+    return _CITATION_GROUP.sub(renumber, content)
+
+
+class SectionCache:
+    """Completed sections indexed by the embedding of their name and description."""
+
+    def __init__(
+        self,
+        path: str | Path,
+        embed: EmbedFn,
+        reuse_threshold: float = _DEFAULT_REUSE_THRESHOLD,
+        seed_threshold: float = _DEFAULT_SEED_THRESHOLD,
+        max_age_days: float = _DEFAULT_MAX_AGE_DAYS,
+    ):
+        self.path = Path(path)
+        self.embed = embed
+        self.reuse_threshold = reuse_threshold
+        self.seed_threshold = seed_threshold
+        self.max_age = timedelta(days=max_age_days)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS section_cache ("
+            "key TEXT PRIMARY KEY, embedding BLOB, section TEXT, scratchpad TEXT, "
+            "citation_registry TEXT, created_at TEXT)"
+        )
+        self._conn.commit()
+        self._keys: list[str] = []
+        self._matrix: np.ndarray | None = None
+
+    def _embedding(self, text: str) -> np.ndarray:
+        vector = np.asarray(self.embed(text), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _index(self) -> tuple[list[str], np.ndarray | None]:
+        """Load every stored embedding into one normalized matrix, once."""
+        if self._matrix is None:
+            rows = self._conn.execute(
+                "SELECT key, embedding FROM section_cache"
+            ).fetchall()
+            self._keys = [key for key, _ in rows]
+            if rows:
+                self._matrix = np.stack(
+                    [np.frombuffer(blob, dtype=np.float32) for _, blob in rows]
+                )
+        return self._keys, self._matrix
+
+    def lookup(self, section) -> CachedSection | None:
+        """Return the closest fresh entry above the seed threshold, if any."""
+        query = self._embedding(section_key(section))
+        cutoff = (datetime.now() - self.max_age).isoformat(timespec="seconds")
+        with self._lock:
+            keys, matrix = self._index()
+            if matrix is None:
+                return None
+            scores = matrix @ query
+            for index in np.argsort(scores)[::-1]:
+                score = float(scores[index])
+                if score < self.seed_threshold:
+                    return None
+                row = self._conn.execute(
+                    "SELECT section, scratchpad, citation_registry FROM section_cache "
+                    "WHERE key = ? AND created_at >= ?",
+                    (keys[index], cutoff),
+                ).fetchone()
+                if row is not None:
+                    break
+            else:
+                return None
+
+        cached = Section.model_validate_json(row[0])
+        reusable = score >= self.reuse_threshold
+        logger.info(
+            f"Section cache {'hit' if reusable else 'seed'} for '{section.name}': "
+            f"'{cached.name}' (similarity {score:.3f})"
+        )
+        return CachedSection(
+            section=cached,
+            scratchpad=row[1],
+            citation_registry=json.loads(row[2]),
+            similarity=score,
+            reusable=reusable,
+        )
+
+    def store(
+        self, section, scratchpad: str, citation_registry: dict[str, int]
+    ) -> None:
+        key = section_key(section)
+        embedding = self._embedding(key)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO section_cache VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    embedding.tobytes(),
+                    section.model_dump_json(),
+                    scratchpad,
+                    json.dumps(citation_registry),
+                    datetime.now().isoformat(timespec="seconds"),
+                ),
+            )
+            self._conn.commit()
+            self._matrix = None
+
+    def reuse(self, section, cached: CachedSection) -> tuple[Section, dict[str, int]]:
+        """Copy a cached section under ``section``'s name with a fresh registry."""
+        registry = register_sources_in_citation_registry(cached.sources, {})
+        reused = section.model_copy()
+        reused.content = remap_citations(
+            cached.section.content, cached.citation_registry, registry
+        )
+        reused.sources = list(cached.sources)
+        return reused, registry
+
+
+@lru_cache(maxsize=1)
+def get_section_cache() -> SectionCache | None:
+    """Return the process-wide section cache configured by ``SECTION_CACHE_MODE``."""
+    if os.environ.get("SECTION_CACHE_MODE", "off").strip().lower() != "on":
+        return None
+    from rag.retrieval_builder import get_embeddings
+
+    path = (
+        os.environ.get("SECTION_CACHE_PATH", "").strip() or _DEFAULT_SECTION_CACHE_PATH
+    )
+    return SectionCache(
+        path,
+        get_embeddings().embed_query,
+        reuse_threshold=float(
+            os.environ.get("SECTION_CACHE_REUSE_THRESHOLD") or _DEFAULT_REUSE_THRESHOLD
+        ),
+        seed_threshold=float(
+            os.environ.get("SECTION_CACHE_SEED_THRESHOLD") or _DEFAULT_SEED_THRESHOLD
+        ),
+        max_age_days=float(
+            os.environ.get("SECTION_CACHE_MAX_AGE_DAYS") or _DEFAULT_MAX_AGE_DAYS
+        ),
+    )
@@ -0,0 +1,103 @@
+"""Dependency-driven section scheduling within one report run.
+
+``initiate_section_writing`` sends every research section, and every
+non-research section whose dependencies can be met, in the same superstep. A
+non-research section then waits on its run's ``SectionSchedule`` only for the
+sections named in its ``dependencies`` and is written as soon as they complete,
+while unrelated research carries on.
+
+Dependencies are matched to section names case-insensitively, and names that
+are not in the plan are ignored. The planner rarely fills ``dependencies``, so a
+section that names none in the plan depends on every research section, as when
+framing sections were written after research. A non-research section caught in a dependency
+cycle with other non-research sections could never start, so it is left to
+``initiate_final_section_writing``.
+
+Like the research budget, the schedule is shared by the workers of one run, so
+it lives in a process-level registry keyed by ``run_id``.
+"""
+
+import asyncio
+import copy
+
+
+def _name_key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _dependency_keys(section, sections: list) -> list[str]:
+    """Keys of the planned sections ``section`` waits for, in plan order."""
+    known = [_name_key(s.name) for s in sections]
+    declared = {_name_key(d) for d in getattr(section, "dependencies", None) or []}
+    keys = [key for key in known if key in declared]
+    if keys or section.research:
+        return keys
+    return [_name_key(s.name) for s in sections if s.research]
+
+
+def schedulable_sections(sections: list) -> list:
+    """Non-research sections whose dependencies all complete in the first fan-out.
+
+    Research sections never wait, so a chain of dependencies ends at the first
+    research section it reaches.
+    """
+    by_key = {_name_key(s.name): s for s in sections}
+    resolved: dict[str, bool] = {}
+
+    def can_start(key: str, path: frozenset[str]) -> bool:
+        if by_key[key].research:
+            return True
+        if key in path:
+            return False
+        if key not in resolved:
+            deps = _dependency_keys(by_key[key], sections)
+            resolved[key] = all(can_start(dep, path | {key}) for dep in deps)
+        return resolved[key]
+
+    return [
+        s
+        for s in sections
+        if not s.research and can_start(_name_key(s.name), frozenset())
+    ]
+
+
+class SectionSchedule:
+    """Completed sections of a run, and an event per section to wait on."""
+
+    def __init__(self, sections: list):
+        self._sections = list(sections)
+        self._events = {_name_key(s.name): asyncio.Event() for s in sections}
+        self._completed: dict[str, object] = {}
+
+    def complete(self, section) -> None:
+        """Record a copy of ``section``; later edits to it are not seen."""
+        key = _name_key(section.name)
+        self._completed[key] = copy.deepcopy(section)
+        if key in self._events:
+            self._events[key].set()
+
+    async def dependencies_of(self, section) -> list:
+        """Copies of the completed sections ``section`` depends on, once all are."""
+        keys = _dependency_keys(section, self._sections)
+        for key in keys:
+            await self._events[key].wait()
+        return [copy.deepcopy(self._completed[key]) for key in keys]
+
+
+_schedules: dict[str, SectionSchedule] = {}
+
+
+def open_section_schedule(run_id: str, sections: list) -> SectionSchedule:
+    schedule = SectionSchedule(sections)
+    if run_id:
+        _schedules[run_id] = schedule
+    return schedule
+
+
+def section_schedule(run_id: str) -> SectionSchedule | None:
+    """The run's schedule, or ``None`` outside a report run."""
+    return _schedules.get(run_id)
+
+
+def close_section_schedule(run_id: str) -> SectionSchedule | None:
+    return _schedules.pop(run_id, None)
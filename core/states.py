@@ -5,7 +5,10 @@ from langchain_core.messages import AnyMessage
 from langgraph.graph import MessagesState
 from typing_extensions import NotRequired, TypedDict
 
+from core.citations import CitationRegistry
 from core.schemas import Section
+from core.verification import ScratchpadStats
+from utils.scratchpad_helpers import merge_scratchpad
 
 
 def _keep_latest(_current, new):
@@ -21,12 +24,7 @@ def _merge_citation_registries(
     Numbers from ``new`` are intentionally re-assigned sequentially to avoid
     conflicts when parallel fan-out workers independently number their URLs.
     """
-    merged = dict(current) if current else {}
-    for url, num in (new or {}).items():
-        if url not in merged:
-            next_num = max(merged.values(), default=0) + 1
-            merged[url] = next_num
-    return merged
+    return CitationRegistry.of(current).merge(new)
 
 
 class ReportStateInput(MessagesState):
@@ -43,7 +41,7 @@ class ReportState(MessagesState):
     run_id: str
     sections: list[Section]
     section: Annotated[Section, _keep_latest]
-    scratchpad: Annotated[str, _keep_latest]
+    scratchpad: Annotated[list[dict[str, str]], merge_scratchpad]
     scratchpad_file: Annotated[str, _keep_latest]
     active_csv_path: Annotated[str, _keep_latest]
     completed_sections: Annotated[list, operator.add]
@@ -58,11 +56,13 @@ class SectionState(MessagesState):
     section: Section
     completed_sections_context: list[Section]
     run_id: str
-    scratchpad: str
+    scratchpad: Annotated[list[dict[str, str]], merge_scratchpad]
+    scratchpad_stats: ScratchpadStats
     scratchpad_file: str
     active_csv_path: str
     sources: Annotated[list[dict[str, str]], _keep_latest]
     citation_registry: Annotated[dict[str, int], _merge_citation_registries]
+    context_tokens_saved: Annotated[int, operator.add]
 
 
 class SectionStateOutput(TypedDict):
@@ -0,0 +1,80 @@
+"""Incremental output for report runs.
+
+Nodes emit a ``section`` event through LangGraph's ``custom`` stream mode as soon
+as a section is finished, and synthesis LLM calls are tagged so their token
+deltas can be picked out of the ``messages`` stream mode. ``stream_report``
+merges both into one flat event stream that clients can render as it arrives.
+"""
+
+from collections.abc import AsyncIterator
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+
+from utils.helpers import content_to_text
+
+SYNTHESIS_TAG = "section_synthesis"
+
+_STREAM_MODES = ["custom", "messages", "updates"]
+_FINAL_NODE = "validate_report_quality"
+
+
+def synthesis_config(section_name: str) -> RunnableConfig:
+    """Run config that marks an LLM call as section synthesis for streaming."""
+    return {"tags": [SYNTHESIS_TAG], "metadata": {"section": section_name}}
+
+
+def emit_section(section, phase: str) -> None:
+    """Emit a finished section to ``custom`` stream consumers, if any."""
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        # Called outside a graph run (e.g. unit tests or direct node calls)
+        return
+    writer(
+        {
+            "type": "section",
+            "phase": phase,
+            "section": section.name,
+            "research": bool(getattr(section, "research", False)),
+            "content": section.content,
+        }
+    )
+
+
+def _token_event(message_chunk, metadata: dict) -> dict | None:
+    if SYNTHESIS_TAG not in (metadata.get("tags") or []):
+        return None
+    text = content_to_text(getattr(message_chunk, "content", ""))
+    if not text:
+        return None
+    return {"type": "token", "section": metadata.get("section", ""), "text": text}
+
+
+async def stream_report(
+    graph, inputs: dict, config: RunnableConfig | None = None
+) -> AsyncIterator[dict[str, Any]]:
+    """Run the report graph and yield ``token``, ``section`` and ``report`` events.
+
+    ``token`` events carry synthesis deltas, ``section`` events carry each
+    section's content as soon as it is written, and a single ``report`` event
+    carries the validated final report.
+    """
+    async for _namespace, mode, data in graph.astream(
+        inputs, config=config, stream_mode=_STREAM_MODES, subgraphs=True
+    ):
+        if mode == "custom" and isinstance(data, dict):
+            yield data
+        elif mode == "messages":
+            message_chunk, metadata = data
+            if event := _token_event(message_chunk, metadata):
+                yield event
+        elif mode == "updates" and _FINAL_NODE in data:
+            update = data[_FINAL_NODE] or {}
+            yield {
+                "type": "report",
+                "final_report": update.get("final_report", ""),
+                "quality_passed": update.get("quality_passed", False),
+                "quality_issues": update.get("quality_issues", []),
+            }
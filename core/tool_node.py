@@ -11,18 +11,25 @@ from dataclasses import dataclass, field
 from langchain_core.messages import ToolMessage
 from langgraph.graph import END
 
-from core.quality import merge_sources, register_sources_in_citation_registry
+from core.citations import CitationRegistry
+from core.quality import (
+    merge_source_records,
+    merge_sources,
+    register_sources_in_citation_registry,
+)
 from core.schemas import ClearScratchpad, ReadFromScratchpad, WriteToScratchpad
 from core.states import SectionState
+from core.verification import scratchpad_stats
 from tools.pubmed_search import _DATA_DIR, pubmed_scraper_tool
 from tools.retrieval import retriever_tool
 from tools.web_search import web_search
 from utils.helpers import content_to_text
+from utils.near_dedup import near_duplicate_scope
 from utils.scratchpad_helpers import (
+    append_scratchpad,
     handle_clear,
     handle_read,
     handle_write,
-    save_scratchpad,
 )
 
 SECTION_TOOLS = [
@@ -41,11 +48,17 @@ _TOOL_BY_NAME: dict = {t.name: t for t in _EXTERNAL_TOOLS}
 # Utilities
 
 
-async def save_scratchpad_async(content: str, filepath: str) -> None:
+async def append_scratchpad_async(
+    delta: list[dict[str, str]], has_content: bool, filepath: str
+) -> None:
     from config import config as app_config
 
     await asyncio.to_thread(
-        save_scratchpad, content, filepath, app_config.paths.scratchpad_output_dir
+        append_scratchpad,
+        delta,
+        has_content,
+        filepath,
+        app_config.paths.scratchpad_output_dir,
     )
 
 
@@ -61,20 +74,33 @@ def _extract_dataset_path(tool_output: str) -> str | None:
 
 
 def _handle_write(args: dict, state: SectionState, call_id: str):
-    return handle_write(args, state.get("scratchpad", ""), call_id)
+    return handle_write(args, call_id)
 
 
 def _handle_read(args: dict, state: SectionState, call_id: str) -> ToolMessage:
-    return handle_read(args, state.get("scratchpad", ""), call_id)
+    from config import config as app_config
+
+    return handle_read(
+        args,
+        state.get("scratchpad", []),
+        call_id,
+        top_k=app_config.research.scratchpad_read_top_k,
+        token_budget=app_config.research.scratchpad_read_token_budget,
+    )
 
 
 def _handle_clear(args: dict, state: SectionState, call_id: str):
-    return handle_clear(args, call_id, state.get("scratchpad", ""))
+    return handle_clear(args, call_id)
 
 
 async def _handle_external(name: str, args: dict, call_id: str) -> ToolMessage:
-    observation = await _TOOL_BY_NAME[name].ainvoke(args)
-    return ToolMessage(content=str(observation), tool_call_id=call_id)
+    # Invoking with a ToolCall returns a ToolMessage that keeps the tool's artifact.
+    message = await _TOOL_BY_NAME[name].ainvoke(
+        {"type": "tool_call", "name": name, "args": args, "id": call_id}
+    )
+    if not isinstance(message.content, str):
+        message.content = str(message.content)
+    return message
 
 
 # Node and edge
@@ -87,22 +113,24 @@ class _CallContext:
     state: SectionState
     messages: list[ToolMessage] = field(default_factory=list)
     sources: list = field(default_factory=list)
-    citation_registry: dict[str, int] = field(default_factory=dict)
-    scratchpad_update: str | None = None
+    citation_registry: CitationRegistry = field(default_factory=CitationRegistry)
+    scratchpad_delta: list[dict[str, str]] = field(default_factory=list)
     active_csv_update: str | None = None
 
     def __post_init__(self):
         self.sources = list(self.state.get("sources", []))
-        self.citation_registry = dict(self.state.get("citation_registry", {}) or {})
+        self.citation_registry = CitationRegistry(self.state.get("citation_registry"))
 
     async def dispatch(self, name: str, args: dict, call_id: str) -> None:
         if name == "WriteToScratchpad":
-            self.scratchpad_update, msg = _handle_write(args, self.state, call_id)
+            delta, msg = _handle_write(args, self.state, call_id)
+            self.scratchpad_delta.extend(delta)
             self.messages.append(msg)
         elif name == "ReadFromScratchpad":
             self.messages.append(_handle_read(args, self.state, call_id))
         elif name == "ClearScratchpad":
-            self.scratchpad_update, msg = _handle_clear(args, self.state, call_id)
+            delta, msg = _handle_clear(args, self.state, call_id)
+            self.scratchpad_delta.extend(delta)
             self.messages.append(msg)
         else:
             await self._dispatch_external(name, args, call_id)
@@ -118,8 +146,11 @@ class _CallContext:
 
         msg = await _handle_external(name, args, call_id)
         self.messages.append(msg)
-        text = content_to_text(msg.content)
-        self.sources = merge_sources(self.sources, text)
+        if isinstance(msg.artifact, list):
+            # Structured source records from the tool; no need to parse its text.
+            self.sources = merge_source_records(self.sources, msg.artifact)
+        else:
+            self.sources = merge_sources(self.sources, content_to_text(msg.content))
         self.citation_registry = register_sources_in_citation_registry(
             self.sources, self.citation_registry
         )
@@ -136,13 +167,28 @@ class _CallContext:
             self.state.get("citation_registry", {}) or {}
         ):
             update["citation_registry"] = self.citation_registry
-        if self.scratchpad_update is not None:
-            update["scratchpad"] = self.scratchpad_update
+        if self.scratchpad_delta:
+            # Only the new entries; the scratchpad reducer appends them to state.
+            update["scratchpad"] = self.scratchpad_delta
+            stats = scratchpad_stats(
+                self.state.get("scratchpad"), self.state.get("scratchpad_stats")
+            )
+            update["scratchpad_stats"] = stats.apply(self.scratchpad_delta)
         return update
 
 
+def near_duplicate_key(state: SectionState) -> str:
+    """Key of the near-duplicate index shared by one section's tool calls."""
+    run = state.get("run_id") or state.get("scratchpad_file", "")
+    return f"{run}:{getattr(state.get('section'), 'name', '')}"
+
+
 async def tool_node(state: SectionState) -> dict:
-    """Execute all pending tool calls and return updated state."""
+    """Execute all pending tool calls and return updated state.
+
+    Search tools skip pages and chunks that nearly repeat what earlier calls of
+    the same section returned (see ``utils.near_dedup``).
+    """
     last_message = state["messages"][-1]
     if not getattr(last_message, "tool_calls", None):
         return {"messages": []}
@@ -150,14 +196,19 @@ async def tool_node(state: SectionState) -> dict:
     ctx = _CallContext(state)
     scratchpad_file = state.get("scratchpad_file", "")
 
-    for tc in last_message.tool_calls:
-        await ctx.dispatch(
-            str(tc.get("name", "")), dict(tc.get("args", {})), str(tc.get("id", ""))
-        )
+    with near_duplicate_scope(near_duplicate_key(state)):
+        for tc in last_message.tool_calls:
+            await ctx.dispatch(
+                str(tc.get("name", "")),
+                dict(tc.get("args", {})),
+                str(tc.get("id", "")),
+            )
 
     update = ctx.build_update()
-    if ctx.scratchpad_update is not None and scratchpad_file:
-        await save_scratchpad_async(ctx.scratchpad_update, scratchpad_file)
+    if ctx.scratchpad_delta and scratchpad_file:
+        await append_scratchpad_async(
+            ctx.scratchpad_delta, bool(state.get("scratchpad")), scratchpad_file
+        )
 
     return update
 
@@ -0,0 +1,430 @@
+"""Per-node timing and token tracing for report graph runs.
+
+``RunTracer`` is a LangChain callback handler. Attached to a graph invocation it
+records one ``NodeTrace`` per node run, including every ``build_section_with_tools``
+worker and the ``write_sections``/``tools`` nodes inside it, with:
+
+- wall time;
+- queue time: the gap between the node becoming runnable (the end of the
+  previous superstep in the same graph namespace) and the node starting, which
+  is where rate limiting and event-loop or thread-pool contention show up;
+- LLM calls and prompt/completion tokens, including DSPy predictor usage
+  reported through ``emit_lm_usage``;
+- prompt tokens read from and written to the provider's prompt cache, so the
+  cache hit rate of the shared research prefix can be checked per node and run;
+- the latency of every tool call.
+
+``traced_invoke`` wraps ``graph.ainvoke``, writes the trace to a JSON file,
+mirrors it to OpenTelemetry when the SDK is installed, and logs a summary.
+"""
+
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+from uuid import UUID, uuid4
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.callbacks.manager import adispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from loguru import logger
+
+LM_USAGE_EVENT = "lm_usage"
+DEFAULT_TRACE_DIR = "outputs/traces"
+
+
+@dataclass
+class ToolTiming:
+    name: str
+    seconds: float
+    error: bool = False
+
+
+@dataclass
+class NodeTrace:
+    node: str
+    namespace: str
+    step: int
+    start: float
+    end: float | None = None
+    queue_seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    tools: list[ToolTiming] = field(default_factory=list)
+    error: str | None = None
+
+    @property
+    def wall_seconds(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+    @property
+    def parent_namespace(self) -> str:
+        return self.namespace.rpartition("|")[0]
+
+    @property
+    def top_level(self) -> bool:
+        return "|" not in self.namespace
+
+
+@dataclass
+class NodeSummary:
+    runs: int = 0
+    wall_seconds: float = 0.0
+    max_wall_seconds: float = 0.0
+    queue_seconds: float = 0.0
+    llm_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+    tool_calls: int = 0
+    tool_seconds: float = 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        return (
+            self.cache_read_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+        )
+
+
+@dataclass
+class RunTrace:
+    run_name: str
+    started_at: str
+    epoch_ns: int
+    wall_seconds: float
+    nodes: list[NodeTrace]
+    run_id: str = field(default_factory=lambda: uuid4().hex)
+
+    def by_node(self) -> dict[str, NodeSummary]:
+        """Aggregate node runs by node name, ordered by first start."""
+        summaries: dict[str, NodeSummary] = {}
+        for trace in sorted(self.nodes, key=lambda t: t.start):
+            summary = summaries.setdefault(trace.node, NodeSummary())
+            summary.runs += 1
+            summary.wall_seconds += trace.wall_seconds
+            summary.max_wall_seconds = max(summary.max_wall_seconds, trace.wall_seconds)
+            summary.queue_seconds += trace.queue_seconds
+            summary.llm_calls += trace.llm_calls
+            summary.prompt_tokens += trace.prompt_tokens
+            summary.completion_tokens += trace.completion_tokens
+            summary.cache_read_tokens += trace.cache_read_tokens
+            summary.cache_creation_tokens += trace.cache_creation_tokens
+            summary.tool_calls += len(trace.tools)
+            summary.tool_seconds += sum(t.seconds for t in trace.tools)
+        return summaries
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["summary"] = {name: asdict(s) for name, s in self.by_node().items()}
+        return data
+
+    def summary(self) -> str:
+        header = (
+            f"{'node':<28}{'runs':>5}{'wall s':>9}{'max s':>8}{'queue s':>9}"
+            f"{'llm':>5}{'prompt':>9}{'compl':>8}{'cached':>8}{'hit %':>6}"
+            f"{'tools':>6}{'tool s':>8}"
+        )
+        lines = [f"Trace '{self.run_name}': {self.wall_seconds:.1f}s wall", header]
+        for name, s in self.by_node().items():
+            lines.append(
+                f"{name:<28}{s.runs:>5}{s.wall_seconds:>9.2f}"
+                f"{s.max_wall_seconds:>8.2f}{s.queue_seconds:>9.2f}{s.llm_calls:>5}"
+                f"{s.prompt_tokens:>9}{s.completion_tokens:>8}"
+                f"{s.cache_read_tokens:>8}{s.cache_hit_rate:>6.0%}{s.tool_calls:>6}"
+                f"{s.tool_seconds:>8.2f}"
+            )
+        return "\n".join(lines)
+
+
+def _cache_tokens(usage: dict, token_usage: dict) -> tuple[int, int]:
+    """Prompt tokens read from and written to the provider's prompt cache.
+
+    LangChain reports both under ``input_token_details``; DeepSeek's raw usage
+    only has the hits, as ``prompt_cache_hit_tokens``.
+    """
+    details = usage.get("input_token_details") or {}
+    read = details.get("cache_read") or token_usage.get("prompt_cache_hit_tokens")
+    return int(read or 0), int(details.get("cache_creation") or 0)
+
+
+def _usage_from_llm_result(response) -> tuple[int, int, int, int]:
+    """Prompt, completion, cache-read and cache-creation tokens of one LLM call."""
+    token_usage = (response.llm_output or {}).get("token_usage") or {}
+    for generations in response.generations:
+        for generation in generations:
+            message = getattr(generation, "message", None)
+            usage = getattr(message, "usage_metadata", None)
+            if usage:
+                metadata = getattr(message, "response_metadata", None) or {}
+                return (
+                    usage.get("input_tokens", 0),
+                    usage.get("output_tokens", 0),
+                    *_cache_tokens(usage, metadata.get("token_usage") or token_usage),
+                )
+    return (
+        token_usage.get("prompt_tokens", 0),
+        token_usage.get("completion_tokens", 0),
+        *_cache_tokens({}, token_usage),
+    )
+
+
+class RunTracer(BaseCallbackHandler):
+    """Callback handler that builds a ``RunTrace`` for one graph invocation."""
+
+    run_inline = True
+
+    def __init__(self, run_name: str = "report", run_id: str | None = None):
+        self.run_name = run_name
+        self.run_id = run_id or uuid4().hex
+        self.started_at = datetime.now()
+        self._epoch_ns = time.time_ns()
+        self._t0 = time.perf_counter()
+        self.nodes: list[NodeTrace] = []
+        self._node_runs: dict[UUID, NodeTrace] = {}
+        self._open_by_namespace: dict[str, NodeTrace] = {}
+        self._llm_namespaces: dict[UUID, str] = {}
+        self._open_tools: dict[UUID, tuple[str, str, float]] = {}
+
+    def _now(self) -> float:
+        return time.perf_counter() - self._t0
+
+    def _node_for(self, metadata: dict | None) -> NodeTrace | None:
+        namespace = str((metadata or {}).get("langgraph_checkpoint_ns", ""))
+        return self._open_by_namespace.get(namespace)
+
+    # Node runs
+
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        if not node or kwargs.get("name") != node:
+            return
+        trace = NodeTrace(
+            node=node,
+            namespace=str(metadata.get("langgraph_checkpoint_ns", "")),
+            step=int(metadata.get("langgraph_step", 0)),
+            start=self._now(),
+        )
+        self._node_runs[run_id] = trace
+        self._open_by_namespace[trace.namespace] = trace
+
+    def _close_node(self, run_id: UUID, error: BaseException | None = None) -> None:
+        trace = self._node_runs.pop(run_id, None)
+        if trace is None:
+            return
+        trace.end = self._now()
+        if error is not None:
+            trace.error = f"{type(error).__name__}: {error}"
+        self._open_by_namespace.pop(trace.namespace, None)
+        self.nodes.append(trace)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._close_node(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._close_node(run_id, error)
+
+    # LLM calls
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, metadata=None, **kwargs
+    ):
+        self._llm_namespaces[run_id] = str(
+            (metadata or {}).get("langgraph_checkpoint_ns", "")
+        )
+
+    def on_llm_start(self, serialized, prompts, *, run_id, metadata=None, **kwargs):
+        self.on_chat_model_start(serialized, prompts, run_id=run_id, metadata=metadata)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        namespace = self._llm_namespaces.pop(run_id, None)
+        trace = self._open_by_namespace.get(namespace or "")
+        if trace is None:
+            return
+        prompt, completion, cache_read, cache_creation = _usage_from_llm_result(
+            response
+        )
+        trace.llm_calls += 1
+        trace.prompt_tokens += int(prompt or 0)
+        trace.completion_tokens += int(completion or 0)
+        trace.cache_read_tokens += cache_read
+        trace.cache_creation_tokens += cache_creation
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._llm_namespaces.pop(run_id, None)
+
+    def on_custom_event(self, name, data, *, run_id, metadata=None, **kwargs):
+        if name != LM_USAGE_EVENT or (trace := self._node_for(metadata)) is None:
+            return
+        trace.llm_calls += int(data.get("calls", 1))
+        trace.prompt_tokens += int(data.get("prompt_tokens", 0))
+        trace.completion_tokens += int(data.get("completion_tokens", 0))
+        trace.cache_read_tokens += int(data.get("cache_read_tokens", 0))
+        trace.cache_creation_tokens += int(data.get("cache_creation_tokens", 0))
+
+    # Tool calls
+
+    def on_tool_start(self, serialized, input_str, *, run_id, metadata=None, **kwargs):
+        name = kwargs.get("name") or (serialized or {}).get("name", "tool")
+        namespace = str((metadata or {}).get("langgraph_checkpoint_ns", ""))
+        self._open_tools[run_id] = (name, namespace, self._now())
+
+    def _close_tool(self, run_id: UUID, error: bool) -> None:
+        opened = self._open_tools.pop(run_id, None)
+        if opened is None:
+            return
+        name, namespace, start = opened
+        if trace := self._open_by_namespace.get(namespace):
+            trace.tools.append(ToolTiming(name, self._now() - start, error))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._close_tool(run_id, error=False)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._close_tool(run_id, error=True)
+
+    def finish(self) -> RunTrace:
+        """Close the trace and derive each node's queue time."""
+        wall = self._now()
+        nodes = sorted(self.nodes, key=lambda t: t.start)
+        by_namespace = {t.namespace: t for t in nodes}
+        for trace in nodes:
+            parent = by_namespace.get(trace.parent_namespace)
+            ready_at = max(
+                (
+                    other.end
+                    for other in nodes
+                    if other.parent_namespace == trace.parent_namespace
+                    and other.step < trace.step
+                    and other.end is not None
+                ),
+                default=parent.start if parent else 0.0,
+            )
+            trace.queue_seconds = max(0.0, trace.start - ready_at)
+        return RunTrace(
+            run_name=self.run_name,
+            started_at=self.started_at.isoformat(timespec="seconds"),
+            epoch_ns=self._epoch_ns,
+            wall_seconds=wall,
+            nodes=nodes,
+            run_id=self.run_id,
+        )
+
+
+async def emit_lm_usage(prediction) -> None:
+    """Report a DSPy prediction's LM token usage to tracers on the current run."""
+    get_usage = getattr(prediction, "get_lm_usage", None)
+    usage = (get_usage() if callable(get_usage) else None) or {}
+    if not usage:
+        return
+    totals = {
+        "calls": 1,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "cache_read_tokens": 0,
+        "cache_creation_tokens": 0,
+    }
+    for model_usage in usage.values():
+        # LiteLLM usage: cache hits under prompt_tokens_details, or DeepSeek's own key.
+        details = model_usage.get("prompt_tokens_details") or {}
+        totals["prompt_tokens"] += int(model_usage.get("prompt_tokens") or 0)
+        totals["completion_tokens"] += int(model_usage.get("completion_tokens") or 0)
+        totals["cache_read_tokens"] += int(
+            details.get("cached_tokens")
+            or model_usage.get("prompt_cache_hit_tokens")
+            or 0
+        )
+        totals["cache_creation_tokens"] += int(
+            model_usage.get("cache_creation_input_tokens") or 0
+        )
+    try:
+        await adispatch_custom_event(LM_USAGE_EVENT, totals)
+    except RuntimeError:
+        # Called outside a graph run (e.g. unit tests or direct node calls)
+        return
+
+
+def export_json(trace: RunTrace, directory: str | Path = DEFAULT_TRACE_DIR) -> Path:
+    """Write ``trace`` to ``<directory>/<run_name>_<timestamp>_<run id>.json``.
+
+    The run id keeps runs started in the same second from overwriting each other.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = trace.started_at.replace(":", "").replace("-", "")
+    path = directory / f"{trace.run_name}_{stamp}_{trace.run_id[:8]}.json"
+    path.write_text(json.dumps(trace.to_dict(), indent=2), encoding="utf-8")
+    return path
+
+
+def export_otel(trace: RunTrace) -> bool:
+    """Mirror ``trace`` as OpenTelemetry spans if the API is installed.
+
+    Spans go to whichever tracer provider the process configured; without one
+    the OpenTelemetry API drops them.
+    """
+    try:
+        from opentelemetry import trace as otel_trace
+    except ImportError:
+        return False
+
+    tracer = otel_trace.get_tracer("medreportai")
+
+    def _ns(offset: float) -> int:
+        return trace.epoch_ns + int(offset * 1e9)
+
+    root = tracer.start_span(trace.run_name, start_time=trace.epoch_ns)
+    context = otel_trace.set_span_in_context(root)
+    for node in trace.nodes:
+        span = tracer.start_span(node.node, context=context, start_time=_ns(node.start))
+        span.set_attributes(
+            {
+                "langgraph.namespace": node.namespace,
+                "langgraph.step": node.step,
+                "queue_seconds": node.queue_seconds,
+                "llm.calls": node.llm_calls,
+                "llm.prompt_tokens": node.prompt_tokens,
+                "llm.completion_tokens": node.completion_tokens,
+                "llm.cache_read_tokens": node.cache_read_tokens,
+                "llm.cache_creation_tokens": node.cache_creation_tokens,
+                "tool.calls": len(node.tools),
+            }
+        )
+        span.end(end_time=_ns(node.end if node.end is not None else node.start))
+    root.end(end_time=_ns(trace.wall_seconds))
+    return True
+
+
+async def traced_invoke(
+    graph,
+    inputs: dict,
+    config: RunnableConfig | None = None,
+    *,
+    run_name: str = "report",
+    trace_dir: str | Path | None = DEFAULT_TRACE_DIR,
+) -> tuple[dict, RunTrace]:
+    """Invoke ``graph`` with a ``RunTracer`` attached and export the trace.
+
+    The trace takes the config's ``run_id`` if one is set, and otherwise sets a
+    new one, so trace files and LangSmith runs share an id.
+    """
+    config = dict(config or {})
+    config["run_id"] = config.get("run_id") or uuid4()
+    tracer = RunTracer(run_name, run_id=str(config["run_id"]).replace("-", ""))
+    config["callbacks"] = [*(config.get("callbacks") or []), tracer]
+    try:
+        result = await graph.ainvoke(inputs, config=config)
+    finally:
+        trace = tracer.finish()
+        if trace_dir is not None:
+            path = export_json(trace, trace_dir)
+            logger.info(f"Run trace written to {path}")
+        export_otel(trace)
+        logger.info("\n" + trace.summary())
+    return result, trace
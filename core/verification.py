@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import re
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+from utils.scratchpad_helpers import is_reset
 
 
 @dataclass
@@ -12,33 +14,107 @@ class VerificationResult:
     failures: list[str]
 
 
-def _check_source_count(entries: list[str]) -> str | None:
-    if len(entries) < 3:
-        return f"Insufficient sources: found {len(entries)}, need at least 3"
+_ENTRY_SEPARATOR = "---"
+_QUANT_HEADER = re.compile(r"\*\*QUANTITATIVE DATA\*\*:")
+_DATA_POINT = re.compile(r"^\s*-\s+\[", re.MULTILINE)
+
+
+def _is_quant_rich(entry: str) -> bool:
+    return bool(_QUANT_HEADER.search(entry)) and len(_DATA_POINT.findall(entry)) >= 3
+
+
+@dataclass(frozen=True)
+class ScratchpadStats:
+    """Verification counters for a scratchpad, updated as notes are appended.
+
+    Counts cover entries closed by a ``---`` separator; ``tail`` is the text after
+    the last separator, the only part an append can still change. Appending scans
+    just the tail and the new notes, so the gate no longer re-splits the whole
+    scratchpad every round. ``notes`` counts the scratchpad entries appended since
+    the last reset, so checking the stats against the entries is O(1).
+    """
+
+    notes: int = 0
+    length: int = 0
+    entries: int = 0
+    quant_rich: int = 0
+    web_entries: int = 0
+    tail: str = ""
+
+    @classmethod
+    def of(cls, scratchpad: str) -> ScratchpadStats:
+        return cls().append(scratchpad)
+
+    def append(self, notes: str) -> ScratchpadStats:
+        """Stats after ``handle_write`` appends ``notes`` (joined by a blank line)."""
+        if not notes and not self.length:
+            return replace(self, notes=self.notes + 1)
+        joiner = "\n\n" if self.length else ""
+        *closed, tail = f"{self.tail}{joiner}{notes}".split(_ENTRY_SEPARATOR)
+        closed = [e.strip() for e in closed if e.strip()]
+        return ScratchpadStats(
+            notes=self.notes + 1,
+            length=self.length + len(joiner) + len(notes),
+            entries=self.entries + len(closed),
+            quant_rich=self.quant_rich + sum(_is_quant_rich(e) for e in closed),
+            web_entries=self.web_entries + sum("Web Search" in e for e in closed),
+            tail=tail,
+        )
+
+    def apply(self, delta: list[dict[str, str]]) -> ScratchpadStats:
+        """Stats after ``merge_scratchpad`` applies a delta of entries."""
+        stats = self
+        for entry in delta:
+            stats = (
+                ScratchpadStats() if is_reset(entry) else stats.append(entry["text"])
+            )
+        return stats
+
+    def verify(self, web_search_only: bool = False) -> VerificationResult:
+        """Run the gate on the counters plus the open tail entry."""
+        tail = self.tail.strip()
+        checks = [
+            _check_source_count(self.entries + bool(tail)),
+            _check_quantitative_data(
+                self.quant_rich + (bool(tail) and _is_quant_rich(tail))
+            ),
+            _check_web_only(self.web_entries + ("Web Search" in tail), web_search_only),
+            _check_min_length(self.length),
+        ]
+        failures = [f for f in checks if f is not None]
+        return VerificationResult(passed=len(failures) == 0, failures=failures)
+
+
+def scratchpad_stats(
+    entries: list[dict[str, str]] | None, stats: object = None
+) -> ScratchpadStats:
+    """Return ``stats`` if they still describe ``entries``, else rebuild them."""
+    if isinstance(stats, ScratchpadStats) and stats.notes == len(entries or []):
+        return stats
+    return ScratchpadStats().apply(entries or [])
+
+
+def _check_source_count(entries: int) -> str | None:
+    if entries < 3:
+        return f"Insufficient sources: found {entries}, need at least 3"
     return None
 
 
-def _check_quantitative_data(entries: list[str]) -> str | None:
-    quant_rich = 0
-    for entry in entries:
-        if re.findall(r"\*\*QUANTITATIVE DATA\*\*:", entry):
-            data_points = re.findall(r"^\s*-\s+\[", entry, re.MULTILINE)
-            if len(data_points) >= 3:
-                quant_rich += 1
+def _check_quantitative_data(quant_rich: int) -> str | None:
     if quant_rich < 2:
         return f"Insufficient quantitative data: {quant_rich} entries with 3+ data points, need at least 2"
     return None
 
 
-def _check_web_only(entries: list[str], web_search_only: bool) -> str | None:
-    if web_search_only and any("Web Search" in e for e in entries):
+def _check_web_only(web_entries: int, web_search_only: bool) -> str | None:
+    if web_search_only and web_entries:
         return "Web-search-only sources present without PubMed/retriever fallback"
     return None
 
 
-def _check_min_length(scratchpad: str) -> str | None:
-    if len(scratchpad) < 500:
-        return f"Scratchpad too short: {len(scratchpad)} characters, minimum 500"
+def _check_min_length(length: int) -> str | None:
+    if length < 500:
+        return f"Scratchpad too short: {length} characters, minimum 500"
     return None
 
 
@@ -46,15 +122,7 @@ def verify_scratchpad(
     scratchpad: str, web_search_only: bool = False
 ) -> VerificationResult:
     """Verify scratchpad has sufficient evidence for synthesis."""
-    entries = [e.strip() for e in scratchpad.split("---") if e.strip()]
-    checks = [
-        _check_source_count(entries),
-        _check_quantitative_data(entries),
-        _check_web_only(entries, web_search_only),
-        _check_min_length(scratchpad),
-    ]
-    failures = [f for f in checks if f is not None]
-    return VerificationResult(passed=len(failures) == 0, failures=failures)
+    return ScratchpadStats.of(scratchpad).verify(web_search_only)
 
 
 def build_conservative_instruction(failures: list[str]) -> str:
@@ -31,19 +31,15 @@ Use the numbered sources below for inline citations. Cite as [N] where N is the
 """
 
 
+# Static Phase 1 rules. Kept free of per-section values so every research call
+# across all parallel sections shares the same prompt prefix, which the provider
+# can serve from its prompt cache.
 section_writer_prompt = """
 You are in Phase 1 of a two-phase medical report workflow.
 
 Collect evidence only. Do not draft the section.
 Use the fewest turns possible and avoid redundant searches.
-
-## Section Specification
-- **Section Name:** {name}
-- **Description:** {description}
-- **Audience Complexity:** {audience_complexity}
-- **Estimated Length:** {estimated_length}
-- **Dependencies:** {dependencies}
-- **Success Criteria:** {success_criteria}
+The section to research is specified in the first user message.
 
 ## Research Rules
 1. Prefer `pubmed_scraper_tool` as the first research tool when it can answer the topic.
@@ -52,7 +48,7 @@ Use the fewest turns possible and avoid redundant searches.
 4. If a tool returns no findings or no usable URL, skip `WriteToScratchpad` for that result and move to the next fallback step.
 5. If `pubmed_scraper_tool` fails, retry PubMed once with a broader query. If that also fails, fall back to `web_search` for live evidence and skip `retriever_tool` entirely since no FAISS index will exist.
 6. If PubMed succeeds, use `retriever_tool` after it to RAG against the persisted index for deeper per-source extraction.
-7. Use `ReadFromScratchpad` only after your final evidence-gathering step if you need a quick coverage check.
+7. Use `ReadFromScratchpad` only after your final evidence-gathering step if you need a quick coverage check: `query="all"` lists one line per entry; a keyword query returns the matching entries in full.
 8. Once the scratchpad has enough evidence, stop requesting tools. The orchestrator will move to synthesis automatically.
 9. Never output a completion banner. Never write the final section in Phase 1.
 10. A scratchpad entry with fewer than 3 quantitative data points is incomplete; re-read the source and extract more before moving on.
@@ -83,8 +79,21 @@ For every source with usable evidence:
 """
 
 
+section_spec_prompt = """
+## Section Specification
+- **Section Name:** {name}
+- **Description:** {description}
+- **Audience Complexity:** {audience_complexity}
+- **Estimated Length:** {estimated_length}
+- **Dependencies:** {dependencies}
+- **Success Criteria:** {success_criteria}
+
+Research this section following the Phase 1 rules.
+"""
+
+
 def get_initial_prompt(section):
-    return section_writer_prompt.format(
+    return section_spec_prompt.format(
         name=section.name,
         description=section.description,
         audience_complexity=section.audience_complexity,
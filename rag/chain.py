@@ -8,6 +8,8 @@ from langchain_core.prompts import PromptTemplate
 from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 from langchain_deepseek import ChatDeepSeek
 
+from utils.llm_cache import cached_model_kwargs
+
 
 @dataclass
 class RAGOutput:
@@ -37,7 +39,9 @@ class RAGOutput:
                 self.prompt_template = PromptTemplate.from_template(
                     "Question:\n{question}\n\nContext:\n{context}\n"
                 )
-            self.llm_instance = ChatDeepSeek(model=self.llm_model)
+            self.llm_instance = ChatDeepSeek(
+                model=self.llm_model, **cached_model_kwargs()
+            )
         except Exception as e:
             raise RuntimeError(f"Failed to initialize RAG: {e}") from e
 
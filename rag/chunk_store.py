@@ -0,0 +1,152 @@
+"""Columnar article metadata for the retrieval index.
+
+Chunking copies each article's metadata (title, authors, keywords, journal and
+the long ``References`` string) into every chunk, and the FAISS docstore and the
+BM25 retriever then hold and pickle one copy per chunk. ``ArticleStore`` keeps
+that metadata once per article, as one NumPy object column per field with
+repeated values interned. Indexed chunks carry only ``{"article_id": i}``.
+``ChunkDocstore`` stores them for FAISS as a list of texts plus an int array of
+article ids, creating a Document only when a search hit is looked up.
+``HydrateMetadata`` is the last stage of the retriever pipeline and fills in the
+article metadata for the final top-n results only.
+"""
+
+import sys
+from array import array
+from collections.abc import Sequence
+
+import numpy as np
+from langchain_community.docstore.base import AddableMixin, Docstore
+from langchain_core.callbacks import Callbacks
+from langchain_core.documents import BaseDocumentCompressor, Document
+from pydantic import ConfigDict
+
+ARTICLE_ID = "article_id"
+_NO_ARTICLE = -1
+
+
+class ArticleStore:
+    """Article metadata by column; ``""`` marks a field the article lacks."""
+
+    __slots__ = ("_columns", "_size")
+
+    def __init__(self, columns: dict[str, np.ndarray], size: int):
+        self._columns = columns
+        self._size = size
+
+    @classmethod
+    def from_documents(
+        cls, documents: Sequence[Document]
+    ) -> tuple["ArticleStore", list[Document]]:
+        """Split ``documents`` into a store and slim copies that reference it."""
+        fields = list(dict.fromkeys(key for d in documents for key in d.metadata))
+        columns = {field: np.full(len(documents), "", dtype=object) for field in fields}
+        slim = []
+        for article_id, document in enumerate(documents):
+            for field, value in document.metadata.items():
+                columns[field][article_id] = (
+                    sys.intern(value) if isinstance(value, str) else value
+                )
+            slim.append(
+                Document(
+                    page_content=document.page_content,
+                    metadata={ARTICLE_ID: article_id},
+                )
+            )
+        return cls(columns, len(documents)), slim
+
+    def __len__(self) -> int:
+        return self._size
+
+    def metadata(self, article_id: int) -> dict:
+        """The article's metadata as ``load_documents_from_csv`` produced it."""
+        return {
+            field: value
+            for field, column in self._columns.items()
+            if (value := column[article_id]) != ""
+        }
+
+    def hydrate(self, documents: Sequence[Document]) -> list[Document]:
+        """Copies of ``documents`` with their article's metadata filled in.
+
+        Chunk-level keys (such as ``relevance_score``) win over article fields;
+        documents without an ``article_id`` are returned unchanged.
+        """
+        hydrated = []
+        for document in documents:
+            article_id = document.metadata.get(ARTICLE_ID)
+            if article_id is None or not 0 <= article_id < self._size:
+                hydrated.append(document)
+                continue
+            metadata = {**self.metadata(article_id), **document.metadata}
+            hydrated.append(
+                Document(page_content=document.page_content, metadata=metadata)
+            )
+        return hydrated
+
+
+class ChunkDocstore(Docstore, AddableMixin):
+    """FAISS docstore holding chunk text and article ids instead of Documents.
+
+    Metadata other than ``article_id`` is kept per chunk, so any Document
+    round-trips; chunks from ``ArticleStore.from_documents`` have none.
+    """
+
+    def __init__(self):
+        self._positions: dict[str, int] = {}
+        self._texts: list[str] = []
+        self._article_ids = array("i")
+        self._extra: dict[int, dict] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def add(self, texts: dict[str, Document]) -> None:
+        overlapping = set(texts).intersection(self._positions)
+        if overlapping:
+            raise ValueError(f"Tried to add ids that already exist: {overlapping}")
+        for doc_id, document in texts.items():
+            position = len(self._texts)
+            extra = dict(document.metadata)
+            article_id = extra.pop(ARTICLE_ID, _NO_ARTICLE)
+            self._positions[doc_id] = position
+            self._texts.append(document.page_content)
+            self._article_ids.append(article_id)
+            if extra:
+                self._extra[position] = extra
+
+    def delete(self, ids: list) -> None:
+        missing = set(ids).difference(self._positions)
+        if missing:
+            raise ValueError(f"Tried to delete ids that do not exist: {missing}")
+        for doc_id in ids:
+            position = self._positions.pop(doc_id)
+            self._texts[position] = ""
+            self._extra.pop(position, None)
+
+    def search(self, search: str) -> str | Document:
+        position = self._positions.get(search)
+        if position is None:
+            return f"ID {search} not found."
+        metadata = dict(self._extra.get(position, {}))
+        if (article_id := self._article_ids[position]) != _NO_ARTICLE:
+            metadata[ARTICLE_ID] = article_id
+        return Document(
+            id=search, page_content=self._texts[position], metadata=metadata
+        )
+
+
+class HydrateMetadata(BaseDocumentCompressor):
+    """Pipeline stage that attaches article metadata to the final documents."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    store: ArticleStore
+
+    def compress_documents(
+        self,
+        documents: Sequence[Document],
+        query: str,
+        callbacks: Callbacks | None = None,
+    ) -> list[Document]:
+        return self.store.hydrate(documents)
@@ -0,0 +1,85 @@
+"""Query-focused extractive compression of web page text.
+
+Tavily's ``raw_content`` is the whole page: navigation, cookie banners, link
+lists and footers around a few paragraphs that answer the search. Before that
+text reaches the research prompt, ``compress_to_query`` splits it into
+sentences, drops boilerplate fragments, ranks the rest against the search query
+with BM25 and keeps the best sentences, in their original order, within a token
+budget. Skipped stretches are marked with ``[...]`` so the extract does not read
+as continuous text. Table rows count as content when they mention a query term,
+and a page with no prose left is cut to the budget instead of dropped.
+"""
+
+import re
+
+from utils.bm25 import BM25, tokenize
+from utils.tokens import count_tokens, truncate_to_tokens
+
+GAP_MARKER = "[...]"
+# Fragments shorter than this are headings, menu items or captions.
+_MIN_WORDS = 6
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_MARKDOWN_LINK = re.compile(r"!?\[[^\]]*\]\([^)]*\)")
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split ``text`` into sentences; line breaks always end a sentence."""
+    sentences = []
+    for line in text.splitlines():
+        sentences.extend(s.strip() for s in _SENTENCE_SPLIT.split(line) if s.strip())
+    return sentences
+
+
+def _is_boilerplate(sentence: str, query_terms: set[str]) -> bool:
+    """Menu items, link lists and table rules rather than prose.
+
+    Pipe-delimited rows are kept when they mention a query term: a results table
+    row is evidence even though it is not a sentence.
+    """
+    prose = _MARKDOWN_LINK.sub(" ", sentence)
+    if prose.count("|") >= 2:
+        return query_terms.isdisjoint(tokenize(prose))
+    if len(prose.split()) < _MIN_WORDS:
+        return True
+    return len(prose) < len(sentence) // 2
+
+
+def compress_to_query(text: str, query: str, token_budget: int) -> str:
+    """Keep the sentences of ``text`` that best match ``query`` within the budget.
+
+    Sentences that do not match the query at all fill any remaining budget in page
+    order, so a page whose wording differs from the query still keeps its lead.
+    Text already within the budget is returned unchanged, and text that is all
+    boilerplate is cut to the budget at a sentence boundary.
+    """
+    if not text or count_tokens(text) <= token_budget:
+        return text
+    query_terms = set(tokenize(query))
+    sentences = [
+        s for s in split_sentences(text) if not _is_boilerplate(s, query_terms)
+    ]
+    if not sentences:
+        return truncate_to_tokens(text, token_budget, marker=f" {GAP_MARKER}")
+
+    scores = BM25(sentences).scores(query)
+    ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))
+    gap_tokens = count_tokens(f" {GAP_MARKER} ")
+    kept: list[int] = []
+    used = 0
+    for index in ranked:
+        size = count_tokens(sentences[index]) + gap_tokens
+        if used + size > token_budget:
+            continue
+        kept.append(index)
+        used += size
+
+    parts: list[str] = []
+    previous = -1
+    for index in sorted(kept):
+        if index != previous + 1:
+            parts.append(GAP_MARKER)
+        parts.append(sentences[index])
+        previous = index
+    if previous != len(sentences) - 1:
+        parts.append(GAP_MARKER)
+    return " ".join(parts)
@@ -1,15 +1,24 @@
 import os
 from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
 
-from fastembed import TextEmbedding
 from langchain_core.embeddings import Embeddings
 
+if TYPE_CHECKING:
+    from fastembed import TextEmbedding
+
+
+def _text_embedding(**kwargs) -> "TextEmbedding":
+    from fastembed import TextEmbedding
+
+    return TextEmbedding(**kwargs)
+
 
 @dataclass
 class FastEmbed(Embeddings):
     """FastEmbed wrapper for LangChain compatibility."""
 
-    fe: TextEmbedding = field(default_factory=TextEmbedding)
+    fe: "TextEmbedding" = field(default_factory=_text_embedding)
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         return [emb.tolist() for emb in self.fe.embed(texts)]
@@ -23,5 +32,5 @@ def initialize_embeddings(
     cache_dir: str = "~/.cache/fastembed",
 ) -> FastEmbed:
     return FastEmbed(
-        TextEmbedding(model_name=model_name, cache_dir=os.path.expanduser(cache_dir))
+        _text_embedding(model_name=model_name, cache_dir=os.path.expanduser(cache_dir))
     )
@@ -1,11 +1,12 @@
 import os
+from collections import OrderedDict
 from collections.abc import Sequence
+from functools import lru_cache
 from hashlib import sha256
 from pathlib import Path
 from typing import Any
 
 import numpy as np
-from fastembed.rerank.cross_encoder import TextCrossEncoder
 from langchain_classic.retrievers import (
     ContextualCompressionRetriever,
     EnsembleRetriever,
@@ -22,16 +23,21 @@ from langchain_core.embeddings import Embeddings
 from loguru import logger
 from pydantic import ConfigDict, Field
 
-from config import AppConfig, RetrieverConfig
-from rag.embeddings import initialize_embeddings
+from config import RetrieverConfig, config
+from rag.chunk_store import ArticleStore, ChunkDocstore, HydrateMetadata
+from rag.embeddings import FastEmbed, initialize_embeddings
 from utils.data_processing import (
     batch_process,
     load_documents_from_csv,
     split_documents,
 )
+from utils.near_dedup import drop_near_duplicates
 
-config = AppConfig()
-RETRIEVAL_INDEX_VERSION = "v2"
+RETRIEVAL_INDEX_VERSION = "v4"
+RETRIEVER_CACHE_SIZE = 8
+
+# Retrievers keyed by dataset fingerprint, shared by every run in the process
+_retriever_cache: OrderedDict[str, Any] = OrderedDict()
 
 
 def _resolve_csv_path(csv_path: str | None, default_csv_path: str) -> str:
@@ -52,6 +58,16 @@ def _dataset_hash(csv_path: str) -> str:
     return sha256(fingerprint.encode()).hexdigest()[:16]
 
 
+@lru_cache(maxsize=4)
+def _load_cross_encoder(model_name: str, cache_dir: str):
+    # Imported here so that importing the retriever does not load ONNX Runtime.
+    from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+    return TextCrossEncoder(
+        model_name=model_name, cache_dir=os.path.expanduser(cache_dir)
+    )
+
+
 def _filter_empty_documents(documents: Sequence[Document]) -> list[Document]:
     valid = [d for d in documents if d.page_content.strip()]
     if removed := len(documents) - len(valid):
@@ -59,6 +75,20 @@ def _filter_empty_documents(documents: Sequence[Document]) -> list[Document]:
     return valid
 
 
+def _drop_near_duplicate_chunks(
+    documents: list[Document], threshold: float | None
+) -> list[Document]:
+    unique = drop_near_duplicates(documents, lambda d: d.page_content, threshold)
+    if removed := len(documents) - len(unique):
+        logger.info(f"Skipping {removed} near-duplicate chunks")
+    return unique
+
+
+def _docstore_kwargs(slim: bool) -> dict[str, Any]:
+    # Chunks that only reference an ArticleStore need no Document per chunk.
+    return {"docstore": ChunkDocstore()} if slim else {}
+
+
 class FastEmbedRerank(BaseDocumentCompressor):
     """Cross-encoder reranker using FastEmbed."""
 
@@ -67,15 +97,12 @@ class FastEmbedRerank(BaseDocumentCompressor):
     model_name: str = Field(default="Xenova/ms-marco-miniLM-L-6-v2")
     cache_dir: str = Field(default="~/.cache/fastembed")
     top_n: int = Field(default=5)
-    encoder: TextCrossEncoder | None = Field(default=None)
+    encoder: Any | None = Field(default=None)
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         if self.encoder is None:
-            self.encoder = TextCrossEncoder(
-                model_name=self.model_name,
-                cache_dir=os.path.expanduser(self.cache_dir),
-            )
+            self.encoder = _load_cross_encoder(self.model_name, self.cache_dir)
 
     def compress_documents(
         self,
@@ -114,21 +141,31 @@ def build_retriever(
     embeddings: Embeddings,
     retriever_config: RetrieverConfig | None = None,
     persist_directory: str | None = None,
+    article_store: ArticleStore | None = None,
 ) -> ContextualCompressionRetriever | Any:
     """Build ensemble retriever with compression pipeline, falling back to dense-only on
-    error."""
+    error.
+
+    With an ``article_store``, chunks hold only an article id and the final results
+    are hydrated with their article metadata.
+    """
     cfg = retriever_config or RetrieverConfig()
+    slim = article_store is not None
+    hydrators = [HydrateMetadata(store=article_store)] if slim else []
 
     if not splitted_documents:
         raise ValueError("No documents provided")
     docs = _filter_empty_documents(splitted_documents)
     if not docs:
         raise ValueError("No non-empty documents available")
+    docs = _drop_near_duplicate_chunks(docs, cfg.chunk_near_duplicate_threshold)
 
     persist_dir = persist_directory or cfg.paths.faiss_index_dir
 
     try:
-        vector_store = batch_process(docs, embeddings, persist_directory=persist_dir)
+        vector_store = batch_process(
+            docs, embeddings, persist_directory=persist_dir, **_docstore_kwargs(slim)
+        )
         ensemble = EnsembleRetriever(
             retrievers=[
                 BM25Retriever.from_documents(docs, k=cfg.k),
@@ -149,6 +186,7 @@ def build_retriever(
                     cache_dir=cfg.reranker_cache_dir,
                     top_n=cfg.top_n,
                 ),
+                *hydrators,
             ]
         )
         return ContextualCompressionRetriever(
@@ -157,20 +195,56 @@ def build_retriever(
 
     except Exception as e:
         logger.error(f"Retriever build failed ({e}); falling back to dense retriever")
-        vector_store = batch_process(docs, embeddings, persist_directory=persist_dir)
-        return vector_store.as_retriever(search_kwargs={"k": cfg.k})
+        vector_store = batch_process(
+            docs, embeddings, persist_directory=persist_dir, **_docstore_kwargs(slim)
+        )
+        dense = vector_store.as_retriever(search_kwargs={"k": cfg.k})
+        if not hydrators:
+            return dense
+        return ContextualCompressionRetriever(
+            base_compressor=hydrators[0], base_retriever=dense
+        )
 
 
-def get_retriever(csv_path: str | None = None) -> ContextualCompressionRetriever:
-    embeddings = initialize_embeddings(
+@lru_cache(maxsize=1)
+def get_embeddings() -> FastEmbed:
+    """Return the embedding model shared by every retriever in the process."""
+    return initialize_embeddings(
         model_name=config.model.embedding_model,
         cache_dir=config.model.embedding_cache_dir,
     )
+
+
+def clear_retriever_cache() -> None:
+    _retriever_cache.clear()
+
+
+def get_retriever(csv_path: str | None = None) -> ContextualCompressionRetriever:
     resolved = _resolve_csv_path(csv_path, config.paths.default_csv_path)
+    cache_key = _dataset_hash(resolved) if Path(resolved).exists() else None
+    if cache_key and cache_key in _retriever_cache:
+        _retriever_cache.move_to_end(cache_key)
+        logger.info(f"Reusing cached retriever for {resolved}")
+        return _retriever_cache[cache_key]
+
+    embeddings = get_embeddings()
     logger.info("Loading and splitting documents...")
-    docs = split_documents(load_documents_from_csv(resolved), embeddings)
-    logger.info(f"Created {len(docs)} document chunks")
+    articles, documents = ArticleStore.from_documents(load_documents_from_csv(resolved))
+    docs = split_documents(documents, embeddings)
+    logger.info(f"Created {len(docs)} chunks from {len(articles)} articles")
     persist_dir = config.paths.faiss_index_dir
-    return build_retriever(
-        docs, embeddings, config.retriever, persist_directory=persist_dir
+    if cache_key:
+        persist_dir = os.path.join(persist_dir, cache_key)
+    retriever = build_retriever(
+        docs,
+        embeddings,
+        config.retriever,
+        persist_directory=persist_dir,
+        article_store=articles,
     )
+
+    if cache_key:
+        _retriever_cache[cache_key] = retriever
+        while len(_retriever_cache) > RETRIEVER_CACHE_SIZE:
+            _retriever_cache.popitem(last=False)
+    return retriever
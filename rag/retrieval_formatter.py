@@ -1,12 +1,40 @@
-from collections import defaultdict
+from collections import Counter, defaultdict
 from datetime import datetime
 
+from utils.tokens import count_tokens, truncate_to_tokens
+
+# A chunk that would only fit as a stub is dropped rather than truncated.
+_MIN_PARTIAL_TOKENS = 80
+
+
+def _score(chunk: dict) -> float:
+    try:
+        return float(chunk["relevance_score"])
+    except (TypeError, ValueError):
+        return float("-inf")
 
-class RetrieverReportGenerator:
-    """Generates structured reports from retriever results."""
 
-    def __init__(self, report_title: str = "Research Findings Report"):
+class RetrieverReportGenerator:
+    """Generates structured reports from retriever results.
+
+    The report goes straight into the research loop's message history, so it can
+    be bounded: ``token_budget`` caps the whole report, ``max_chunks_per_doc`` and
+    ``max_doc_tokens`` cap each document. Chunks are admitted in relevance-score
+    order, so the lowest-scoring chunks are the ones dropped; documents are laid
+    out best-first. ``None`` leaves a limit off.
+    """
+
+    def __init__(
+        self,
+        report_title: str = "Research Findings Report",
+        token_budget: int | None = None,
+        max_chunks_per_doc: int | None = None,
+        max_doc_tokens: int | None = None,
+    ):
         self.report_title = report_title
+        self.token_budget = token_budget
+        self.max_chunks_per_doc = max_chunks_per_doc
+        self.max_doc_tokens = max_doc_tokens
 
     def _process_retriever_results(self, results: list) -> dict[str, list[dict]]:
         grouped_docs = defaultdict(list)
@@ -47,61 +75,137 @@ class RetrieverReportGenerator:
             "multichunk_docs": multichunk_docs,
         }
 
-    def _generate_markdown_report(self, grouped_docs: dict) -> str:
-        markdown = (
-            f"# {self.report_title}\n"
-            f"*Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}*\n\n"
-            f"**Summary:**\n"
-            f"- Total unique documents: {len(grouped_docs)}\n"
-            f"- Total chunks processed: {sum(len(chunks) for chunks in grouped_docs.values())}\n\n"
-            "---\n\n"
+    @staticmethod
+    def _doc_header(doc_num: int, chunks: list[dict], found: int) -> str:
+        first_chunk = chunks[0]
+        shown = f" (showing {len(chunks)})" if len(chunks) < found else ""
+        return (
+            f"## {doc_num}. {first_chunk['title']}\n"
+            f"**Authors:** {first_chunk['authors'] or 'Not Specified'}  \n"
+            f"**Publication Date:** {first_chunk['pub_date'] or 'Not specified'}  \n"
+            f"**URL:** {first_chunk['url']}  \n"
+            f"**References:** {first_chunk['references'] or 'Not available'}  \n"
+            f"**Chunks found:** {found}{shown}\n\n"
+            f"### Content:\n\n"
         )
 
-        for doc_num, (_, chunks) in enumerate(grouped_docs.items(), 1):
-            first_chunk = chunks[0]
-            markdown += (
-                f"## {doc_num}. {first_chunk['title']}\n"
-                f"**Authors:** {first_chunk['authors'] or 'Not Specified'}  \n"
-                f"**Publication Date:** {first_chunk['pub_date'] or 'Not specified'}  \n"
-                f"**URL:** {first_chunk['url']}  \n"
-                f"**References:** {first_chunk['references'] or 'Not available'}  \n"
-                f"**Chunks found:** {len(chunks)}\n\n"
-                f"### Content:\n\n"
+    @staticmethod
+    def _chunk_block(chunk: dict, multichunk: bool) -> str:
+        if multichunk:
+            return (
+                f"**Chunk {chunk['chunk_id']} (Score: {chunk['relevance_score']}):**"
+                f"\n\n{chunk['content']}\n\n---\n\n"
             )
+        return (
+            f"**Relevance Score:** {chunk['relevance_score']}\n\n{chunk['content']}\n\n"
+        )
 
-            for chunk in chunks:
-                if len(chunks) > 1:
-                    markdown += f"**Chunk {chunk['chunk_id']} (Score: {chunk['relevance_score']}):**\n\n"
-                else:
-                    markdown += f"**Relevance Score:** {chunk['relevance_score']}\n\n"
-                markdown += f"{chunk['content']}\n\n"
-                if len(chunks) > 1:
-                    markdown += "---\n\n"
-
-            markdown += "\n"
-
-        return markdown
-
-    def create_report(self, results: list) -> dict[str, object]:
-        grouped_docs = self._process_retriever_results(results)
-        stats = self._generate_summary_stats(grouped_docs)
-        markdown_report = self._generate_markdown_report(grouped_docs)
-
-        stats_section = (
+    def _select_chunks(self, grouped_docs: dict) -> dict[str, list[dict]]:
+        """Admit chunks best-score-first until the report or document caps are hit.
+
+        Returns the admitted chunks per document, documents ordered by their best
+        chunk and chunks by score; truncated chunks are copies.
+        """
+        candidates = []
+        for doc_key, chunks in grouped_docs.items():
+            ranked = sorted(chunks, key=_score, reverse=True)
+            candidates.extend((doc_key, c) for c in ranked[: self.max_chunks_per_doc])
+        candidates.sort(key=lambda pair: _score(pair[1]), reverse=True)
+
+        selected: dict[str, list[dict]] = {}
+        doc_tokens: Counter[str] = Counter()
+        used = 0
+        for doc_key, chunk in candidates:
+            content = chunk["content"]
+            if self.max_doc_tokens is not None:
+                room = self.max_doc_tokens - doc_tokens[doc_key]
+                if room < _MIN_PARTIAL_TOKENS:
+                    continue
+                content = truncate_to_tokens(content, room)
+            overhead = count_tokens(self._chunk_block({**chunk, "content": ""}, True))
+            if doc_key not in selected:
+                overhead += count_tokens(self._doc_header(0, [chunk], 1))
+            tokens = count_tokens(content)
+            if self.token_budget is not None and used + overhead + tokens > (
+                self.token_budget
+            ):
+                room = self.token_budget - used - overhead
+                if room < _MIN_PARTIAL_TOKENS:
+                    break
+                content = truncate_to_tokens(content, room)
+                tokens = count_tokens(content)
+            if content is not chunk["content"]:
+                chunk = {**chunk, "content": content}
+            selected.setdefault(doc_key, []).append(chunk)
+            doc_tokens[doc_key] += tokens
+            used += overhead + tokens
+        return selected
+
+    @staticmethod
+    def _stats_section(stats: dict) -> str:
+        totals = (
             "## Report Statistics\n\n"
             f"- **Total Documents:** {stats['total_docs']}\n"
-            f"- **Total Chunks:** {stats['total_chunks']}\n\n"
-            "### Documents with Multiple Chunks:\n"
+            f"- **Total Chunks:** {stats['total_chunks']}\n"
         )
-
+        parts = [totals]
+        if stats["omitted_chunks"]:
+            parts.append(
+                f"- **Chunks omitted (lowest scores, token budget):** "
+                f"{stats['omitted_chunks']}\n"
+            )
+        parts.append("\n### Documents with Multiple Chunks:\n")
         if stats["multichunk_docs"]:
             for doc_key, chunk_count in stats["multichunk_docs"]:
                 display_key = doc_key[:60] + "..." if len(doc_key) > 60 else doc_key
-                stats_section += f"- {display_key}: {chunk_count} chunks\n"
+                parts.append(f"- {display_key}: {chunk_count} chunks\n")
         else:
-            stats_section += "- None (all documents had single chunks)\n"
+            parts.append("- None (all documents had single chunks)\n")
+        return "".join(parts)
 
-        # Insert stats right after the summary
-        markdown_report = markdown_report.replace("---\n", f"{stats_section}\n---\n", 1)
+    def _generate_markdown_report(
+        self, grouped_docs: dict, selected: dict, stats: dict
+    ) -> str:
+        summary = (
+            f"# {self.report_title}\n"
+            f"*Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}*\n\n"
+            f"**Summary:**\n"
+            f"- Total unique documents: {stats['total_docs']}\n"
+            f"- Total chunks processed: {stats['total_chunks']}\n\n"
+        )
+        parts = [summary, self._stats_section(stats), "\n---\n\n"]
+
+        for doc_num, (doc_key, chunks) in enumerate(selected.items(), 1):
+            parts.append(self._doc_header(doc_num, chunks, len(grouped_docs[doc_key])))
+            parts.extend(self._chunk_block(c, len(chunks) > 1) for c in chunks)
+            parts.append("\n")
+
+        return "".join(parts)
+
+    @staticmethod
+    def _source_records(grouped_docs: dict) -> list[dict[str, str]]:
+        return [
+            {
+                "url": chunks[0]["url"],
+                "title": chunks[0]["title"],
+                "authors": chunks[0]["authors"] or "",
+            }
+            for chunks in grouped_docs.values()
+            if chunks[0]["url"] != "No URL Available"
+        ]
 
-        return {"markdown": markdown_report, "documents": grouped_docs, "stats": stats}
+    def create_report(self, results: list) -> dict[str, object]:
+        grouped_docs = self._process_retriever_results(results)
+        selected = self._select_chunks(grouped_docs)
+        stats = self._generate_summary_stats(grouped_docs)
+        stats["omitted_chunks"] = stats["total_chunks"] - sum(
+            len(chunks) for chunks in selected.values()
+        )
+
+        return {
+            "markdown": self._generate_markdown_report(grouped_docs, selected, stats),
+            "documents": grouped_docs,
+            "stats": stats,
+            # Only documents that made it into the report can be cited from it.
+            "sources": self._source_records(selected),
+        }
@@ -1,16 +1,41 @@
 from dataclasses import dataclass
 
-from IPython.display import Markdown, display
 from loguru import logger
 from typing_extensions import Any
 
+from rag.compression import compress_to_query
+from utils.near_dedup import NearDuplicateIndex, drop_near_duplicates
+from utils.tokens import MAX_CHARS_PER_TOKEN, count_tokens, truncate_to_tokens
+
+
+_TRUNCATION_MARKER = "... [content truncated]"
+
 
 @dataclass
 class SourceFormatter:
-    max_tokens_per_source: int = 1000
+    """Deduplicate search results by URL and format them for the research prompt.
+
+    Raw page content shares one ``total_token_budget`` per
+    ``deduplicate_and_format_sources`` call: sources shorter than an equal share
+    hand their surplus to longer ones, and no source gets more than
+    ``max_tokens_per_source``. Content is cut at a sentence boundary, measured
+    with the local tokenizer (``utils.tokens``). ``None`` leaves a limit off.
+
+    With a ``query``, each page is first reduced to its ``extract_tokens_per_source``
+    best-matching sentences (``rag.compression``), so the budget is spent on
+    evidence rather than page chrome. ``near_duplicate_threshold`` also drops
+    sources whose text nearly repeats an earlier one (syndicated copies, mirrors);
+    with a ``near_duplicate_index``, earlier calls' sources count as well.
+    """
+
+    max_tokens_per_source: int | None = 2000
     include_raw_content: bool = True
-    chars_per_token: int = 5
+    total_token_budget: int | None = 5000
     markdown_output: bool = False
+    query: str | None = None
+    extract_tokens_per_source: int | None = 600
+    near_duplicate_threshold: float | None = None
+    near_duplicate_index: NearDuplicateIndex | None = None
 
     @staticmethod
     def _extract_sources_list(
@@ -35,30 +60,56 @@ class SourceFormatter:
             )
 
     @staticmethod
-    def _truncate_content(content: str, char_limit: int = 4000) -> str:
-        """Truncate content to specified character limit."""
+    def _truncate_content(content: str, token_limit: int | None) -> str:
+        """Truncate content to ``token_limit`` tokens at a sentence boundary."""
         if not content:
             return "No content available"
-        if len(content) <= char_limit:
+        if token_limit is None:
             return content
-        truncate_point = content.rfind(" ", 0, char_limit)
-        if (
-            truncate_point == -1 or truncate_point < char_limit * 0.8
-        ):  # Returns -1 if not found, check if the " " occurs before the 80% of the char_limit
-            truncate_point = char_limit
-        return content[:truncate_point].rstrip() + "... [content truncated]"
+        return truncate_to_tokens(content, token_limit, marker=_TRUNCATION_MARKER)
+
+    def _allocate_tokens(self, raw_contents: list[str]) -> list[int | None]:
+        """Split the call's budget across sources, smallest needs first.
+
+        Each source is offered an equal share of what is left; one that needs less
+        takes only what it needs, so later (longer) sources get more.
+        """
+        cap = self.max_tokens_per_source
+        if self.total_token_budget is None:
+            return [cap] * len(raw_contents)
+
+        bound = cap if cap is not None else self.total_token_budget
+        needs = [
+            min(count_tokens(raw[: bound * MAX_CHARS_PER_TOKEN]), bound)
+            for raw in raw_contents
+        ]
+        shares: list[int | None] = [0] * len(needs)
+        remaining = self.total_token_budget
+        order = sorted(range(len(needs)), key=needs.__getitem__)
+        for position, index in enumerate(order):
+            shares[index] = min(needs[index], remaining // (len(order) - position))
+            remaining -= shares[index]
+        return shares
+
+    def _extract(self, raw_content: str) -> str:
+        """Query-focused extract of ``raw_content``, or the content unchanged."""
+        if not (self.query and self.extract_tokens_per_source and raw_content):
+            return raw_content
+        return compress_to_query(
+            raw_content, self.query, self.extract_tokens_per_source
+        )
 
     def _format_single_source(
         self,
         source: dict[str, Any],
         index: int,
-        char_limit: int,
+        raw_content: str,
+        token_limit: int | None,
     ) -> str:
         """Format a single source for display."""
         title = source.get("title", "Untitled Source")
         url = source.get("url", "No URL available")
         content = source.get("content", "No content summary available")
-        raw_content = source.get("raw_content", "")
 
         if self.markdown_output:
             lines = [
@@ -75,18 +126,20 @@ class SourceFormatter:
 
         if self.include_raw_content:
             if raw_content:
-                truncated_content = self._truncate_content(raw_content, char_limit)
-                token_estimate = char_limit // 4
+                truncated_content = self._truncate_content(raw_content, token_limit)
+                limit = (
+                    "full"
+                    if token_limit is None
+                    else f"limited to ~{token_limit} tokens"
+                )
+                if raw_content != source.get("raw_content"):
+                    limit = f"query-focused extract, {limit}"
 
                 if self.markdown_output:
-                    lines.append(
-                        f"**Full content** (Limited to ~{token_estimate} tokens):"
-                    )
+                    lines.append(f"**Full content** ({limit}):")
                     lines.append(f"```\n{truncated_content}\n```")
                 else:
-                    lines.append(
-                        f"Full source content (limited to ~{token_estimate} tokens):"
-                    )
+                    lines.append(f"Full source content ({limit}):")
                     lines.append(truncated_content)
             else:
                 warning = "No raw content available for this source"
@@ -98,23 +151,68 @@ class SourceFormatter:
 
         return "\n\n".join(lines)
 
-    def _format_unique_sources(
-        self,
-        unique_sources: dict[str, dict[str, Any]],
-        max_tokens_per_source: int,
-        chars_per_token: int,
-    ) -> str:
+    def _format_unique_sources(self, unique_sources: dict[str, dict[str, Any]]) -> str:
         """Format unique sources for display."""
-        char_limit = chars_per_token * max_tokens_per_source
-        formatted_sections = []
-        for i, (url, source) in enumerate(unique_sources.items(), 1):
-            section = self._format_single_source(source, i, char_limit)
-            formatted_sections.append(section)
+        sources = list(unique_sources.values())
+        raw_contents = [source.get("raw_content") or "" for source in sources]
+        token_limits: list[int | None] = [self.max_tokens_per_source] * len(sources)
+        if self.include_raw_content:
+            raw_contents = [self._extract(raw) for raw in raw_contents]
+            token_limits = self._allocate_tokens(raw_contents)
+        formatted_sections = [
+            self._format_single_source(source, i, raw, limit)
+            for i, (source, raw, limit) in enumerate(
+                zip(sources, raw_contents, token_limits, strict=True), 1
+            )
+        ]
 
         header = "# Sources\n\n" if self.markdown_output else "Sources:\n\n"
         separator = "\n---\n\n" if self.markdown_output else "\n" + "=" * 50 + "\n\n"
         return header + separator.join(formatted_sections)
 
+    def _unique_sources(
+        self, search_response: dict[str, Any] | list
+    ) -> dict[str, dict[str, Any]]:
+        """First source per URL, then the first of each near-duplicate group."""
+        unique_sources: dict[str, dict[str, Any]] = {}
+        for source in self._extract_sources_list(search_response):
+            url = source.get("url")
+            if url and url not in unique_sources:
+                unique_sources[url] = source
+        if self.near_duplicate_threshold is None:
+            return unique_sources
+        kept = drop_near_duplicates(
+            unique_sources.items(),
+            lambda item: item[1].get("raw_content") or item[1].get("content") or "",
+            self.near_duplicate_threshold,
+            self.near_duplicate_index,
+        )
+        return dict(kept)
+
+    def source_records(
+        self, search_response: dict[str, Any] | list
+    ) -> list[dict[str, str]]:
+        """Return ``{"url", "title", "authors"}`` for each unique source, in order."""
+        return self._records(self._unique_sources(search_response))
+
+    @staticmethod
+    def _records(unique_sources: dict[str, dict[str, Any]]) -> list[dict[str, str]]:
+        return [
+            {"url": url, "title": source.get("title") or "", "authors": ""}
+            for url, source in unique_sources.items()
+        ]
+
+    def format_with_records(
+        self, search_response: dict[str, Any] | list
+    ) -> tuple[str, list[dict[str, str]]]:
+        """Formatted output and source records from one deduplication pass.
+
+        A shared ``near_duplicate_index`` remembers every source it is shown, so
+        a second pass over the same response would drop them all.
+        """
+        unique_sources = self._unique_sources(search_response)
+        return self._render(unique_sources), self._records(unique_sources)
+
     def deduplicate_and_format_sources(
         self,
         search_response: dict[str, Any] | list,
@@ -123,29 +221,23 @@ class SourceFormatter:
         """Extract, deduplicate by URL, and format sources for display."""
         logger.info("Processing sources for deduplication and formatting")
 
-        unique_sources = {}
-        sources_list = self._extract_sources_list(search_response)
-
-        for source in sources_list:
-            url = source.get("url")
-            if url and url not in unique_sources:
-                unique_sources[url] = source
-
+        unique_sources = self._unique_sources(search_response)
         logger.info(f"Found {len(unique_sources)} unique sources")
 
         if return_dict:
             return unique_sources
+        return self._render(unique_sources)
 
+    def _render(self, unique_sources: dict[str, dict[str, Any]]) -> str:
         if not unique_sources:
             return "No unique sources found after deduplication"
 
-        formatted_output = self._format_unique_sources(
-            unique_sources,
-            self.max_tokens_per_source,
-            self.chars_per_token,
-        )
+        formatted_output = self._format_unique_sources(unique_sources)
 
         if self.markdown_output:
+            # Notebook-only output; keep IPython off the import path.
+            from IPython.display import Markdown, display
+
             return display(Markdown(formatted_output))  # type: ignore
 
         return formatted_output
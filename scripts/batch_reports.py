@@ -0,0 +1,280 @@
+"""Batch report generation over a JSONL file of topics.
+
+Each line of the input file is a JSON object with a ``topic`` (or ``title``) and
+an optional ``id`` and ``configurable`` mapping. Up to ``--concurrency`` report
+graphs run at once in a single process, so the LLM clients, embedding model,
+reranker and retriever cache are shared by every run. Progress is checkpointed
+after each report, so re-running the same command resumes where it stopped.
+
+Usage:
+    python -m scripts.batch_reports topics.jsonl --concurrency 3 --llm-rps 2 --pubmed-rps 3
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from hashlib import sha256
+from pathlib import Path
+from typing import Any
+
+from loguru import logger
+
+from core.tracing import DEFAULT_TRACE_DIR, traced_invoke
+from utils.helpers import append_report_history
+
+_DEFAULT_CHECKPOINT = "outputs/batch_checkpoint.json"
+_DEFAULT_HISTORY = "report_history.json"
+
+
+@dataclass(frozen=True)
+class BatchTopic:
+    id: str
+    topic: str
+    configurable: dict[str, Any] = field(default_factory=dict)
+
+
+def _topic_id(topic: str) -> str:
+    return sha256(" ".join(topic.lower().split()).encode()).hexdigest()[:12]
+
+
+def load_topics(path: str | Path) -> list[BatchTopic]:
+    """Read topics from a JSONL file, skipping blank lines and duplicate ids."""
+    topics: list[BatchTopic] = []
+    seen: set[str] = set()
+    for line_no, line in enumerate(Path(path).read_text("utf-8").splitlines(), 1):
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        topic = str(record.get("topic") or record.get("title") or "").strip()
+        if not topic:
+            logger.warning(f"{path}:{line_no} has no topic; skipping")
+            continue
+        topic_id = str(record.get("id") or _topic_id(topic))
+        if topic_id in seen:
+            continue
+        seen.add(topic_id)
+        topics.append(
+            BatchTopic(topic_id, topic, dict(record.get("configurable") or {}))
+        )
+    return topics
+
+
+class BatchCheckpoint:
+    """JSON checkpoint of completed and failed topics, rewritten atomically."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        data = json.loads(self.path.read_text("utf-8")) if self.path.exists() else {}
+        self.completed: dict[str, dict] = data.get("completed", {})
+        self.failed: dict[str, str] = data.get("failed", {})
+
+    def is_done(self, topic_id: str) -> bool:
+        return topic_id in self.completed
+
+    def mark_completed(self, topic_id: str, info: dict) -> None:
+        self.completed[topic_id] = info
+        self.failed.pop(topic_id, None)
+        self._save()
+
+    def mark_failed(self, topic_id: str, error: str) -> None:
+        self.failed[topic_id] = error
+        self._save()
+
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(
+            json.dumps({"completed": self.completed, "failed": self.failed}, indent=2),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, self.path)
+
+
+@dataclass
+class ThroughputMeter:
+    started: float = field(default_factory=time.monotonic)
+    completed: int = 0
+    failed: int = 0
+    report_seconds: list[float] = field(default_factory=list)
+
+    def reports_per_hour(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.completed * 3600 / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        elapsed = time.monotonic() - self.started
+        mean = (
+            sum(self.report_seconds) / len(self.report_seconds)
+            if self.report_seconds
+            else 0.0
+        )
+        return (
+            f"Batch finished: {self.completed} completed, {self.failed} failed "
+            f"in {elapsed / 60:.1f} min | {self.reports_per_hour():.1f} reports/hour "
+            f"| mean {mean:.0f}s per report"
+        )
+
+
+def _record_failure(
+    item: BatchTopic, error: str, meter: ThroughputMeter, checkpoint: BatchCheckpoint
+) -> None:
+    logger.error(f"Report {item.id} failed: {error}")
+    meter.failed += 1
+    checkpoint.mark_failed(item.id, error)
+
+
+async def _run_one(
+    graph,
+    item: BatchTopic,
+    semaphore: asyncio.Semaphore,
+    checkpoint: BatchCheckpoint,
+    meter: ThroughputMeter,
+    history_path: str,
+    history_lock: asyncio.Lock,
+    trace_dir: str | None,
+) -> None:
+    async with semaphore:
+        started = time.monotonic()
+        logger.info(f"Starting report {item.id}: {item.topic[:80]}")
+        try:
+            result, _ = await traced_invoke(
+                graph,
+                {"topic": item.topic},
+                {"configurable": item.configurable},
+                run_name=f"batch_{item.id}",
+                trace_dir=trace_dir,
+            )
+        except Exception as exc:  # noqa: BLE001 - isolate per-report failures
+            _record_failure(item, str(exc), meter, checkpoint)
+            return
+
+    elapsed = time.monotonic() - started
+    async with history_lock:
+        try:
+            entry = await asyncio.to_thread(
+                append_report_history,
+                history_path,
+                item.topic,
+                result.get("final_report", ""),
+            )
+        except (OSError, ValueError) as exc:
+            _record_failure(item, f"history write failed: {exc}", meter, checkpoint)
+            return
+
+    meter.completed += 1
+    meter.report_seconds.append(elapsed)
+    checkpoint.mark_completed(
+        item.id, {"history_id": entry["id"], "seconds": round(elapsed, 1)}
+    )
+    logger.info(
+        f"Report {item.id} done in {elapsed:.0f}s "
+        f"({meter.reports_per_hour():.1f} reports/hour so far)"
+    )
+
+
+async def run_batch(
+    topics: list[BatchTopic],
+    graph,
+    *,
+    concurrency: int = 2,
+    checkpoint: BatchCheckpoint,
+    history_path: str = _DEFAULT_HISTORY,
+    trace_dir: str | None = None,
+) -> ThroughputMeter:
+    """Run every topic not already in the checkpoint, ``concurrency`` at a time.
+
+    Each report is traced per node; traces are written to ``trace_dir`` if set.
+    """
+    pending = [t for t in topics if not checkpoint.is_done(t.id)]
+    if skipped := len(topics) - len(pending):
+        logger.info(f"Resuming batch: {skipped} topics already completed")
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    history_lock = asyncio.Lock()
+    meter = ThroughputMeter()
+    await asyncio.gather(
+        *(
+            _run_one(
+                graph,
+                item,
+                semaphore,
+                checkpoint,
+                meter,
+                history_path,
+                history_lock,
+                trace_dir,
+            )
+            for item in pending
+        )
+    )
+    return meter
+
+
+def _parse_args(argv: list[str] | None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("topics", help="JSONL file with one topic per line")
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument(
+        "--llm-rps",
+        type=float,
+        default=None,
+        help=(
+            "Global DeepSeek requests per second shared by all running reports, "
+            "covering the chat model and the DSPy planner"
+        ),
+    )
+    parser.add_argument(
+        "--web-rps",
+        type=float,
+        default=None,
+        help="Global Tavily search requests per second shared by all reports",
+    )
+    parser.add_argument(
+        "--pubmed-rps",
+        type=float,
+        default=None,
+        help="Global PubMed queries per second shared by all reports",
+    )
+    parser.add_argument("--checkpoint", default=_DEFAULT_CHECKPOINT)
+    parser.add_argument("--history", default=_DEFAULT_HISTORY)
+    parser.add_argument(
+        "--trace-dir",
+        default=DEFAULT_TRACE_DIR,
+        help="Directory for per-report JSON timing and token traces",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+
+    from config import config
+
+    if args.llm_rps:
+        config.model.requests_per_second = args.llm_rps
+    if args.web_rps:
+        config.research.web_search_requests_per_second = args.web_rps
+    if args.pubmed_rps:
+        config.research.pubmed_requests_per_second = args.pubmed_rps
+
+    # Imported after the rate limit is set so every node model shares it
+    from app import graph
+
+    meter = asyncio.run(
+        run_batch(
+            load_topics(args.topics),
+            graph,
+            concurrency=args.concurrency,
+            checkpoint=BatchCheckpoint(args.checkpoint),
+            history_path=args.history,
+            trace_dir=args.trace_dir,
+        )
+    )
+    print(meter.summary())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""Scaling benchmark for citation numbering and registry merges.
+
+Times, at each ``--sizes`` source count:
+
+- ``register``: numbering every source of one section through
+  ``register_sources_in_citation_registry``;
+- ``reduce``: folding ``--workers`` parallel section registries into the report
+  registry with the ``citation_registry`` reducer, as LangGraph does after a
+  ``Send`` fan-out.
+
+Each is compared with the previous implementation, which took
+``max(registry.values()) + 1`` for every new URL. The previous code is quadratic,
+so it is skipped above ``--legacy-max`` sources.
+
+Usage:
+    python -m scripts.bench_citation_registry --sizes 1000 10000 50000
+"""
+
+import argparse
+import time
+
+from core.quality import is_valid_source_url, normalize_pubmed_url
+from core.quality import register_sources_in_citation_registry as register_sources
+from core.states import _merge_citation_registries as merge_registries
+
+
+def legacy_register_sources(sources, citation_registry):
+    registry = dict(citation_registry) if citation_registry else {}
+    for source in sources:
+        url = source.get("url", "")
+        if not url or not is_valid_source_url(url):
+            continue
+        url = normalize_pubmed_url(url)
+        if url not in registry:
+            registry[url] = max(registry.values(), default=0) + 1
+    return registry
+
+
+def legacy_merge_registries(current, new):
+    merged = dict(current) if current else {}
+    for url in new or {}:
+        if url not in merged:
+            merged[url] = max(merged.values(), default=0) + 1
+    return merged
+
+
+def _sources(n: int, offset: int = 0) -> list[dict[str, str]]:
+    return [
+        {"url": f"https://pubmed.ncbi.nlm.nih.gov/{30_000_000 + offset + i}/"}
+        for i in range(n)
+    ]
+
+
+def _time(fn, *args) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _reduce(merge, registries: list) -> dict:
+    report: dict = {}
+    for registry in registries:
+        report = merge(report, registry)
+    return report
+
+
+def _row(label: str, n: int, new: float, legacy: float | None) -> str:
+    if legacy is None:
+        return f"{label:<9} {n:>7} {new * 1e3:10.1f}ms {'skipped':>12}"
+    return (
+        f"{label:<9} {n:>7} {new * 1e3:10.1f}ms {legacy * 1e3:10.1f}ms "
+        f"{legacy / new:8.1f}x"
+    )
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 5_000, 10_000, 50_000]
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--legacy-max", type=int, default=10_000)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    print(f"{'op':<9} {'sources':>7} {'indexed':>12} {'legacy':>12}  speedup")
+    for n in args.sizes:
+        run_legacy = n <= args.legacy_max
+        sources = _sources(n)
+        new, registry = _time(register_sources, sources, {})
+        legacy = None
+        if run_legacy:
+            legacy, expected = _time(legacy_register_sources, sources, {})
+            assert registry == expected
+        print(_row("register", n, new, legacy))
+
+        share = max(1, n // args.workers)
+        workers = [
+            register_sources(_sources(share, offset=w * share // 2), {})
+            for w in range(args.workers)
+        ]
+        new, report = _time(_reduce, merge_registries, workers)
+        legacy = None
+        if run_legacy:
+            legacy, expected = _time(_reduce, legacy_merge_registries, workers)
+            assert report == expected
+        print(_row("reduce", n, new, legacy))
+
+
+if __name__ == "__main__":
+    main()
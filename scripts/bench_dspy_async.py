@@ -0,0 +1,93 @@
+"""Benchmark concurrent report throughput with async vs thread-bound DSPy calls.
+
+Runs ``--reports`` reports at once through ``app.graph`` on the replay stand-ins
+(see ``scripts.replay_harness``), once with the planner calls wrapped in
+``asyncio.to_thread`` as before, and once through ``utils.dspy_async.apredict``.
+The default executor is capped at ``--default-workers`` threads to mimic a small
+host, where blocking planner calls and PubMed queries compete for the same pool.
+
+Usage:
+    python -m scripts.bench_dspy_async --reports 16 --default-workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from scripts.replay_harness import LatencyModel, load_fixture, replay_services
+
+
+async def _to_thread_predict(predictor, **kwargs):
+    return await asyncio.to_thread(predictor, **kwargs)
+
+
+async def _run_reports(mode: str, args: argparse.Namespace) -> float:
+    import agents.planner
+    from app import graph
+    from utils.dspy_async import apredict
+
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=args.default_workers))
+    fixture = load_fixture(None, args.sections)
+    latency = LatencyModel(
+        llm_first_token=args.llm_latency,
+        planner=args.planner_latency,
+        entrez=args.entrez_latency,
+        seed=args.seed,
+    )
+    predict = _to_thread_predict if mode == "to_thread" else apredict
+    with (
+        replay_services(fixture, latency),
+        patch.object(agents.planner, "apredict", predict),
+    ):
+        start = time.perf_counter()
+        await asyncio.gather(
+            *(
+                graph.ainvoke({"topic": f"{fixture['topic']} {i}"})
+                for i in range(args.reports)
+            )
+        )
+    return time.perf_counter() - start
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--reports", type=int, default=16)
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--default-workers", type=int, default=4)
+    parser.add_argument("--planner-latency", type=float, default=2.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--entrez-latency", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    os.environ.setdefault("DEEPSEEK_API_KEY", "replay")
+    os.environ.setdefault("ENTREZ_EMAIL", "replay@example.org")
+
+    cwd = os.getcwd()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="bench_dspy_") as workdir:
+        os.chdir(workdir)
+        try:
+            for mode in ("to_thread", "async"):
+                results[mode] = asyncio.run(_run_reports(mode, args))
+        finally:
+            os.chdir(cwd)
+
+    for mode, seconds in results.items():
+        print(
+            f"{mode:<10} {args.reports} reports in {seconds:6.2f}s "
+            f"({args.reports * 3600 / seconds:8.0f} reports/hour)"
+        )
+    print(f"speedup    {results['to_thread'] / results['async']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
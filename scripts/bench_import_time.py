@@ -0,0 +1,113 @@
+"""Measure import time of the graph module and fail when it exceeds a budget.
+
+Runs ``python -X importtime -c "import app"`` in fresh interpreters, reports the
+median cumulative time and the slowest top-level imports, and exits non-zero when
+the median exceeds ``--budget-ms`` or when a module that should only load on
+first use (the ONNX embedding and reranker stack, DSPy and the IPython it pulls
+in) is imported eagerly.
+
+Usage:
+    python -m scripts.bench_import_time --runs 5 --budget-ms 3500
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# ``import app`` measures 2.6-3.1 s here; the margin absorbs machine noise.
+DEFAULT_BUDGET_MS = 3500
+# Loaded on first use (retriever, section cache, planner), never by importing app.
+LAZY_MODULES = ("fastembed", "onnxruntime", "dspy", "IPython")
+
+_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+@dataclass
+class ImportRecord:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Parse ``-X importtime`` output into one record per imported module."""
+    records = []
+    for line in stderr.splitlines():
+        if match := _LINE.match(line):
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append(
+                ImportRecord(
+                    module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2
+                )
+            )
+    return records
+
+
+def measure(module: str) -> list[ImportRecord]:
+    env = {"DEEPSEEK_API_KEY": "import-bench", **os.environ}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+        env=env,
+        check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def eager_modules(records: list[ImportRecord]) -> list[str]:
+    """Top-level packages from ``LAZY_MODULES`` that were imported."""
+    return sorted(
+        {
+            r.module.split(".")[0]
+            for r in records
+            if r.module.split(".")[0] in LAZY_MODULES
+        }
+    )
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    runs = [measure(args.module) for _ in range(args.runs)]
+    totals_ms = [
+        next(r.cumulative_us for r in records if r.module == args.module) / 1000
+        for records in runs
+    ]
+    median_ms = statistics.median(totals_ms)
+
+    print(f"import {args.module}: median {median_ms:.0f} ms over {args.runs} runs")
+    direct = [r for r in runs[-1] if r.depth == 1]
+    for record in sorted(direct, key=lambda r: r.cumulative_us, reverse=True)[
+        : args.top
+    ]:
+        print(f"  {record.cumulative_us / 1000:8.1f} ms  {record.module}")
+
+    eager = eager_modules(runs[-1])
+    failed = False
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if median_ms > args.budget_ms:
+        print(f"FAIL: {median_ms:.0f} ms exceeds budget of {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+"""Throughput and accuracy benchmark for near-duplicate filtering.
+
+Builds a synthetic corpus of abstract-length texts in which ``--dup-rate`` of the
+texts are edited copies of an earlier one: a prefix is added and a fraction of
+words is substituted, as with syndicated news or an abstract mirrored on PMC and
+a publisher page. Times, at each ``--sizes`` corpus size:
+
+- ``minhash``: ``utils.near_dedup.drop_near_duplicates`` (MinHash + LSH);
+- ``exact``: pairwise Jaccard over the shingle sets of every kept text, which
+  is quadratic and is skipped above ``--exact-max`` texts.
+
+Recall is the share of planted copies dropped. When the exact filter runs, the
+MinHash filter's drops are also compared with its drops.
+
+Usage:
+    python -m scripts.bench_near_dedup --sizes 1000 10000 --threshold 0.7
+"""
+
+import argparse
+import random
+import time
+
+from utils.near_dedup import NearDuplicateIndex, jaccard, shingles
+
+
+def _corpus(
+    n: int, dup_rate: float, edit_rate: float, seed: int
+) -> tuple[list[str], set[int]]:
+    rng = random.Random(seed)
+    vocab = [f"term{i}" for i in range(20_000)]
+    texts: list[str] = []
+    copies: set[int] = set()
+    for i in range(n):
+        if texts and rng.random() < dup_rate:
+            words = rng.choice(texts).split()
+            words = [
+                rng.choice(vocab) if rng.random() < edit_rate else w for w in words
+            ]
+            texts.append("Mirrored copy. " + " ".join(words))
+            copies.add(i)
+        else:
+            texts.append(" ".join(rng.choices(vocab, k=rng.randint(150, 300))))
+    return texts, copies
+
+
+def exact_drops(texts: list[str], threshold: float) -> set[int]:
+    kept: list[set[str]] = []
+    dropped: set[int] = set()
+    for i, text in enumerate(texts):
+        grams = shingles(text)
+        if any(jaccard(grams, other) >= threshold for other in kept):
+            dropped.add(i)
+        else:
+            kept.append(grams)
+    return dropped
+
+
+def minhash_drops(texts: list[str], threshold: float, num_perm: int) -> set[int]:
+    index = NearDuplicateIndex(threshold=threshold, num_perm=num_perm)
+    return {i for i, text in enumerate(texts) if index.is_duplicate(text)}
+
+
+def _time(fn, *args) -> tuple[float, set[int]]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--num-perm", type=int, default=128)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--edit-rate", type=float, default=0.02)
+    parser.add_argument("--exact-max", type=int, default=2_000)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    print(
+        f"{'texts':>7} {'filter':<8} {'seconds':>8} {'texts/s':>9} "
+        f"{'dropped':>8} {'recall':>7} {'agree':>6}"
+    )
+    for n in args.sizes:
+        texts, copies = _corpus(n, args.dup_rate, args.edit_rate, args.seed)
+        elapsed, dropped = _time(minhash_drops, texts, args.threshold, args.num_perm)
+        rows = [("minhash", elapsed, dropped)]
+        if n <= args.exact_max:
+            rows.append(("exact", *_time(exact_drops, texts, args.threshold)))
+        reference = rows[-1][2] if len(rows) > 1 else None
+        for label, elapsed, dropped in rows:
+            recall = len(dropped & copies) / len(copies) if copies else 1.0
+            agree = f"{'-':>6}"
+            if reference is not None:
+                union = dropped | reference
+                agree = f"{len(dropped & reference) / len(union) if union else 1:6.3f}"
+            print(
+                f"{n:>7} {label:<8} {elapsed:8.2f} {n / elapsed:9.0f} "
+                f"{len(dropped):>8} {recall:7.3f} {agree}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Microbenchmark for source extraction over tool outputs.
+
+Compares ``core.quality.merge_sources`` (single-pass scan) with the previous
+multi-pass implementation, which ran ``URL_PATTERN`` and four layout regexes over
+the text and then checked each URL against nineteen invalid-URL regexes. Both
+must produce identical sources for every output.
+
+By default the outputs are rendered by the real tool formatters from synthetic
+results: plain and markdown web search results with 30-100 KB of raw page
+content, a retriever report and PubMed search rows. Pass ``--captures DIR`` to
+benchmark saved tool outputs (``*.txt`` / ``*.md``) instead.
+
+Usage:
+    python -m scripts.bench_source_extraction --repeat 50
+    python -m scripts.bench_source_extraction --captures outputs/tool_captures
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+from core.quality import (
+    URL_PATTERN,
+    _derive_label,
+    _normalize_field,
+    _strip_trailing_punctuation,
+    extract_urls,
+    merge_sources,
+)
+
+# Previous implementation, kept as the reference for speed and equivalence.
+
+_LEGACY_RETRIEVER_SOURCE = re.compile(
+    r"##\s*\d+\.\s*(?P<title>[^\n]+)\n"
+    r"\*\*Authors:\*\*\s*(?P<authors>[^\n]+).*?\n"
+    r"\*\*URL:\*\*\s*(?P<url>https?://[^\s)\]>]+)",
+    re.DOTALL,
+)
+_LEGACY_TITLE_PATTERNS = (
+    re.compile(
+        r"-\s+\*\*(?P<title>.+?)\*\*\s*\([^\n]*\)\s*\n\s*-\s*(?P<url>https?://[^\s)\]>]+)",
+        re.DOTALL,
+    ),
+    re.compile(
+        r"Source\s+\d+:\s*(?P<title>[^\n]+)\nURL:\s*(?P<url>https?://[^\s)\]>]+)"
+    ),
+    re.compile(
+        r"##\s*Source\s+\d+:\s*(?P<title>[^\n]+)\n\*\*URL:\*\*\s*(?P<url>https?://[^\s)\]>]+)"
+    ),
+)
+_LEGACY_INVALID_URL_PATTERNS = [
+    re.compile(p)
+    for p in (
+        r"\.svg$", r"\.png$", r"\.jpg$", r"\.jpeg$", r"\.gif$", r"\.ico$",
+        r"\.css$", r"\.js$", r"\.woff", r"\.ttf$", r"/favicon", r"/icon",
+        r"/logo", r"cdn\.", r"static\.", r"assets\.", r"fonts\.googleapis",
+        r"maxcdn\.", r"cloudflare",
+    )
+]  # fmt: skip
+
+
+def _legacy_normalize_pubmed_url(url: str) -> str:
+    match = re.search(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)", url)
+    if match:
+        return f"https://pubmed.ncbi.nlm.nih.gov/{match.group(1)}/"
+    match = re.search(r"ncbi\.nlm\.nih\.gov/pubmed/(\d+)", url)
+    if match:
+        return f"https://pubmed.ncbi.nlm.nih.gov/{match.group(1)}/"
+    return url
+
+
+def _legacy_is_valid(url: str) -> bool:
+    if not url or not url.startswith("http"):
+        return False
+    lower = url.lower()
+    return not any(p.search(lower) for p in _LEGACY_INVALID_URL_PATTERNS)
+
+
+def _legacy_metadata(text: str) -> dict[str, dict[str, str]]:
+    extracted: dict[str, dict[str, str]] = {}
+    for match in _LEGACY_RETRIEVER_SOURCE.finditer(text):
+        url = _legacy_normalize_pubmed_url(
+            _strip_trailing_punctuation(match.group("url"))
+        )
+        extracted[url] = {
+            "title": _normalize_field(match.group("title")),
+            "authors": _normalize_field(match.group("authors")),
+        }
+    for pattern in _LEGACY_TITLE_PATTERNS:
+        for match in pattern.finditer(text):
+            url = _legacy_normalize_pubmed_url(
+                _strip_trailing_punctuation(match.group("url"))
+            )
+            extracted.setdefault(url, {})["title"] = _normalize_field(
+                match.group("title")
+            )
+    return extracted
+
+
+def legacy_merge_sources(
+    existing_sources: list[dict[str, str]], text: str
+) -> list[dict[str, str]]:
+    merged = [dict(source) for source in existing_sources]
+    by_url = {source.get("url", ""): source for source in merged}
+    metadata_by_url = _legacy_metadata(text)
+    for url in extract_urls(text):
+        if not _legacy_is_valid(url):
+            continue
+        url = _legacy_normalize_pubmed_url(url)
+        metadata = metadata_by_url.get(url, {})
+        if url in by_url:
+            existing = by_url[url]
+            for field in ("title", "authors"):
+                if not existing.get(field) and metadata.get(field):
+                    existing[field] = metadata[field]
+            continue
+        entry = {
+            "id": f"S{len(merged) + 1}",
+            "url": url,
+            "label": _derive_label(url),
+            "title": metadata.get("title", ""),
+            "authors": metadata.get("authors", ""),
+        }
+        merged.append(entry)
+        by_url[url] = entry
+    return merged
+
+
+# Synthetic tool outputs rendered by the real formatters.
+
+_WORDS = [
+    "glp-1", "receptor", "agonist", "hepatic", "steatosis", "fibrosis", "insulin",
+    "resistance", "weight", "trial", "cohort", "placebo", "randomized", "outcome",
+    "adverse", "events", "dose", "semaglutide", "liraglutide", "biopsy",
+    "inflammation", "lipid", "metabolism",
+]  # fmt: skip
+_LINKS = (
+    "https://www.nejm.org/doi/full/10.1056/NEJMoa{n}",
+    "https://pubmed.ncbi.nlm.nih.gov/{n}/",
+    "https://www.ncbi.nlm.nih.gov/pmc/articles/PMC{n}/",
+    "https://cdn.example-journal.com/figures/fig{n}.png",
+    "https://static.example-journal.com/js/bundle{n}.js",
+    "https://fonts.googleapis.com/css?family=Roboto{n}",
+    "https://www.who.int/news-room/fact-sheets/detail/{n}",
+)
+
+
+def _raw_page(rng: random.Random, size: int) -> str:
+    parts: list[str] = []
+    length = 0
+    while length < size:
+        words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(20, 60)))
+        link = rng.choice(_LINKS).format(n=rng.randint(10_000, 99_999))
+        paragraph = f"{words} [see]({link}). More at {link}, and {words[:80]}.\n"
+        parts.append(paragraph)
+        length += len(paragraph)
+    return "".join(parts)
+
+
+def _web_output(rng: random.Random, size: int, markdown: bool) -> str:
+    from rag.source_formatter import SourceFormatter
+
+    results = {}
+    for i in range(5):
+        url = f"https://www.example-journal.com/articles/{rng.randint(1, 10**6)}"
+        results[url] = {
+            "title": f"Study {i}: {' '.join(rng.sample(_WORDS, 5))}",
+            "url": url,
+            "content": " ".join(rng.sample(_WORDS, 15)),
+            "raw_content": _raw_page(rng, size // 5),
+        }
+    formatter = SourceFormatter(
+        markdown_output=markdown,
+        max_tokens_per_source=None,
+        total_token_budget=size // 5,
+    )
+    # The formatting step only; markdown mode otherwise renders through IPython.
+    return formatter._format_unique_sources(results)
+
+
+def _retriever_output(rng: random.Random, docs: int) -> str:
+    from rag.retrieval_formatter import RetrieverReportGenerator
+
+    results = [
+        SimpleNamespace(
+            page_content=_raw_page(rng, 1500),
+            metadata={
+                "Title": f"Trial {i} of {' '.join(rng.sample(_WORDS, 4))}",
+                "Url": f"https://www.ncbi.nlm.nih.gov/pubmed/{40_000_000 + i}",
+                "Authors": "Smith J, Doe A",
+                "Publication Date": "2025-Mar-01",
+                "References": "",
+                "relevance_score": 0.9,
+            },
+        )
+        for i in range(docs)
+    ]
+    return RetrieverReportGenerator().create_report(results)["markdown"]
+
+
+def _pubmed_output(rows: int) -> str:
+    from tools.pubmed_search import _build_output
+
+    lines = [
+        f"- **PubMed article {i}** (Hepatology, 2025)\n"
+        f"  - https://pubmed.ncbi.nlm.nih.gov/{41_000_000 + i}/"
+        for i in range(rows)
+    ]
+    return _build_output("glp-1 nafld", "data/pubmed.csv", lines, rows)
+
+
+def synthetic_outputs(seed: int = 0) -> dict[str, str]:
+    rng = random.Random(seed)
+    return {
+        "web_plain_30kb": _web_output(rng, 30_000, markdown=False),
+        "web_markdown_100kb": _web_output(rng, 100_000, markdown=True),
+        "retriever_10_docs": _retriever_output(rng, 10),
+        "pubmed_8_rows": _pubmed_output(8),
+    }
+
+
+def load_captures(directory: str | Path) -> dict[str, str]:
+    paths = sorted(Path(directory).glob("*.txt")) + sorted(Path(directory).glob("*.md"))
+    return {p.name: p.read_text(encoding="utf-8") for p in paths}
+
+
+def _best_of(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn([], text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--captures", help="Directory of saved tool outputs")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = _parse_args(argv)
+    outputs = (
+        load_captures(args.captures) if args.captures else synthetic_outputs(args.seed)
+    )
+    mismatches = 0
+    print(
+        f"{'output':<24} {'KB':>6} {'urls':>5} {'legacy':>10} {'single':>10}  speedup"
+    )
+    for name, text in outputs.items():
+        if merge_sources([], text) != legacy_merge_sources([], text):
+            mismatches += 1
+            print(f"MISMATCH: {name}")
+        legacy = _best_of(legacy_merge_sources, text, args.repeat)
+        single = _best_of(merge_sources, text, args.repeat)
+        print(
+            f"{name:<24} {len(text) / 1024:6.1f} {len(URL_PATTERN.findall(text)):5d} "
+            f"{legacy * 1e3:8.2f}ms {single * 1e3:8.2f}ms  {legacy / single:5.2f}x"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,6 +15,7 @@ from pydantic import BaseModel, Field
 from pymed import PubMed
 
 from prompts.scraper import pubmed_parser_prompt
+from utils.llm_cache import cached_model_kwargs
 
 _ = load_dotenv()
 
@@ -189,6 +190,7 @@ class PubMedScraper:
             model=model,
             temperature=temperature,
             max_tokens=2048,  # type: ignore
+            **cached_model_kwargs(),
         )
 
     def parse_query(self, natural_language: str) -> ArticleQuery:
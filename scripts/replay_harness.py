@@ -0,0 +1,549 @@
+"""Offline replay harness for profiling the full report graph.
+
+Runs ``app.graph.ainvoke`` end to end with local stand-ins for DeepSeek, Tavily,
+NCBI Entrez, the PubMed retriever and the DSPy planner. The stand-ins serve
+responses from a JSON fixture (or a built-in synthetic one) after an artificial
+delay drawn from a latency model, so per-node wall time and fan-out concurrency
+can be measured without network access or API keys.
+
+Fixture layout (every key is optional)::
+
+    {
+      "topic": "...",
+      "sections": [{"name": ..., "description": ..., "research": true, ...}],
+      "articles": [{"pmid": ..., "title": ..., "abstract": ..., "journal": ...,
+                    "authors": [{"lastname": ..., "firstname": ...}], ...}],
+      "web_results": [{"url": ..., "title": ..., "content": ...}],
+      "section_content": {"<section name>": "<recorded synthesis reply>"},
+      "final_content": {"<section name>": "<recorded intro/conclusion>"}
+    }
+
+Usage:
+    python -m scripts.replay_harness --sections 5 --llm-latency 2.0
+    python -m scripts.replay_harness --fixture replay.json --json profile.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from langchain_core.documents import Document
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from core.tracing import NodeTrace, RunTrace, traced_invoke
+from utils.helpers import content_to_text
+from utils.tokens import count_message_tokens, estimate_tokens
+
+_SECTION_NAME = re.compile(r"\*\*Section Name(?::\*\*|\*\*:)\s*(.+)")
+
+
+# Latency model
+
+
+@dataclass
+class LatencyModel:
+    """Artificial service delays in seconds, jittered by +/- ``jitter``."""
+
+    llm_first_token: float = 1.0
+    llm_tokens_per_second: float = 60.0
+    tavily: float = 0.8
+    entrez: float = 1.5
+    retriever: float = 0.3
+    planner: float = 3.0
+    jitter: float = 0.25
+    seed: int = 0
+    _rng: random.Random = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def zero(cls) -> "LatencyModel":
+        return cls(0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0)
+
+    def sample(self, seconds: float) -> float:
+        if seconds <= 0:
+            return 0.0
+        return seconds * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def llm(self, output_tokens: int) -> float:
+        decode = (
+            output_tokens / self.llm_tokens_per_second
+            if self.llm_tokens_per_second
+            else 0.0
+        )
+        return self.sample(self.llm_first_token + decode)
+
+
+# Fixture
+
+
+def _synthetic_article(index: int) -> dict[str, Any]:
+    pmid = str(38000000 + index)
+    return {
+        "pmid": pmid,
+        "title": f"Cohort study {index + 1} of outcomes in the replay population",
+        "abstract": (
+            f"In a cohort of {1200 + 37 * index} participants, exposure was "
+            f"associated with an odds ratio of 1.{index + 2} (95% CI 1.1-2.{index})."
+        ),
+        "journal": "Journal of Replay Medicine",
+        "authors": [{"lastname": f"Author{index}", "firstname": "A"}],
+        "keywords": ["replay", "benchmark"],
+        "publication_date": f"202{index % 5}-01-15",
+    }
+
+
+def synthetic_fixture(num_sections: int = 4) -> dict[str, Any]:
+    """Build a fixture with ``num_sections`` research sections plus intro/conclusion."""
+    research = [
+        {
+            "name": f"Research Section {i + 1}",
+            "description": f"Evidence for aspect {i + 1} of the replay topic",
+            "research": True,
+            "content": "Cohort studies and meta-analyses with effect sizes",
+        }
+        for i in range(num_sections)
+    ]
+    framing = [
+        {
+            "name": name,
+            "description": f"{name} for the replay topic",
+            "research": False,
+            "content": "Summary of the research sections",
+        }
+        for name in ("Introduction", "Conclusion")
+    ]
+    return {
+        "topic": "Replay benchmark topic",
+        "sections": [framing[0], *research, framing[1]],
+        "articles": [_synthetic_article(i) for i in range(8)],
+        "web_results": [
+            {
+                "url": f"https://www.example.org/replay/{i}",
+                "title": f"Replay web source {i}",
+                "content": "Surveillance data reported a prevalence of 23%.",
+            }
+            for i in range(3)
+        ],
+    }
+
+
+def load_fixture(path: str | Path | None, num_sections: int = 4) -> dict[str, Any]:
+    """Load a replay fixture, filling missing keys from the synthetic fixture."""
+    fixture = synthetic_fixture(num_sections)
+    if path:
+        fixture.update(json.loads(Path(path).read_text("utf-8")))
+    return fixture
+
+
+# Service stand-ins
+
+
+def _article_url(article: dict[str, Any]) -> str:
+    return f"https://pubmed.ncbi.nlm.nih.gov/{article['pmid']}"
+
+
+def _scratchpad_note(title: str, url: str, index: int) -> str:
+    return (
+        f"**SOURCE**: {title} ({url})\n"
+        f"**KEY FINDINGS**: Exposure was consistently associated with worse "
+        f"outcomes across the cohort, with a dose-response gradient.\n"
+        f"**QUANTITATIVE DATA**:\n"
+        f"- [n = {1200 + 37 * index} participants]\n"
+        f"- [OR 1.{index + 2}, 95% CI 1.1-2.{index + 1}]\n"
+        f"- [prevalence {20 + index}%]\n"
+        f"---"
+    )
+
+
+def _tool_call(name: str, call_id: str, **args) -> dict[str, Any]:
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that replays a fixed research script for every section.
+
+    Research requests follow the same four rounds a well-behaved agent makes
+    (PubMed, retriever, web search, final notes), so the tool node and
+    verification gate run for real. Synthesis requests return the recorded
+    section text from the fixture, or a cited placeholder.
+    """
+
+    fixture: dict[str, Any]
+    latency: LatencyModel
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _section_name(self, messages: list[BaseMessage]) -> str:
+        for message in messages:
+            if match := _SECTION_NAME.search(content_to_text(message.content)):
+                return match.group(1).strip()
+        return "Section"
+
+    def _research_reply(self, messages: list[BaseMessage], name: str) -> AIMessage:
+        rounds = sum(1 for m in messages if getattr(m, "tool_calls", None))
+        articles = self.fixture["articles"]
+        article = articles[rounds % len(articles)]
+        web = self.fixture["web_results"][0]
+        slug = re.sub(r"\W+", "_", name.lower())
+        call_id = f"{slug}_{rounds}"
+        note = _scratchpad_note(article["title"], _article_url(article), rounds)
+        script = [
+            [_tool_call("pubmed_scraper_tool", f"{call_id}_p", search_query=name)],
+            [
+                _tool_call("WriteToScratchpad", f"{call_id}_w", notes=note),
+                _tool_call("retriever_tool", f"{call_id}_r", search_query=name),
+            ],
+            [
+                _tool_call("WriteToScratchpad", f"{call_id}_w", notes=note),
+                _tool_call("web_search", f"{call_id}_s", search_query=name),
+            ],
+            [
+                _tool_call(
+                    "WriteToScratchpad",
+                    f"{call_id}_w",
+                    notes=_scratchpad_note(web["title"], web["url"], rounds),
+                )
+            ],
+        ]
+        if rounds < len(script):
+            return AIMessage(content="", tool_calls=script[rounds])
+        return AIMessage(content=self._section_text(name))
+
+    def _section_text(self, name: str) -> str:
+        recorded = self.fixture.get("section_content", {}).get(name)
+        if recorded:
+            return recorded
+        return (
+            f"## {name}\n\nAcross the included cohorts, exposure was associated "
+            f"with worse outcomes (OR 1.4, 95% CI 1.1-2.0) [1]. Effects were "
+            f"consistent in sensitivity analyses [2].\n"
+        )
+
+    def _reply(self, messages: list[BaseMessage]) -> tuple[AIMessage, float]:
+        name = self._section_name(messages)
+        first = messages[0] if messages else None
+        if isinstance(first, SystemMessage) and "Phase 1" in content_to_text(
+            first.content
+        ):
+            reply = self._research_reply(messages, name)
+        else:
+            reply = AIMessage(content=self._section_text(name))
+
+        output_tokens = estimate_tokens(
+            content_to_text(reply.content) + json.dumps(reply.tool_calls)
+        )
+        input_tokens = count_message_tokens(messages)
+        reply.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        reply.response_metadata = {"finish_reason": "stop"}
+        return reply, self.latency.llm(output_tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        reply, delay = self._reply(messages)
+        time.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        reply, delay = self._reply(messages)
+        await asyncio.sleep(delay)
+        return ChatResult(generations=[ChatGeneration(message=reply)])
+
+
+class _ReplayPredict:
+    """Stand-in for ``dspy.Predict`` with a blocking call and an async ``acall``."""
+
+    def __init__(self, signature: str, fixture: dict[str, Any], latency: LatencyModel):
+        self._signature = signature
+        self._fixture = fixture
+        self._latency = latency
+
+    def __call__(self, **kwargs):
+        time.sleep(self._latency.sample(self._latency.planner))
+        return self._result(**kwargs)
+
+    async def acall(self, **kwargs):
+        await asyncio.sleep(self._latency.sample(self._latency.planner))
+        return self._result(**kwargs)
+
+    def _result(self, **kwargs) -> SimpleNamespace:
+        from core.schemas import Section, Sections
+
+        if self._signature == "ReportPlanner":
+            sections = [Section(**s) for s in self._fixture["sections"]]
+            return self._prediction(plan=Sections(sections=sections))
+        title = kwargs.get("section_title", "Section")
+        content = self._fixture.get("final_content", {}).get(title) or (
+            f"## {title}\n\nThis section frames the findings reported below."
+        )
+        return self._prediction(section_content=content)
+
+    def _prediction(self, **outputs) -> SimpleNamespace:
+        usage = {"prompt_tokens": 1500, "completion_tokens": 400}
+        return SimpleNamespace(**outputs, get_lm_usage=lambda: {"replay": usage})
+
+
+class _ReplayTavily:
+    def __init__(self, fixture: dict[str, Any], latency: LatencyModel, **kwargs):
+        self._results = fixture["web_results"][: kwargs.get("max_results") or 1]
+        self._latency = latency
+
+    async def ainvoke(self, payload: dict[str, Any]) -> dict[str, Any]:
+        await asyncio.sleep(self._latency.sample(self._latency.tavily))
+        return {"query": payload.get("query", ""), "results": self._results}
+
+
+class _ReplayPubMed:
+    def __init__(self, fixture: dict[str, Any], latency: LatencyModel, **kwargs):
+        self.parameters: dict[str, str] = {}
+        self._articles = fixture["articles"]
+        self._latency = latency
+
+    def query(self, query: str, max_results: int = 100) -> list[SimpleNamespace]:
+        time.sleep(self._latency.sample(self._latency.entrez))
+        return [
+            SimpleNamespace(**{**a, "pubmed_id": a["pmid"]})
+            for a in self._articles[:max_results]
+        ]
+
+
+class _ReplayRetriever:
+    def __init__(self, fixture: dict[str, Any], latency: LatencyModel):
+        self._articles = fixture["articles"]
+        self._latency = latency
+
+    async def ainvoke(self, query: str) -> list[Document]:
+        await asyncio.sleep(self._latency.sample(self._latency.retriever))
+        return [
+            Document(
+                page_content=a["abstract"],
+                metadata={
+                    "Title": a["title"],
+                    "Url": _article_url(a),
+                    "Authors": ", ".join(
+                        f"{x['lastname']} {x['firstname']}" for x in a["authors"]
+                    ),
+                    "Publication Date": a["publication_date"],
+                    "relevance_score": round(0.9 - 0.05 * i, 2),
+                },
+            )
+            for i, a in enumerate(self._articles[:5])
+        ]
+
+
+@contextmanager
+def replay_services(fixture: dict[str, Any], latency: LatencyModel):
+    """Patch every external client used by the graph with a replay stand-in."""
+    import agents.planner
+    import core.nodes
+    import scripts.pubmed_scraper
+    import tools.retrieval
+    import tools.web_search
+
+    model = ReplayChatModel(fixture=fixture, latency=latency)
+    retriever = _ReplayRetriever(fixture, latency)
+    with ExitStack() as stack:
+        for target, name, value in [
+            (core.nodes, "get_llm", lambda: model),
+            (core.nodes, "get_llm_with_tools", lambda: model),
+            (agents.planner, "get_dspy_lm", lambda: None),
+            (
+                agents.planner,
+                "predictor",
+                lambda signature: _ReplayPredict(signature, fixture, latency),
+            ),
+            (
+                tools.web_search,
+                "TavilySearch",
+                lambda **kw: _ReplayTavily(fixture, latency, **kw),
+            ),
+            (
+                scripts.pubmed_scraper,
+                "PubMed",
+                lambda **kw: _ReplayPubMed(fixture, latency, **kw),
+            ),
+            (tools.retrieval, "get_retriever", lambda csv_path=None: retriever),
+        ]:
+            stack.enter_context(patch.object(target, name, value))
+        yield model
+
+
+# Profiling
+
+
+def _peak_overlap(nodes: list[NodeTrace]) -> int:
+    events = sorted(
+        [(n.start, 1) for n in nodes] + [(n.start + n.wall_seconds, -1) for n in nodes],
+        key=lambda e: (e[0], e[1]),
+    )
+    active = peak = 0
+    for _, delta in events:
+        active += delta
+        peak = max(peak, active)
+    return peak
+
+
+@dataclass
+class NodeProfile:
+    calls: int
+    total_seconds: float
+    mean_seconds: float
+    max_seconds: float
+    queue_seconds: float
+    peak_concurrency: int
+
+
+@dataclass
+class ReplayProfile:
+    wall_seconds: float
+    mean_concurrency: float
+    peak_concurrency: int
+    nodes: dict[str, NodeProfile]
+    llm_usage: dict[str, dict[str, int]]
+    report_chars: int
+
+    @classmethod
+    def from_trace(cls, trace: RunTrace, report: str) -> "ReplayProfile":
+        runs_by_node: dict[str, list[NodeTrace]] = {}
+        for node in trace.nodes:
+            runs_by_node.setdefault(node.node, []).append(node)
+        summaries = trace.by_node()
+        nodes = {
+            name: NodeProfile(
+                calls=summaries[name].runs,
+                total_seconds=summaries[name].wall_seconds,
+                mean_seconds=summaries[name].wall_seconds / summaries[name].runs,
+                max_seconds=summaries[name].max_wall_seconds,
+                queue_seconds=summaries[name].queue_seconds,
+                peak_concurrency=_peak_overlap(runs),
+            )
+            for name, runs in runs_by_node.items()
+        }
+        top_level = [n for n in trace.nodes if n.top_level]
+        busy = sum(n.wall_seconds for n in top_level)
+        wall = trace.wall_seconds
+        return cls(
+            wall_seconds=wall,
+            mean_concurrency=busy / wall if wall else 0.0,
+            peak_concurrency=_peak_overlap(top_level),
+            nodes=nodes,
+            llm_usage={
+                name: {
+                    "calls": s.llm_calls,
+                    "prompt_tokens": s.prompt_tokens,
+                    "completion_tokens": s.completion_tokens,
+                }
+                for name, s in summaries.items()
+                if s.llm_calls
+            },
+            report_chars=len(report),
+        )
+
+    def summary(self) -> str:
+        header = (
+            f"{'node':<28}{'calls':>6}{'total s':>10}{'mean s':>9}"
+            f"{'max s':>9}{'queue s':>9}{'peak':>6}"
+        )
+        lines = [header]
+        for node, p in sorted(
+            self.nodes.items(), key=lambda item: -item[1].total_seconds
+        ):
+            lines.append(
+                f"{node:<28}{p.calls:>6}{p.total_seconds:>10.2f}"
+                f"{p.mean_seconds:>9.2f}{p.max_seconds:>9.2f}{p.queue_seconds:>9.2f}"
+                f"{p.peak_concurrency:>6}"
+            )
+        lines.append(
+            f"wall {self.wall_seconds:.2f}s, mean concurrency "
+            f"{self.mean_concurrency:.2f}, peak {self.peak_concurrency}"
+        )
+        return "\n".join(lines)
+
+
+async def run_replay(
+    fixture: dict[str, Any], latency: LatencyModel, topic: str | None = None
+) -> ReplayProfile:
+    """Run one report through ``app.graph`` against the replay stand-ins."""
+    os.environ.setdefault("DEEPSEEK_API_KEY", "replay")
+    os.environ.setdefault("ENTREZ_EMAIL", "replay@example.org")
+
+    from app import graph
+
+    with replay_services(fixture, latency):
+        result, trace = await traced_invoke(
+            graph,
+            {"topic": topic or fixture["topic"]},
+            run_name="replay",
+            trace_dir=None,
+        )
+    return ReplayProfile.from_trace(trace, result.get("final_report", ""))
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n", 1)[0])
+    parser.add_argument("--fixture", help="JSON fixture with recorded responses")
+    parser.add_argument("--sections", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=1.0)
+    parser.add_argument("--llm-tps", type=float, default=60.0)
+    parser.add_argument("--tavily-latency", type=float, default=0.8)
+    parser.add_argument("--entrez-latency", type=float, default=1.5)
+    parser.add_argument("--retriever-latency", type=float, default=0.3)
+    parser.add_argument("--planner-latency", type=float, default=3.0)
+    parser.add_argument("--jitter", type=float, default=0.25)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the profile to this JSON file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    fixture = load_fixture(args.fixture, args.sections)
+    latency = LatencyModel(
+        llm_first_token=args.llm_latency,
+        llm_tokens_per_second=args.llm_tps,
+        tavily=args.tavily_latency,
+        entrez=args.entrez_latency,
+        retriever=args.retriever_latency,
+        planner=args.planner_latency,
+        jitter=args.jitter,
+        seed=args.seed,
+    )
+    output = Path(args.json).resolve() if args.json else None
+
+    # Scratchpads and PubMed CSVs are written relative to the working directory.
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="replay_") as workdir:
+        os.chdir(workdir)
+        try:
+            profile = asyncio.run(run_replay(fixture, latency))
+        finally:
+            os.chdir(cwd)
+
+    print(profile.summary())
+    if output:
+        output.write_text(json.dumps(asdict(profile), indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
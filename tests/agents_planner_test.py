@@ -15,7 +15,7 @@ def test_generate_plan_returns_sections(monkeypatch):
 
             return Result()
 
-    monkeypatch.setattr(planner, "Predict", lambda _: DummyPlanner())
+    monkeypatch.setattr(planner, "predictor", lambda _: DummyPlanner())
     monkeypatch.setattr(
         planner.ReportConfig,
         "from_runnable_config",
@@ -27,6 +27,15 @@ def test_generate_plan_returns_sections(monkeypatch):
     assert len(result["run_id"]) == 8
 
 
+def test_generate_plan_assigns_run_id_to_preset_sections():
+    state = ReportState(sections=["A"], topic="child malnutrition")
+
+    result = asyncio.run(planner.generate_plan(state, {}))
+
+    assert result["sections"] == ["A"]
+    assert len(result["run_id"]) == 8
+
+
 def test_write_final_sections(monkeypatch):
     section = type(
         "Section", (), {"name": "Intro", "description": "desc", "content": ""}
@@ -40,6 +49,31 @@ def test_write_final_sections(monkeypatch):
 
             return Result()
 
-    monkeypatch.setattr(planner, "Predict", lambda _: DummyFinalInstructions())
+    monkeypatch.setattr(planner, "predictor", lambda _: DummyFinalInstructions())
     result = asyncio.run(planner.write_final_sections(state))
     assert "completed_sections" in result
+
+
+def test_write_final_sections_waits_for_shared_llm_rate_limit(monkeypatch):
+    section = type(
+        "Section", (), {"name": "Intro", "description": "desc", "content": ""}
+    )()
+    calls = []
+
+    class RecordingLimiter:
+        async def aacquire(self):
+            calls.append("acquire")
+
+    class DummyFinalInstructions:
+        def __call__(self, section_title, section_topic, context):
+            calls.append("predict")
+            return type("Result", (), {"section_content": "Final content"})()
+
+    monkeypatch.setattr(planner.config.model, "requests_per_second", 2.0)
+    monkeypatch.setattr(
+        planner.config, "_rate_limiters", {"deepseek": RecordingLimiter()}
+    )
+    monkeypatch.setattr(planner, "predictor", lambda _: DummyFinalInstructions())
+    asyncio.run(planner.write_final_sections(SectionState(section=section)))
+
+    assert calls == ["acquire", "predict"]
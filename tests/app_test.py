@@ -1,3 +1,6 @@
+import os
+import subprocess
+import sys
 import unittest
 from unittest.mock import patch
 
@@ -20,10 +23,33 @@ class TestAppGraph(unittest.TestCase):
         builder = app._builder
         self.assertTrue(hasattr(builder, "nodes"))
 
-    @patch("app.config")
-    def test_config_initialize_dspy_called(self, mock_config):
-        app.config.initialize_dspy()
-        mock_config.initialize_dspy.assert_called()
+    def test_import_does_not_create_clients(self):
+        # A fresh interpreter, since other tests may already have used the models.
+        probe = (
+            "import sys, dspy, app, core.nodes; "
+            "assert dspy.settings.lm is None; "
+            "assert core.nodes.get_llm.cache_info().currsize == 0; "
+            "assert 'fastembed' not in sys.modules"
+        )
+        env = {**os.environ, "DEEPSEEK_API_KEY": "test-key"}
+        result = subprocess.run(
+            [sys.executable, "-c", probe],
+            check=False,
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr[-2000:])
+
+    def test_dspy_is_configured_on_first_use(self):
+        import config
+
+        config.get_dspy_lm.cache_clear()
+        with patch.object(config, "config") as app_config:
+            config.get_dspy_lm()
+            config.get_dspy_lm()
+        config.get_dspy_lm.cache_clear()
+        app_config.initialize_dspy.assert_called_once()
 
 
 if __name__ == "__main__":
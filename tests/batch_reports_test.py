@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+from scripts import batch_reports
+
+
+class DummyGraph:
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.topics = []
+
+    async def ainvoke(self, inputs, config=None):
+        self.topics.append(inputs["topic"])
+        if inputs["topic"] in self.fail_on:
+            raise RuntimeError("boom")
+        return {"final_report": f"# {inputs['topic']}"}
+
+
+def _write_topics(path, *records):
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n\n", "utf-8")
+
+
+def test_load_topics_assigns_stable_ids_and_skips_duplicates(tmp_path):
+    topics_file = tmp_path / "topics.jsonl"
+    _write_topics(
+        topics_file,
+        {"topic": "GLP-1 in NAFLD"},
+        {"topic": "glp-1  in nafld"},
+        {"id": "custom", "title": "Malnutrition", "configurable": {"context": "c"}},
+        {"body": "no topic"},
+    )
+
+    topics = batch_reports.load_topics(topics_file)
+
+    assert [t.topic for t in topics] == ["GLP-1 in NAFLD", "Malnutrition"]
+    assert topics[1].id == "custom"
+    assert topics[1].configurable == {"context": "c"}
+
+
+def test_run_batch_appends_history_and_resumes_from_checkpoint(tmp_path):
+    topics = [
+        batch_reports.BatchTopic("a", "Topic A"),
+        batch_reports.BatchTopic("b", "Topic B"),
+        batch_reports.BatchTopic("c", "Topic C"),
+    ]
+    checkpoint_path = tmp_path / "checkpoint.json"
+    history_path = tmp_path / "history.json"
+
+    graph = DummyGraph(fail_on={"Topic B"})
+    meter = asyncio.run(
+        batch_reports.run_batch(
+            topics,
+            graph,
+            concurrency=2,
+            checkpoint=batch_reports.BatchCheckpoint(checkpoint_path),
+            history_path=str(history_path),
+            trace_dir=str(tmp_path / "traces"),
+        )
+    )
+
+    assert (meter.completed, meter.failed) == (2, 1)
+    assert len(list((tmp_path / "traces").glob("batch_*.json"))) == 3
+    history = json.loads(history_path.read_text("utf-8"))
+    assert sorted(h["topic"] for h in history) == ["Topic A", "Topic C"]
+    assert "reports/hour" in meter.summary()
+
+    resumed_graph = DummyGraph()
+    asyncio.run(
+        batch_reports.run_batch(
+            topics,
+            resumed_graph,
+            checkpoint=batch_reports.BatchCheckpoint(checkpoint_path),
+            history_path=str(history_path),
+        )
+    )
+
+    assert resumed_graph.topics == ["Topic B"]
+    saved = json.loads(checkpoint_path.read_text("utf-8"))
+    assert sorted(saved["completed"]) == ["a", "b", "c"]
+    assert saved["failed"] == {}
+
+
+def test_history_write_failure_is_recorded_per_topic(tmp_path):
+    topics = [batch_reports.BatchTopic("a", "Topic A")]
+    checkpoint_path = tmp_path / "checkpoint.json"
+    unwritable_history = tmp_path / "history_dir"
+    unwritable_history.mkdir()
+
+    meter = asyncio.run(
+        batch_reports.run_batch(
+            topics,
+            DummyGraph(),
+            checkpoint=batch_reports.BatchCheckpoint(checkpoint_path),
+            history_path=str(unwritable_history),
+        )
+    )
+
+    assert (meter.completed, meter.failed) == (0, 1)
+    saved = json.loads(checkpoint_path.read_text("utf-8"))
+    assert saved["failed"]["a"].startswith("history write failed")
@@ -0,0 +1,24 @@
+from scripts.bench_import_time import eager_modules, measure, parse_importtime
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     core.states
+import time:      3000 |       3400 |   core.nodes
+import time:       900 |       4300 | app
+"""
+
+
+def test_parse_importtime_reads_times_and_depth():
+    records = {r.module: r for r in parse_importtime(SAMPLE)}
+
+    assert set(records) == {"core.states", "core.nodes", "app"}
+    assert records["app"].cumulative_us == 4300
+    assert records["core.nodes"].self_us == 3000
+    assert [records[m].depth for m in ("app", "core.nodes", "core.states")] == [0, 1, 2]
+
+
+def test_import_app_leaves_heavy_modules_unloaded():
+    records = measure("app")
+
+    assert any(r.module == "app" for r in records)
+    assert eager_modules(records) == []
@@ -0,0 +1,7 @@
+from core.quality import merge_sources
+from scripts.bench_source_extraction import legacy_merge_sources, synthetic_outputs
+
+
+def test_single_pass_extraction_matches_previous_implementation():
+    for name, text in synthetic_outputs(seed=3).items():
+        assert merge_sources([], text) == legacy_merge_sources([], text), name
@@ -0,0 +1,27 @@
+from utils.bm25 import BM25, tokenize
+
+
+def test_tokenize_keeps_hyphenated_and_decimal_terms():
+    assert tokenize("GLP-1 agonists cut HbA1c by 1.5% in the trial") == [
+        "glp-1",
+        "agonists",
+        "cut",
+        "hba1c",
+        "1.5",
+        "trial",
+    ]
+
+
+def test_top_k_ranks_rarer_terms_higher_and_drops_non_matches():
+    index = BM25(
+        [
+            "semaglutide reduced liver fat in NASH",
+            "semaglutide reduced body weight",
+            "metformin improved glycaemic control",
+        ]
+    )
+
+    ranked = index.top_k("semaglutide liver", 3)
+
+    assert [i for i, _ in ranked] == [0, 1]
+    assert BM25([]).top_k("anything", 3) == []
@@ -0,0 +1,99 @@
+from types import SimpleNamespace
+
+from config import ResearchConfig
+from core import budget as budget_module
+from core.budget import (
+    ResearchBudget,
+    close_research_budget,
+    open_research_budget,
+    research_budget,
+)
+from core.verification import VerificationResult
+
+PASSED = VerificationResult(passed=True, failures=[])
+FAILED = VerificationResult(passed=False, failures=["Insufficient sources"])
+
+
+def test_section_that_passes_verification_stops_and_releases_rounds():
+    budget = ResearchBudget(["A", "B"], ResearchConfig(rounds_per_section=4))
+
+    decision = budget.next_step("A", 2, PASSED)
+    budget.finish("A")
+
+    assert decision.synthesize
+    assert budget.stopped_early == {"A"}
+    assert budget.spare_rounds == 2
+
+
+def test_failing_section_borrows_released_rounds_up_to_the_cap():
+    cfg = ResearchConfig(rounds_per_section=4, max_rounds_per_section=5)
+    budget = ResearchBudget(["A", "B"], cfg)
+    budget.next_step("A", 1, PASSED)
+    budget.finish("A")
+
+    assert not budget.next_step("B", 3, FAILED).synthesize
+    borrowed = budget.next_step("B", 4, FAILED)
+    exhausted = budget.next_step("B", 5, FAILED)
+
+    assert not borrowed.synthesize
+    assert "borrowed" in borrowed.reason
+    assert exhausted.synthesize
+
+
+def test_failing_section_synthesises_when_no_rounds_are_spare():
+    budget = ResearchBudget(["A", "B"], ResearchConfig(rounds_per_section=4))
+
+    decision = budget.next_step("A", 4, FAILED)
+
+    assert decision.synthesize
+    assert decision.reason == "research rounds exhausted"
+
+
+def test_default_limits_match_the_fixed_round_loop():
+    budget = ResearchBudget(["A", "B"], ResearchConfig())
+
+    assert ResearchConfig().min_rounds_before_verification == 3
+    assert not budget.next_step("A", 3, FAILED).synthesize
+    assert budget.next_step("A", 4, FAILED).synthesize
+
+
+def test_total_round_budget_shrinks_each_allotment():
+    budget = ResearchBudget(["A", "B", "C"], ResearchConfig(total_round_budget=6))
+
+    assert budget.allotment == 2
+    assert budget.next_step("A", 2, None).synthesize
+
+
+def test_token_budget_and_deadline_force_synthesis(monkeypatch):
+    cfg = ResearchConfig(token_budget=100, deadline_seconds=30)
+    clock = iter([0.0, 0.0, 31.0])
+    monkeypatch.setattr(budget_module.time, "monotonic", lambda: next(clock))
+    budget = ResearchBudget(["A"], cfg)
+
+    assert not budget.next_step("A", 0, None).synthesize
+    assert budget.next_step("A", 1, None).reason == "research deadline reached"
+
+    budget.deadline = None
+    budget.record_usage(SimpleNamespace(usage_metadata={"total_tokens": 150}))
+    assert budget.next_step("A", 1, None).reason == "research token budget spent"
+
+
+def test_registry_is_keyed_by_run_id():
+    cfg = ResearchConfig()
+    opened = open_research_budget("run-1", ["A"], cfg)
+
+    assert research_budget("run-1", cfg) is opened
+    assert close_research_budget("run-1") is opened
+    assert close_research_budget("run-1") is None
+
+
+def test_unregistered_run_keeps_one_budget_across_rounds():
+    cfg = ResearchConfig(token_budget=100)
+    first = research_budget("standalone", cfg)
+    first.record_usage(SimpleNamespace(usage_metadata={"total_tokens": 150}))
+
+    again = research_budget("standalone", cfg)
+
+    assert again is first
+    assert again.next_step("A", 1, None).reason == "research token budget spent"
+    assert close_research_budget("standalone") is first
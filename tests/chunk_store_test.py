@@ -0,0 +1,67 @@
+import pickle
+
+from langchain_core.documents import Document
+
+from rag.chunk_store import ARTICLE_ID, ArticleStore, ChunkDocstore, HydrateMetadata
+
+
+def _articles():
+    return [
+        Document(
+            page_content="Article one",
+            metadata={"Title": "One", "Journal": "Lancet", "source": "11"},
+        ),
+        Document(
+            page_content="Article two",
+            metadata={"Title": "Two", "Url": "https://pubmed/22"},
+        ),
+    ]
+
+
+def test_from_documents_keeps_metadata_once_per_article():
+    store, slim = ArticleStore.from_documents(_articles())
+
+    assert len(store) == 2
+    assert [d.metadata for d in slim] == [{ARTICLE_ID: 0}, {ARTICLE_ID: 1}]
+    assert [d.page_content for d in slim] == ["Article one", "Article two"]
+    assert store.metadata(0) == {"Title": "One", "Journal": "Lancet", "source": "11"}
+    assert store.metadata(1) == {"Title": "Two", "Url": "https://pubmed/22"}
+
+
+def test_hydrate_merges_article_fields_under_chunk_fields():
+    store, _ = ArticleStore.from_documents(_articles())
+    chunks = [
+        Document(page_content="two, part 2", metadata={ARTICLE_ID: 1, "Title": "X"}),
+        Document(page_content="external", metadata={"Title": "Web"}),
+    ]
+
+    hydrated = HydrateMetadata(store=store).compress_documents(chunks, query="q")
+
+    assert hydrated[0].metadata == {
+        "Title": "X",
+        "Url": "https://pubmed/22",
+        ARTICLE_ID: 1,
+    }
+    assert hydrated[1] is chunks[1]
+    assert chunks[0].metadata == {ARTICLE_ID: 1, "Title": "X"}
+
+
+def test_chunk_docstore_round_trips_documents_through_pickle():
+    docstore = ChunkDocstore()
+    docstore.add(
+        {
+            "a": Document(page_content="chunk a", metadata={ARTICLE_ID: 3}),
+            "b": Document(page_content="chunk b", metadata={"source": "web"}),
+        }
+    )
+
+    restored = pickle.loads(pickle.dumps(docstore))
+
+    assert restored.search("a") == Document(
+        id="a", page_content="chunk a", metadata={ARTICLE_ID: 3}
+    )
+    assert restored.search("b").metadata == {"source": "web"}
+    assert restored.search("missing") == "ID missing not found."
+    restored.delete(["a"])
+    assert len(restored) == 1
+    assert restored.search("a") == "ID a not found."
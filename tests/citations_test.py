@@ -0,0 +1,56 @@
+import copy
+import pickle
+
+from core.citations import CitationRegistry
+from core.quality import build_numbered_references
+from core.states import _merge_citation_registries
+
+
+def test_register_assigns_next_number_and_reverse_lookup():
+    registry = CitationRegistry({"https://a.org": 1, "https://b.org": 4})
+
+    assert registry.register("https://c.org") == 5
+    assert registry.register("https://a.org") == 1
+    assert registry.next_number == 6
+    assert registry.url_for(4) == "https://b.org"
+    assert registry.url_for(2) is None
+
+
+def test_merge_numbers_new_urls_after_existing_ones():
+    current = {"https://a.org": 1, "https://b.org": 2}
+    new = {"https://c.org": 1, "https://a.org": 2, "https://d.org": 3}
+
+    merged = _merge_citation_registries(current, new)
+
+    assert merged == {
+        "https://a.org": 1,
+        "https://b.org": 2,
+        "https://c.org": 3,
+        "https://d.org": 4,
+    }
+    assert current == {"https://a.org": 1, "https://b.org": 2}
+    assert _merge_citation_registries(None, None) == {}
+
+
+def test_merge_returns_same_registry_when_nothing_is_new():
+    registry = CitationRegistry({"https://a.org": 1})
+
+    assert registry.merge({"https://a.org": 7}) is registry
+
+
+def test_copies_and_pickles_keep_the_index():
+    registry = CitationRegistry({"https://a.org": 1, "https://b.org": 2})
+
+    for clone in (copy.deepcopy(registry), pickle.loads(pickle.dumps(registry))):
+        assert clone == registry
+        assert clone.url_for(2) == "https://b.org"
+        assert clone.register("https://c.org") == 3
+
+
+def test_build_numbered_references_accepts_plain_dict():
+    sources = [{"url": "https://pubmed.ncbi.nlm.nih.gov/1/", "title": "Trial"}]
+    registry = {"https://pubmed.ncbi.nlm.nih.gov/1/": 3}
+
+    references = build_numbered_references(registry, sources, "See [3].")
+
+    assert "[3]" in references and "Trial" in references
@@ -0,0 +1,68 @@
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from core.compaction import compact_messages
+from utils.tokens import count_message_tokens
+
+
+def _call(name, call_id, **args):
+    return {"name": name, "args": args, "id": call_id, "type": "tool_call"}
+
+
+def _research_history(retriever_output: str, latest_output: str):
+    return [
+        SystemMessage(content="rules"),
+        HumanMessage(content="section spec"),
+        AIMessage(content="", tool_calls=[_call("retriever_tool", "r1", q="a")]),
+        ToolMessage(content=retriever_output, tool_call_id="r1"),
+        AIMessage(
+            content="",
+            tool_calls=[
+                _call("WriteToScratchpad", "w1", notes="n" * 800, mode="append"),
+                _call("web_search", "s1", search_query="b"),
+            ],
+        ),
+        ToolMessage(content="Wrote to scratchpad: " + "n" * 800, tool_call_id="w1"),
+        ToolMessage(content=latest_output, tool_call_id="s1"),
+    ]
+
+
+def test_compact_messages_leaves_small_requests_untouched():
+    messages = _research_history("short", "latest")
+
+    compacted, stats = compact_messages(messages, token_budget=10_000)
+
+    assert compacted == messages
+    assert stats.stubbed == 0
+    assert stats.saved_tokens == 0
+
+
+def test_compact_messages_stubs_captured_outputs_but_keeps_latest_round():
+    messages = _research_history("R" * 20_000, "L" * 4_000)
+
+    compacted, stats = compact_messages(messages, token_budget=1_500)
+
+    assert "Compacted retriever_tool output" in compacted[3].content
+    assert compacted[-1].content == "L" * 4_000
+    assert compacted[4] is messages[4]
+    assert len(compacted) == len(messages)
+    assert stats.after_tokens == count_message_tokens(compacted)
+    assert stats.saved_tokens > 4_000
+    assert messages[3].content == "R" * 20_000
+
+
+def test_compact_messages_stops_once_within_budget():
+    messages = _research_history("R" * 8_000, "L") + [
+        AIMessage(
+            content="",
+            tool_calls=[_call("WriteToScratchpad", "w2", notes="m" * 4_000)],
+        ),
+        ToolMessage(content="Wrote to scratchpad: " + "m" * 4_000, tool_call_id="w2"),
+    ]
+    budget = count_message_tokens(messages) - 1_000
+
+    compacted, stats = compact_messages(messages, token_budget=budget)
+
+    assert stats.stubbed == 1
+    assert "Compacted retriever_tool output" in compacted[3].content
+    assert compacted[4].tool_calls[0]["args"]["notes"] == "n" * 800
+    assert stats.after_tokens <= budget
@@ -0,0 +1,70 @@
+from rag.compression import GAP_MARKER, compress_to_query, split_sentences
+from utils import tokens
+
+_PAGE_LINES = (
+    "Home | About | Contact | Donate",
+    "[Privacy policy](https://example.org/privacy)",
+    "Malnutrition in early childhood is common in displaced populations.",
+    "Stunting before age two was linked to lower cognitive scores at school age.",
+    "The clinic opened a new waiting room in the spring of last year.",
+    "Volunteers organised a fundraising walk along the river path.",
+    "Severe wasting predicted delayed motor milestones in the cohort.",
+    "Subscribe to our newsletter for the latest updates.",
+)
+PAGE = "\n".join(_PAGE_LINES)
+
+
+def test_split_sentences_breaks_on_punctuation_and_lines():
+    assert split_sentences("First one. Second (n=12) one!\nThird line") == [
+        "First one.",
+        "Second (n=12) one!",
+        "Third line",
+    ]
+    assert split_sentences("Dose was 1.5 mg. e.g. lower") == [
+        "Dose was 1.5 mg. e.g. lower"
+    ]
+
+
+def test_compress_keeps_matching_sentences_in_page_order(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+
+    extract = compress_to_query(PAGE, "stunting wasting cognitive motor", 45)
+
+    assert extract.index("Stunting") < extract.index("Severe wasting")
+    assert "Home | About" not in extract and "Privacy" not in extract
+    assert "fundraising" not in extract
+    assert GAP_MARKER in extract
+    assert tokens.count_tokens(extract) <= 45
+
+
+def test_compress_returns_text_within_budget_unchanged():
+    assert compress_to_query("Short page.", "anything", 100) == "Short page."
+
+
+def test_compress_keeps_table_rows_that_match_the_query(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    table = "\n".join(
+        [
+            "| Outcome | Rate |",
+            "|---|---|",
+            "| Stunting | 31% |",
+            "| Wasting | 12% |",
+            *(f"| Clinic {i} | open |" for i in range(40)),
+        ]
+    )
+
+    extract = compress_to_query(table, "stunting prevalence", 30)
+
+    assert "| Stunting | 31% |" in extract
+    assert "Clinic" not in extract and "|---|" not in extract
+
+
+def test_compress_truncates_a_page_without_prose_instead_of_erasing_it(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    bullets = "\n".join(f"- Dose {i} mg daily." for i in range(200))
+
+    extract = compress_to_query(bullets, "adverse events", 40)
+
+    assert extract.startswith("- Dose 0 mg daily.")
+    assert extract.endswith(GAP_MARKER)
+    assert tokens.count_tokens(extract) <= 40
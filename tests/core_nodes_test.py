@@ -1,20 +1,45 @@
+import asyncio
 import unittest
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessageChunk, HumanMessage
 
 from core import nodes
+from core.schemas import Section
 
 
 class DummySection:
-    def __init__(self, name, research=True, content=None, sources=None):
+    def __init__(
+        self, name, research=True, content=None, sources=None, dependencies=None
+    ):
         self.name = name
         self.research = research
         self.content = content
         self.sources = sources or []
+        self.dependencies = dependencies or []
 
 
 class DummyState(dict):
     pass
 
 
+class ScriptedStreamingLLM:
+    """Streams each scripted reply as two chunks, recording every request."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+
+    async def astream(self, messages, config=None):
+        self.requests.append(messages)
+        text, finish_reason = self.replies.pop(0)
+        half = len(text) // 2
+        yield AIMessageChunk(content=text[:half])
+        yield AIMessageChunk(
+            content=text[half:], response_metadata={"finish_reason": finish_reason}
+        )
+
+
 class TestNodes(unittest.TestCase):
     def test_fan_out(self):
         sections = [DummySection("A"), DummySection("B")]
@@ -33,11 +58,63 @@ class TestNodes(unittest.TestCase):
         result = nodes.initiate_section_writing(state)
         self.assertIsInstance(result, list)
 
+    def test_initiate_section_writing_sends_non_research_sections_early(self):
+        state = DummyState(
+            sections=[
+                DummySection("Intro", research=False),
+                DummySection("A", research=True),
+                DummySection("Conclusion", research=False, dependencies=["a"]),
+            ],
+            run_id="",
+        )
+        sends = nodes.initiate_section_writing(state)
+        targets = sorted((s.node, s.arg["section"].name) for s in sends)
+        self.assertEqual(
+            targets,
+            [
+                ("build_section_with_tools", "A"),
+                ("write_scheduled_sections", "Conclusion"),
+                ("write_scheduled_sections", "Intro"),
+            ],
+        )
+        self.assertNotIn("completed_sections_context", sends[-1].arg)
+
+    def test_initiate_final_section_writing_skips_completed_sections(self):
+        intro = DummySection("Intro", research=False, content="done")
+        state = DummyState(
+            sections=[intro, DummySection("Conclusion", research=False)],
+            completed_sections=[intro],
+            completed_sections_context=[intro],
+        )
+        sends = nodes.initiate_final_section_writing(state)
+        self.assertEqual([s.arg["section"].name for s in sends], ["Conclusion"])
+
     def test_gather_completed_sections(self):
         state = DummyState(completed_sections=[1, 2, 3])
         out = nodes.gather_completed_sections(state)
         self.assertIn("completed_sections_context", out)
 
+    def test_write_sections_closes_budget_when_a_round_raises(self):
+        class FailingLLM:
+            async def ainvoke(self, _messages):
+                raise RuntimeError("provider down")
+
+        nodes.open_research_budget("failing-run", ["A"], nodes.config.research)
+        state = DummyState(
+            section=Section(name="A", description="a", research=True, content=""),
+            messages=[],
+            run_id="failing-run",
+            scratchpad_file="scratchpad_a.md",
+        )
+        with (
+            patch.object(nodes, "get_section_cache", lambda: None),
+            patch.object(nodes, "get_llm_with_tools", FailingLLM),
+            self.assertRaises(RuntimeError),
+        ):
+            asyncio.run(nodes.write_sections(state))
+
+        self.assertIsNone(nodes.close_research_budget("failing-run"))
+
     def test_initiate_final_section_writing(self):
         state = DummyState(
             sections=[DummySection("A", research=False)],
@@ -60,6 +137,34 @@ class TestNodes(unittest.TestCase):
         self.assertIn("quality_passed", out)
         self.assertIn("final_report", out)
 
+    def test_stream_synthesis_continues_when_token_cap_is_hit(self):
+        llm = ScriptedStreamingLLM(
+            ("## A\n\nFirst half of the sec", "length"),
+            ("tion ends here.", "stop"),
+        )
+        with patch.object(nodes, "get_llm", lambda: llm):
+            reply = asyncio.run(
+                nodes._stream_synthesis(
+                    DummySection("A"), [HumanMessage(content="write")]
+                )
+            )
+
+        self.assertEqual(reply.content, "## A\n\nFirst half of the section ends here.")
+        self.assertEqual(len(llm.requests), 2)
+        self.assertEqual(llm.requests[1][-2].content, "## A\n\nFirst half of the sec")
+        self.assertIn("Continue the section", llm.requests[1][-1].content)
+
+    def test_stream_synthesis_stops_after_max_continuations(self):
+        replies = [("part ", "length")] * (nodes.MAX_SYNTHESIS_CONTINUATIONS + 1)
+        llm = ScriptedStreamingLLM(*replies)
+        with patch.object(nodes, "get_llm", lambda: llm):
+            reply = asyncio.run(
+                nodes._stream_synthesis(DummySection("A"), [HumanMessage(content="x")])
+            )
+
+        self.assertEqual(len(llm.requests), nodes.MAX_SYNTHESIS_CONTINUATIONS + 1)
+        self.assertEqual(reply.content, "part " * len(replies))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,8 @@ from langchain_core.messages import AIMessage, ToolMessage
 from langgraph.graph import END
 
 from core import tool_node
+from core.verification import ScratchpadStats
+from utils.scratchpad_helpers import merge_scratchpad, new_entry, render_scratchpad
 
 
 def test_extract_dataset_path_handles_present_and_missing_values():
@@ -18,7 +20,7 @@ def test_extract_dataset_path_handles_present_and_missing_values():
 
 def test_call_context_build_update_tracks_all_side_effects(monkeypatch):
     state = {
-        "scratchpad": "existing notes",
+        "scratchpad": [{"id": "N1", "text": "existing notes"}],
         "sources": [],
         "active_csv_path": "",
         "run_id": "abc123",
@@ -30,7 +32,10 @@ def test_call_context_build_update_tracks_all_side_effects(monkeypatch):
     monkeypatch.setattr(
         tool_node,
         "_handle_write",
-        lambda args, current_state, call_id: ("updated notes", write_message),
+        lambda args, current_state, call_id: (
+            [new_entry("updated notes")],
+            write_message,
+        ),
     )
     monkeypatch.setattr(
         tool_node,
@@ -72,7 +77,7 @@ def test_call_context_build_update_tracks_all_side_effects(monkeypatch):
 
     update = ctx.build_update()
 
-    assert update["scratchpad"] == "updated notes"
+    assert update["scratchpad"] == [new_entry("updated notes")]
     assert update["active_csv_path"] == "data/pubmed_run_abc123.csv"
     assert len(update["messages"]) == 3
     assert update["sources"][0]["url"] == "https://example.org/study-one"
@@ -82,6 +87,31 @@ def test_call_context_build_update_tracks_all_side_effects(monkeypatch):
     assert update["citation_registry"]["https://example.org/study-one"] == 1
 
 
+def test_call_context_appends_scratchpad_deltas_and_stats():
+    state = {
+        "scratchpad": [{"id": "N1", "text": "first entry\n---"}],
+        "scratchpad_stats": ScratchpadStats.of("first entry\n---"),
+        "sources": [],
+        "citation_registry": {},
+    }
+    ctx = tool_node._CallContext(state)
+
+    asyncio.run(ctx.dispatch("WriteToScratchpad", {"notes": "second"}, "call-1"))
+    asyncio.run(ctx.dispatch("WriteToScratchpad", {"notes": "third"}, "call-2"))
+    update = ctx.build_update()
+
+    assert update["scratchpad"] == [new_entry("second"), new_entry("third")]
+    merged = merge_scratchpad(state["scratchpad"], update["scratchpad"])
+    assert [entry["id"] for entry in merged] == ["N1", "N2", "N3"]
+    stats = update["scratchpad_stats"]
+    assert stats == ScratchpadStats().apply(merged)
+    assert (stats.notes, stats.length) == (3, len(render_scratchpad(merged)))
+
+    asyncio.run(ctx.dispatch("ClearScratchpad", {"confirm": True}, "call-3"))
+
+    assert ctx.build_update()["scratchpad_stats"] == ScratchpadStats()
+
+
 def test_call_context_injects_active_csv_for_retriever(monkeypatch):
     captured_args = {}
 
@@ -117,20 +147,10 @@ def test_tool_node_returns_empty_messages_when_no_tool_calls():
 def test_tool_node_saves_scratchpad_when_updated(monkeypatch):
     saved = {}
 
-    monkeypatch.setattr(
-        tool_node,
-        "_handle_write",
-        lambda args, current_state, call_id: (
-            f"{current_state.get('scratchpad', '')}\n{args['notes']}".strip(),
-            ToolMessage(content="ok", tool_call_id=call_id),
-        ),
-    )
-
-    async def fake_save(content, filepath):
-        saved["content"] = content
-        saved["filepath"] = filepath
+    async def fake_append(delta, has_content, filepath):
+        saved.update(delta=delta, has_content=has_content, filepath=filepath)
 
-    monkeypatch.setattr(tool_node, "save_scratchpad_async", fake_save)
+    monkeypatch.setattr(tool_node, "append_scratchpad_async", fake_append)
 
     state = {
         "messages": [
@@ -145,7 +165,7 @@ def test_tool_node_saves_scratchpad_when_updated(monkeypatch):
                 ],
             )
         ],
-        "scratchpad": "existing",
+        "scratchpad": [{"id": "N1", "text": "existing"}],
         "scratchpad_file": "scratchpad_section.md",
         "sources": [],
         "active_csv_path": "",
@@ -153,9 +173,10 @@ def test_tool_node_saves_scratchpad_when_updated(monkeypatch):
 
     result = asyncio.run(tool_node.tool_node(state))
 
-    assert result["scratchpad"] == "existing\nnew evidence"
+    assert result["scratchpad"] == [new_entry("new evidence")]
     assert saved == {
-        "content": "existing\nnew evidence",
+        "delta": [new_entry("new evidence")],
+        "has_content": True,
         "filepath": "scratchpad_section.md",
     }
 
@@ -170,3 +191,34 @@ def test_tools_condition_routes_based_on_pending_calls():
 
     assert tool_node.tools_condition(with_calls) == "tools"
     assert tool_node.tools_condition(without_calls) == END
+
+
+def test_call_context_merges_tool_artifact_without_parsing_text(monkeypatch):
+    async def fake_external(name, args, call_id):
+        return ToolMessage(
+            content="Results mention https://unrelated.example/page",
+            artifact=[
+                {
+                    "url": "https://www.ncbi.nlm.nih.gov/pubmed/123",
+                    "title": "Trial  A",
+                    "authors": "Doe J",
+                }
+            ],
+            tool_call_id=call_id,
+        )
+
+    monkeypatch.setattr(tool_node, "_handle_external", fake_external)
+    ctx = tool_node._CallContext({"sources": [], "citation_registry": {}})
+
+    asyncio.run(ctx.dispatch("retriever_tool", {"search_query": "q"}, "call-1"))
+
+    assert ctx.sources == [
+        {
+            "id": "S1",
+            "url": "https://pubmed.ncbi.nlm.nih.gov/123/",
+            "label": "pubmed.ncbi.nlm.nih.gov/123",
+            "title": "Trial A",
+            "authors": "Doe J",
+        }
+    ]
+    assert ctx.citation_registry == {"https://pubmed.ncbi.nlm.nih.gov/123/": 1}
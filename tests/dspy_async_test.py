@@ -0,0 +1,25 @@
+import asyncio
+import threading
+
+from utils.dspy_async import apredict
+
+
+def test_apredict_awaits_acall_when_available():
+    class AsyncPredictor:
+        def __call__(self, **kwargs):
+            raise AssertionError("sync path should not be used")
+
+        async def acall(self, **kwargs):
+            return kwargs["topic"].upper()
+
+    assert asyncio.run(apredict(AsyncPredictor(), topic="nafld")) == "NAFLD"
+
+
+def test_apredict_falls_back_to_dedicated_executor():
+    def predictor(**kwargs):
+        return threading.current_thread().name, kwargs["topic"]
+
+    thread_name, topic = asyncio.run(apredict(predictor, topic="nafld"))
+
+    assert thread_name.startswith("dspy")
+    assert topic == "nafld"
@@ -1,4 +1,11 @@
-from utils.helpers import content_to_text, ensure_directory, validate_file_exists
+import json
+
+from utils.helpers import (
+    append_report_history,
+    content_to_text,
+    ensure_directory,
+    validate_file_exists,
+)
 
 
 def test_content_to_text_flattens_supported_list_items():
@@ -19,3 +26,15 @@ def test_ensure_directory_and_validate_file_exists(tmp_path):
     assert target_dir.exists()
     assert validate_file_exists(str(target_file)) is True
     assert validate_file_exists(str(target_dir / "missing.txt")) is False
+
+
+def test_append_report_history_creates_and_extends_store(tmp_path):
+    history_path = tmp_path / "history.json"
+
+    first = append_report_history(str(history_path), "Topic A", "# A")
+    append_report_history(str(history_path), "Topic B", "# B")
+
+    history = json.loads(history_path.read_text(encoding="utf-8"))
+    assert [h["topic"] for h in history] == ["Topic B", "Topic A"]
+    assert history[1]["id"] == first["id"]
+    assert set(history[1]) == {"id", "topic", "report", "created_at"}
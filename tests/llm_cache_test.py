@@ -0,0 +1,62 @@
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from utils import llm_cache
+from utils.llm_cache import LLMCacheMissError, SQLiteLLMCache
+
+
+def _model(cache, *replies):
+    return GenericFakeChatModel(
+        messages=iter([AIMessage(content=r) for r in replies]), cache=cache
+    )
+
+
+def test_record_then_replay_returns_stored_response(tmp_path):
+    path = tmp_path / "llm.sqlite"
+    prompt = [SystemMessage(content="rules"), HumanMessage(content="topic")]
+
+    recorder = _model(SQLiteLLMCache(path, "record"), "recorded answer", "unused")
+    assert recorder.invoke(prompt).content == "recorded answer"
+    assert recorder.invoke(prompt).content == "recorded answer"
+
+    replayer = _model(SQLiteLLMCache(path, "replay"), "live answer")
+    assert replayer.invoke(prompt).content == "recorded answer"
+
+
+def test_replay_mode_raises_on_miss(tmp_path):
+    replayer = _model(SQLiteLLMCache(tmp_path / "llm.sqlite", "replay"), "live")
+
+    with pytest.raises(LLMCacheMissError):
+        replayer.invoke([HumanMessage(content="never recorded")])
+
+
+def test_prompt_hash_ignores_message_ids_and_metadata(tmp_path):
+    cache = SQLiteLLMCache(tmp_path / "llm.sqlite", "record")
+    first = [
+        HumanMessage(content="q"),
+        AIMessage(content="a", id="run-1", response_metadata={"fingerprint": "x"}),
+        HumanMessage(content="follow-up"),
+    ]
+    second = [
+        HumanMessage(content="q"),
+        AIMessage(content="a", id="run-2", response_metadata={"fingerprint": "y"}),
+        HumanMessage(content="follow-up"),
+    ]
+
+    assert _model(cache, "cached").invoke(first).content == "cached"
+    assert _model(cache, "fresh").invoke(second).content == "cached"
+
+
+def test_cached_model_kwargs_follow_environment(monkeypatch, tmp_path):
+    llm_cache.get_llm_cache.cache_clear()
+    monkeypatch.setenv("LLM_CACHE_MODE", "off")
+    assert llm_cache.cached_model_kwargs() == {}
+
+    llm_cache.get_llm_cache.cache_clear()
+    monkeypatch.setenv("LLM_CACHE_MODE", "replay")
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm.sqlite"))
+    kwargs = llm_cache.cached_model_kwargs()
+    assert kwargs["cache"].mode == "replay"
+    assert kwargs["disable_streaming"] is True
+    llm_cache.get_llm_cache.cache_clear()
@@ -0,0 +1,79 @@
+import pytest
+
+from utils.near_dedup import (
+    NearDuplicateIndex,
+    close_near_duplicate_scope,
+    drop_near_duplicates,
+    jaccard,
+    near_duplicate_scope,
+    scope_index,
+    shingles,
+)
+
+ABSTRACT = (
+    "Background: Severe acute malnutrition in children under five remains a "
+    "leading cause of mortality in conflict-affected regions. Methods: We "
+    "followed 1,204 children admitted to therapeutic feeding centres in three "
+    "districts and recorded weight gain, relapse and death over twelve months. "
+    "Results: Ready-to-use therapeutic food reduced relapse by a third compared "
+    "with standard care, and mortality fell from 9.1% to 5.4%. Conclusions: "
+    "Community-based management should be scaled up alongside follow-up visits."
+)
+
+
+def test_shingles_and_jaccard():
+    assert shingles("One two three", size=5) == {"one two three"}
+    assert shingles("", size=5) == set()
+    a, b = shingles("a b c d e f"), shingles("a b c d e g")
+    assert jaccard(a, b) == pytest.approx(1 / 3)
+
+
+def test_index_flags_reworded_copy_but_not_distinct_text():
+    index = NearDuplicateIndex(threshold=0.7)
+    mirror = "PubMed Central copy. " + ABSTRACT.replace("a third", "one third")
+
+    assert index.is_duplicate(ABSTRACT) is False
+    assert index.is_duplicate(mirror) is True
+    assert index.is_duplicate(ABSTRACT[::-1]) is False
+    assert len(index) == 2
+
+
+def test_drop_near_duplicates_keeps_first_and_can_be_disabled():
+    items = [
+        ("pubmed", ABSTRACT),
+        ("publisher", ABSTRACT + " Funding: none."),
+        ("x", ""),
+    ]
+
+    kept = drop_near_duplicates(items, lambda item: item[1], threshold=0.8)
+
+    assert [name for name, _ in kept] == ["pubmed", "x"]
+    assert drop_near_duplicates(items, lambda item: item[1], None) == items
+    with pytest.raises(ValueError, match="threshold"):
+        NearDuplicateIndex(threshold=0)
+
+
+def test_drop_near_duplicates_fills_a_passed_empty_index():
+    index = NearDuplicateIndex(threshold=0.8)
+
+    drop_near_duplicates([ABSTRACT], str, 0.8, index)
+    kept = drop_near_duplicates([ABSTRACT + " Funding: none."], str, 0.8, index)
+
+    assert len(index) == 1
+    assert kept == []
+
+
+def test_scope_index_is_shared_until_the_scope_is_closed():
+    assert scope_index(0.8) is None
+
+    with near_duplicate_scope("run-1:Methods"):
+        index = scope_index(0.8)
+        assert scope_index(0.8) is index
+        assert scope_index(None) is None
+    with near_duplicate_scope("run-1:Methods"):
+        assert scope_index(0.8) is index
+
+    assert close_near_duplicate_scope("run-1:Methods") is index
+    with near_duplicate_scope("run-1:Methods"):
+        assert scope_index(0.8) is not index
+    close_near_duplicate_scope("run-1:Methods")
@@ -0,0 +1,63 @@
+import asyncio
+
+from agents import planner
+from agents.plan_cache import PlanCache, normalize_topic
+from config import ReportConfig
+from core.schemas import Section, Sections
+from core.states import ReportState
+
+
+def _plan(name="Outcomes"):
+    return Sections(
+        sections=[
+            Section(name=name, description="d", research=True, content="c"),
+        ]
+    )
+
+
+def test_normalize_topic_ignores_case_whitespace_and_punctuation():
+    assert normalize_topic("  GLP-1 in   NAFLD? ") == "glp-1 in nafld"
+
+
+def test_exact_lookup_matches_topic_and_report_config(tmp_path):
+    cache = PlanCache(tmp_path / "plans.sqlite")
+    cfg = ReportConfig(context="ctx", report_organization="org")
+    cache.store("GLP-1 in NAFLD", cfg, _plan())
+
+    hit = cache.lookup("glp-1 in nafld.", cfg)
+
+    assert hit is not None
+    assert hit.sections[0].name == "Outcomes"
+    assert cache.lookup("glp-1 in nafld", ReportConfig(context="other")) is None
+    assert cache.lookup("SGLT2 in NAFLD", cfg) is None
+
+
+def test_semantic_lookup_reuses_near_duplicate_topics(tmp_path):
+    vectors = {
+        "glp-1 in nafld": [1.0, 0.0],
+        "glp-1 agonists in nafld": [0.99, 0.14],
+        "malaria vaccines": [0.0, 1.0],
+    }
+    cache = PlanCache(tmp_path / "plans.sqlite", embed=vectors.get, threshold=0.95)
+    cfg = ReportConfig()
+    cache.store("GLP-1 in NAFLD", cfg, _plan())
+
+    assert cache.lookup("GLP-1 agonists in NAFLD", cfg) is not None
+    assert cache.lookup("Malaria vaccines", cfg) is None
+
+
+def test_generate_plan_skips_planner_on_cache_hit(monkeypatch, tmp_path):
+    cache = PlanCache(tmp_path / "plans.sqlite")
+    cache.store("child malnutrition", ReportConfig(), _plan("Stunting"))
+
+    def fail_predict(_signature):
+        raise AssertionError("planner should not run on a cache hit")
+
+    monkeypatch.setattr(planner, "get_plan_cache", lambda: cache)
+    monkeypatch.setattr(planner, "predictor", fail_predict)
+
+    state = ReportState(sections=None, topic="Child malnutrition")
+    result = asyncio.run(planner.generate_plan(state, {}))
+
+    assert [s.name for s in result["sections"]] == ["Stunting"]
+    assert len(result["run_id"]) == 8
@@ -1,5 +1,9 @@
 from core.schemas import Section
-from prompts.section_writer import get_synthesis_prompt
+from prompts.section_writer import (
+    get_initial_prompt,
+    get_synthesis_prompt,
+    section_writer_prompt,
+)
 
 
 def test_synthesis_prompt_includes_source_registry_block():
@@ -51,3 +55,21 @@ def test_synthesis_prompt_includes_numbered_citations():
     assert "WHO Report" in prompt
     assert "numbered citation [N]" in prompt
     assert "## Source Registry" in prompt
+
+
+def test_research_prompt_keeps_section_values_out_of_shared_prefix():
+    section = Section(
+        name="Nutrition Outcomes",
+        description="Stunting prevalence",
+        research=True,
+        content="",
+    )
+
+    initial = get_initial_prompt(section)
+
+    assert "{" not in section_writer_prompt
+    assert "Nutrition Outcomes" not in section_writer_prompt
+    assert "## Research Rules" in section_writer_prompt
+    assert "Nutrition Outcomes" in initial
+    assert "Stunting prevalence" in initial
+    assert "## Research Rules" not in initial
@@ -193,9 +193,11 @@ def test_initiate_section_writing_fans_out_research_sections():
     routes = initiate_section_writing({"sections": sections})
 
     assert isinstance(routes, list)
-    assert len(routes) == 1
     assert all(isinstance(route, Send) for route in routes)
-    assert routes[0].node == "build_section_with_tools"
+    assert [(r.node, r.arg["section"].name) for r in routes] == [
+        ("build_section_with_tools", "A"),
+        ("write_scheduled_sections", "B"),
+    ]
 
 
 def test_initiate_final_section_writing_routes_non_research_sections():
@@ -372,3 +374,24 @@ def test_detect_unresolved_placeholders_catches_all_patterns():
     clean = "Prevalence was 45% according to recent studies [1]. Outcomes improved [2]."
     issues = detect_unresolved_placeholders(clean)
     assert issues == []
+
+
+def test_merge_sources_reads_titles_from_web_and_pubmed_layouts():
+    text = (
+        "Source 1: WHO fact sheet\n"
+        "URL: https://www.who.int/fact-sheets/malnutrition\n"
+        "Most relevant content: see https://www.who.int/other.\n"
+        "## Source 2: Lancet review\n"
+        "**URL:** https://www.thelancet.com/article/1\n"
+        "- **Stunting in conflict zones** (BMJ, 2024)\n"
+        "  - https://pubmed.ncbi.nlm.nih.gov/123/\n"
+    )
+
+    titles = {s["url"]: s["title"] for s in merge_sources([], text)}
+
+    assert titles == {
+        "https://www.who.int/fact-sheets/malnutrition": "WHO fact sheet",
+        "https://www.who.int/other": "",
+        "https://www.thelancet.com/article/1": "Lancet review",
+        "https://pubmed.ncbi.nlm.nih.gov/123/": "Stunting in conflict zones",
+    }
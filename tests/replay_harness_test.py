@@ -0,0 +1,38 @@
+import asyncio
+
+from core.tracing import NodeTrace, RunTrace
+from scripts.replay_harness import LatencyModel, ReplayProfile, load_fixture, run_replay
+
+
+def test_run_replay_profiles_every_node_offline(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fixture = load_fixture(None, num_sections=2)
+    fixture["final_content"] = {"Conclusion": "## Conclusion\n\nRecorded text."}
+
+    profile = asyncio.run(run_replay(fixture, LatencyModel.zero()))
+
+    assert profile.nodes["build_section_with_tools"].calls == 2
+    assert profile.nodes["write_scheduled_sections"].calls == 2
+    assert "write_final_sections" not in profile.nodes
+    for node in ("generate_report_plan", "tools", "compile_final_report"):
+        assert profile.nodes[node].calls >= 1
+    assert profile.llm_usage["generate_report_plan"]["calls"] == 1
+    assert profile.llm_usage["write_sections"]["calls"] >= 2
+    assert profile.report_chars > 0
+
+
+def test_replay_profile_reports_overlap_of_top_level_nodes():
+    nodes = [
+        NodeTrace("plan", "plan:1", 1, 0.0, 1.0),
+        NodeTrace("worker", "worker:2", 2, 1.0, 3.0),
+        NodeTrace("worker", "worker:3", 2, 1.0, 4.0),
+        NodeTrace("write_sections", "worker:3|write_sections:4", 1, 1.0, 2.0),
+    ]
+    trace = RunTrace("unit", "2026-01-01T00:00:00", 0, 4.0, nodes)
+
+    profile = ReplayProfile.from_trace(trace, report="r")
+
+    assert profile.peak_concurrency == 2
+    assert profile.mean_concurrency == 1.5
+    assert profile.nodes["worker"].peak_concurrency == 2
+    assert profile.nodes["worker"].max_seconds == 3.0
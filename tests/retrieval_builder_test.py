@@ -3,6 +3,7 @@ from types import SimpleNamespace
 from langchain_core.documents import Document
 
 from rag import retrieval_builder
+from rag.chunk_store import ArticleStore, ChunkDocstore
 
 
 def test_resolve_csv_path_prefers_existing_explicit_file(tmp_path):
@@ -196,6 +197,44 @@ def test_build_retriever_falls_back_to_dense_retriever(monkeypatch, tmp_path):
     assert calls["count"] == 2
 
 
+def test_build_retriever_with_article_store_hydrates_dense_fallback(
+    monkeypatch, tmp_path
+):
+    captured = {}
+
+    class DummyVectorStore:
+        def as_retriever(self, search_kwargs):
+            return "dense"
+
+    def fake_batch_process(docs, embeddings, persist_directory, docstore):
+        captured.setdefault("docstores", []).append(docstore)
+        if len(captured["docstores"]) == 1:
+            raise RuntimeError("boom")
+        return DummyVectorStore()
+
+    monkeypatch.setattr(retrieval_builder, "batch_process", fake_batch_process)
+    monkeypatch.setattr(
+        retrieval_builder,
+        "ContextualCompressionRetriever",
+        lambda base_compressor, base_retriever: (base_compressor, base_retriever),
+    )
+    store, chunks = ArticleStore.from_documents(
+        [Document(page_content="useful content", metadata={"Title": "T"})]
+    )
+
+    compressor, dense = retrieval_builder.build_retriever(
+        chunks,
+        embeddings=object(),
+        persist_directory=str(tmp_path / "faiss"),
+        article_store=store,
+    )
+
+    assert dense == "dense"
+    assert compressor.compress_documents(chunks, "q")[0].metadata["Title"] == "T"
+    first, second = captured["docstores"]
+    assert isinstance(second, ChunkDocstore) and first is not second
+
+
 def test_get_retriever_resolves_documents_and_persist_directory(monkeypatch):
     captured = {}
 
@@ -205,7 +244,7 @@ def test_get_retriever_resolves_documents_and_persist_directory(monkeypatch):
     monkeypatch.setattr(
         retrieval_builder,
         "load_documents_from_csv",
-        lambda path: [Document(page_content="doc", metadata={})],
+        lambda path: [Document(page_content="doc", metadata={"Title": "T"})],
     )
     monkeypatch.setattr(
         retrieval_builder,
@@ -213,8 +252,11 @@ def test_get_retriever_resolves_documents_and_persist_directory(monkeypatch):
         lambda docs, embeddings: [Document(page_content="chunk", metadata={})],
     )
 
-    def fake_build_retriever(docs, embeddings, retriever_config, persist_directory):
+    def fake_build_retriever(
+        docs, embeddings, retriever_config, persist_directory, article_store
+    ):
         captured["docs"] = docs
+        captured["article_store"] = article_store
         captured["embeddings"] = embeddings
         captured["persist_directory"] = persist_directory
         return "retriever"
@@ -226,6 +268,7 @@ def test_get_retriever_resolves_documents_and_persist_directory(monkeypatch):
     assert result == "retriever"
     assert captured["embeddings"] == "emb"
     assert captured["docs"][0].page_content == "chunk"
+    assert captured["article_store"].metadata(0) == {"Title": "T"}
     assert (
         captured["persist_directory"] == retrieval_builder.config.paths.faiss_index_dir
     )
@@ -1,6 +1,8 @@
 from langchain_core.documents import Document
 
 from rag.retrieval_formatter import RetrieverReportGenerator
+from utils import tokens
+from utils.tokens import count_tokens
 
 
 def test_process_retriever_results_groups_by_url_and_preserves_metadata():
@@ -65,3 +67,55 @@ def test_create_report_includes_stats_and_multichunk_section():
     assert report["stats"]["total_chunks"] == 2
     assert "Custom Title" in report["markdown"]
     assert "Documents with Multiple Chunks" in report["markdown"]
+
+
+def _doc(title, score, content):
+    return Document(
+        page_content=content,
+        metadata={
+            "Title": title,
+            "Url": f"https://example.org/{title[-1].lower()}",
+            "relevance_score": score,
+        },
+    )
+
+
+def test_create_report_lays_out_documents_best_score_first():
+    docs = [_doc("Paper A", 0.2, "low"), _doc("Paper B", 0.9, "high")]
+
+    markdown = RetrieverReportGenerator().create_report(docs)["markdown"]
+
+    assert markdown.index("## 1. Paper B") < markdown.index("## 2. Paper A")
+
+
+def test_create_report_drops_lowest_scoring_chunks_to_fit_budget(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    words = "evidence " * 300
+    docs = [
+        _doc("Paper A", 0.9, "best " + words),
+        _doc("Paper A", 0.5, "middle " + words),
+        _doc("Paper B", 0.8, "second " + words),
+        _doc("Paper C", 0.1, "worst " + words),
+    ]
+    generator = RetrieverReportGenerator(token_budget=1200, max_chunks_per_doc=1)
+
+    report = generator.create_report(docs)
+    markdown = report["markdown"]
+
+    assert "best" in markdown and "second" in markdown
+    assert "middle" not in markdown and "worst" not in markdown
+    assert "(showing 1)" in markdown
+    assert report["stats"]["omitted_chunks"] == 2
+    assert [s["title"] for s in report["sources"]] == ["Paper A", "Paper B"]
+    assert count_tokens(markdown) < 1400
+
+
+def test_create_report_truncates_chunks_to_document_cap():
+    docs = [_doc("Paper A", 0.9, "word " * 1000)]
+
+    markdown = RetrieverReportGenerator(max_doc_tokens=100).create_report(docs)[
+        "markdown"
+    ]
+
+    assert "[...]" in markdown
+    assert count_tokens(markdown) < 300
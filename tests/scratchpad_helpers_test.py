@@ -1,33 +1,92 @@
 from utils.scratchpad_helpers import (
+    SCRATCHPAD_RESET,
+    append_scratchpad,
     handle_clear,
     handle_read,
     handle_write,
-    save_scratchpad,
+    merge_scratchpad,
+    new_entry,
+    render_scratchpad,
 )
 
+BASE = [{"id": "N1", "text": "base"}]
+
 
 def test_handle_write_append_and_replace_modes():
-    appended, _ = handle_write({"notes": "new", "mode": "append"}, "base", "1")
-    replaced, _ = handle_write({"notes": "new", "mode": "replace"}, "base", "2")
+    appended, _ = handle_write({"notes": "new", "mode": "append"}, "1")
+    replaced, _ = handle_write({"notes": "new", "mode": "replace"}, "2")
 
-    assert appended == "base\n\nnew"
-    assert replaced == "new"
+    assert render_scratchpad(merge_scratchpad(BASE, appended)) == "base\n\nnew"
+    assert render_scratchpad(merge_scratchpad(BASE, replaced)) == "new"
 
 
 def test_handle_read_and_clear_responses():
-    read_msg = handle_read({"query": "keywords"}, "notes here", "1")
-    unchanged, cancel_msg = handle_clear({"confirm": False}, "2", "existing notes")
-    cleared, ok_msg = handle_clear({"confirm": True}, "3", "existing notes")
+    read_msg = handle_read({"query": "base"}, BASE, "1")
+    unchanged, cancel_msg = handle_clear({"confirm": False}, "2")
+    cleared, ok_msg = handle_clear({"confirm": True}, "3")
 
-    assert "query: 'keywords'" in read_msg.content
-    assert "notes here" in read_msg.content
-    assert unchanged == "existing notes"
+    assert "query: 'base'" in read_msg.content
+    assert "### N1\nbase" in read_msg.content
+    assert merge_scratchpad(BASE, unchanged) == BASE
     assert "cancelled" in cancel_msg.content
-    assert cleared == ""
+    assert merge_scratchpad(BASE, cleared) == []
     assert "cleared successfully" in ok_msg.content
 
 
-def test_save_scratchpad_persists_content(tmp_path):
-    save_scratchpad("hello", "note.md", str(tmp_path))
+def test_handle_read_returns_ranked_matches_within_budget():
+    entries = merge_scratchpad(
+        [],
+        [
+            new_entry("**CITATION**: Smith (2021) semaglutide liver fibrosis RCT"),
+            new_entry("**CITATION**: Lee (2020) metformin glycaemic control"),
+            new_entry("**CITATION**: Chen (2022) semaglutide weight loss " + "x" * 400),
+        ],
+    )
+
+    matched = handle_read({"query": "semaglutide fibrosis"}, entries, "1").content
+    budgeted = handle_read(
+        {"query": "semaglutide"}, entries, "2", token_budget=30
+    ).content
+    missing = handle_read({"query": "insulin pump"}, entries, "3").content
+
+    assert matched.index("### N1") < matched.index("### N3")
+    assert "metformin" not in matched
+    assert "Showing 1 of 2 matching entries" in budgeted
+    assert "No entries match" in missing
+
+
+def test_handle_read_all_returns_coverage_summary():
+    entries = merge_scratchpad(
+        [],
+        [new_entry(f"**CITATION**: Study {i}\n" + "detail " * 200) for i in range(3)],
+    )
+
+    summary = handle_read({"query": "all"}, entries, "1").content
+    truncated = handle_read({"query": "all"}, entries, "2", token_budget=40).content
+
+    assert "3 entries" in summary
+    assert "- N2 (~" in summary and "**CITATION**: Study 1" in summary
+    assert "detail detail" not in summary
+    assert "more entries" in truncated
+
+
+def test_merge_scratchpad_numbers_entries_after_reset():
+    merged = merge_scratchpad(
+        BASE, [new_entry("a"), SCRATCHPAD_RESET, new_entry("b"), new_entry("c")]
+    )
+
+    assert merged == [{"id": "N1", "text": "b"}, {"id": "N2", "text": "c"}]
+    assert BASE == [{"id": "N1", "text": "base"}]
+
 
-    assert (tmp_path / "note.md").read_text(encoding="utf-8") == "hello"
+def test_append_scratchpad_matches_rendered_entries(tmp_path):
+    entries: list = []
+    for delta in (
+        [new_entry("a")],
+        [new_entry("b")],
+        [SCRATCHPAD_RESET, new_entry("c")],
+    ):
+        append_scratchpad(delta, bool(entries), "note.md", str(tmp_path))
+        entries = merge_scratchpad(entries, delta)
+        written = (tmp_path / "note.md").read_text(encoding="utf-8")
+        assert written == render_scratchpad(entries)
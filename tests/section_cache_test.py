@@ -0,0 +1,114 @@
+import asyncio
+import sqlite3
+
+from langchain_core.messages import AIMessage
+
+from core import nodes
+from core.schemas import Section
+from core.section_cache import SectionCache, remap_citations
+from utils.scratchpad_helpers import render_scratchpad
+
+VECTORS = {
+    "Mechanism of Action\nHow GLP-1 agonists act": [1.0, 0.0],
+    "Mechanism of Action\nHow GLP-1 agonists act in NAFLD": [0.99, 0.1],
+    "Mechanism of Action\nHow GLP-1 agonists reduce weight": [0.9, 0.43],
+    "Adverse Events\nSafety profile": [0.0, 1.0],
+}
+SOURCES = [
+    {"title": "Trial A", "url": "https://pubmed.ncbi.nlm.nih.gov/111/"},
+    {"title": "Trial B", "url": "https://pubmed.ncbi.nlm.nih.gov/222/"},
+]
+
+
+def _section(description, content=""):
+    return Section(
+        name="Mechanism of Action",
+        description=description,
+        research=True,
+        content=content,
+    )
+
+
+def _cache(tmp_path, **kwargs):
+    cache = SectionCache(tmp_path / "sections.sqlite", VECTORS.get, **kwargs)
+    done = _section("How GLP-1 agonists act", "GLP-1 slows emptying [2] and [1, 2].")
+    done.sources = SOURCES
+    registry = {SOURCES[0]["url"]: 1, SOURCES[1]["url"]: 2}
+    cache.store(done, "## Notes\nGLP-1 receptor findings", registry)
+    return cache
+
+
+def test_remap_citations_renumbers_single_and_grouped_markers():
+    old = {"a": 1, "b": 2}
+    new = {"a": 2, "b": 1}
+
+    assert remap_citations("x [1] y [1, 2]", old, new) == "x [2] y [2, 1]"
+
+
+def test_lookup_classifies_reuse_and_seed_hits(tmp_path):
+    cache = _cache(tmp_path)
+
+    reuse = cache.lookup(_section("How GLP-1 agonists act in NAFLD"))
+    seed = cache.lookup(_section("How GLP-1 agonists reduce weight"))
+
+    assert reuse.reusable and reuse.sources == SOURCES
+    assert not seed.reusable and "GLP-1 receptor" in seed.scratchpad
+    unrelated = Section(
+        name="Adverse Events", description="Safety profile", research=True, content=""
+    )
+    assert cache.lookup(unrelated) is None
+
+
+def test_stale_entries_are_ignored(tmp_path):
+    cache = _cache(tmp_path)
+    with sqlite3.connect(tmp_path / "sections.sqlite") as conn:
+        conn.execute("UPDATE section_cache SET created_at = '2000-01-01T00:00:00'")
+
+    assert cache.lookup(_section("How GLP-1 agonists act in NAFLD")) is None
+
+
+def test_write_sections_reuses_cached_section_without_llm(monkeypatch, tmp_path):
+    cache = _cache(tmp_path)
+
+    class FailingLLM:
+        async def ainvoke(self, _messages):
+            raise AssertionError("LLM should not run on a cache hit")
+
+    monkeypatch.setattr(nodes, "get_section_cache", lambda: cache)
+    monkeypatch.setattr(nodes, "get_llm_with_tools", FailingLLM)
+
+    state = {"section": _section("How GLP-1 agonists act in NAFLD"), "messages": []}
+    result = asyncio.run(nodes.write_sections(state))
+
+    (section,) = result["completed_sections"]
+    assert section.description == "How GLP-1 agonists act in NAFLD"
+    assert "[1, 2]" in section.content
+    assert section.sources == SOURCES
+    assert not result["messages"][-1].tool_calls
+
+
+def test_write_sections_seeds_scratchpad_from_related_section(monkeypatch, tmp_path):
+    cache = _cache(tmp_path)
+
+    class RecordingLLM:
+        async def ainvoke(self, messages):
+            self.messages = messages
+            return AIMessage(content="", tool_calls=[])
+
+    llm = RecordingLLM()
+    written = []
+
+    async def fake_append(delta, has_content, filepath):
+        written.append((render_scratchpad(delta[1:]), has_content))
+
+    monkeypatch.setattr(nodes, "get_section_cache", lambda: cache)
+    monkeypatch.setattr(nodes, "get_llm_with_tools", lambda: llm)
+    monkeypatch.setattr(nodes, "append_scratchpad_async", fake_append)
+
+    state = {"section": _section("How GLP-1 agonists reduce weight"), "messages": []}
+    result = asyncio.run(nodes.write_sections(state))
+
+    assert "GLP-1 receptor" in render_scratchpad(result["scratchpad"])
+    assert written == [("## Notes\nGLP-1 receptor findings", False)]
+    assert result["sources"] == SOURCES
+    assert "closely related section" in llm.messages[-1].content
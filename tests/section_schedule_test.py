@@ -0,0 +1,118 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+
+from agents import planner
+from core import nodes
+from core.budget import close_research_budget
+from core.schemas import Section
+from core.section_schedule import (
+    SectionSchedule,
+    close_section_schedule,
+    open_section_schedule,
+    schedulable_sections,
+)
+
+
+def _section(name, research=False, dependencies=None):
+    return Section(
+        name=name,
+        description=f"{name} description",
+        research=research,
+        content="",
+        dependencies=dependencies or [],
+    )
+
+
+def test_schedulable_sections_skip_non_research_cycles():
+    sections = [
+        _section("Introduction"),
+        _section("Findings", research=True, dependencies=["Summary"]),
+        _section("Summary", dependencies=["findings"]),
+        _section("Glossary", dependencies=["Outlook", "Unplanned"]),
+        _section("Outlook", dependencies=["Glossary"]),
+        _section("Appendix", dependencies=["Outlook"]),
+    ]
+
+    names = [s.name for s in schedulable_sections(sections)]
+
+    assert names == ["Introduction", "Summary"]
+
+
+def test_section_without_dependencies_waits_for_all_research():
+    introduction = _section("Introduction")
+    findings = _section("Findings", research=True)
+    costs = _section("Costs", research=True)
+    schedule = SectionSchedule([introduction, findings, costs])
+
+    async def scenario():
+        waiter = asyncio.create_task(schedule.dependencies_of(introduction))
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        findings.content = "Findings text"
+        schedule.complete(findings)
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        schedule.complete(costs)
+        return await asyncio.wait_for(waiter, timeout=5)
+
+    context = asyncio.run(scenario())
+
+    assert [s.name for s in context] == ["Findings", "Costs"]
+    assert context[0].content == "Findings text"
+
+
+def test_dependent_section_is_written_before_unrelated_research_finishes(
+    monkeypatch,
+):
+    findings = _section("Findings", research=True)
+    costs = _section("Costs", research=True)
+    summary = _section("Summary", dependencies=["findings"])
+    contexts = []
+
+    class RecordingInstructions:
+        def __call__(self, section_title, section_topic, context):
+            contexts.append(context)
+            return type("Result", (), {"section_content": "Summary text"})()
+
+    class FinishingLLM:
+        async def ainvoke(self, _messages):
+            return AIMessage(content="Findings text")
+
+    monkeypatch.setattr(planner, "predictor", lambda _: RecordingInstructions())
+    monkeypatch.setattr(nodes, "get_section_cache", lambda: None)
+    monkeypatch.setattr(nodes, "get_llm_with_tools", FinishingLLM)
+
+    async def scenario():
+        open_section_schedule("run-s", [findings, costs, summary])
+        costs_done = asyncio.Event()
+        slow_research = asyncio.create_task(costs_done.wait())
+        writer = asyncio.create_task(
+            planner.write_scheduled_sections({"section": summary, "run_id": "run-s"})
+        )
+        await asyncio.sleep(0)
+        assert not writer.done()
+
+        await nodes.write_sections(
+            {"section": findings, "messages": [], "run_id": "run-s"}
+        )
+        findings.content = "edited after completion"
+        result = await asyncio.wait_for(writer, timeout=5)
+
+        assert not slow_research.done()
+        costs_done.set()
+        await slow_research
+        return result
+
+    try:
+        result = asyncio.run(scenario())
+    finally:
+        close_section_schedule("run-s")
+        close_research_budget("run-s")
+
+    assert result["completed_sections"][0].content == "Summary text"
+    ((context,),) = contexts
+    assert context is not findings
+    assert context.content == "Findings text"
@@ -1,4 +1,7 @@
+import re
+
 from rag.source_formatter import SourceFormatter
+from utils import tokens
 
 
 def test_extract_sources_list_supports_dict_and_nested_list_inputs():
@@ -19,15 +22,51 @@ def test_extract_sources_list_supports_dict_and_nested_list_inputs():
     assert len(from_list) == 3
 
 
-def test_truncate_content_uses_word_boundary_when_possible():
+def test_truncate_content_uses_word_boundary_when_possible(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
     content = "word " * 300
 
-    truncated = SourceFormatter._truncate_content(content, char_limit=120)
+    truncated = SourceFormatter._truncate_content(content, token_limit=30)
 
-    assert truncated.endswith("... [content truncated]")
+    assert truncated.endswith("word... [content truncated]")
     assert len(truncated) < len(content)
 
 
+def test_raw_content_shares_one_budget_across_sources(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    short = "A short abstract. " * 5
+    long_page = "Long trial report sentence. " * 500
+    formatter = SourceFormatter(max_tokens_per_source=None, total_token_budget=600)
+
+    output = formatter.deduplicate_and_format_sources(
+        [
+            {"url": "https://a", "title": "A", "raw_content": short},
+            {"url": "https://b", "title": "B", "raw_content": long_page},
+            {"url": "https://c", "title": "C", "raw_content": long_page},
+        ]
+    )
+
+    assert short.strip() in output
+    assert output.count("[content truncated]") == 2
+    # The short source's unused share goes to the two long ones.
+    limits = [int(n) for n in re.findall(r"limited to ~(\d+) tokens", output)]
+    assert limits[0] < 200 < min(limits[1:])
+    assert sum(limits) <= 600
+    assert tokens.estimate_tokens(output) < 800
+
+
+def test_zero_token_share_is_not_labelled_full(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    formatter = SourceFormatter(max_tokens_per_source=None, total_token_budget=0)
+
+    output = formatter.deduplicate_and_format_sources(
+        [{"url": "https://a", "title": "A", "raw_content": "A trial report."}]
+    )
+
+    assert "limited to ~0 tokens" in output
+    assert "(full)" not in output
+
+
 def test_deduplicate_and_format_sources_plain_text_output():
     formatter = SourceFormatter(include_raw_content=False, markdown_output=False)
     search_response = {
@@ -57,3 +96,38 @@ def test_deduplicate_and_format_sources_return_dict_has_unique_urls():
     )
 
     assert sorted(unique.keys()) == ["https://a", "https://b"]
+
+
+def test_query_extracts_raw_content_before_budgeting(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    page = " ".join(
+        ["Cookie settings and newsletter sign-up for all our readers."] * 200
+        + ["Zinc supplementation reduced diarrhoea duration in children."]
+    )
+    formatter = SourceFormatter(query="zinc diarrhoea", extract_tokens_per_source=50)
+
+    output = formatter.deduplicate_and_format_sources(
+        [{"url": "https://a", "title": "A", "raw_content": page}]
+    )
+
+    assert "Zinc supplementation reduced diarrhoea" in output
+    assert "query-focused extract" in output
+    assert tokens.estimate_tokens(output) < 150
+
+
+def test_near_duplicate_sources_are_dropped_from_output_and_records():
+    story = "Measles cases rose sharply across the region this winter. " * 20
+    results = [
+        {"url": "https://news-a", "title": "A", "raw_content": story},
+        {"url": "https://news-b", "title": "B", "raw_content": "Syndicated. " + story},
+        {"url": "https://other", "title": "C", "raw_content": "Unrelated trial."},
+    ]
+    formatter = SourceFormatter(near_duplicate_threshold=0.7)
+
+    output = formatter.deduplicate_and_format_sources(results)
+
+    assert "Source 2: C" in output and "news-b" not in output
+    assert [r["url"] for r in formatter.source_records(results)] == [
+        "https://news-a",
+        "https://other",
+    ]
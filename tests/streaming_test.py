@@ -0,0 +1,74 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, MessagesState, StateGraph
+
+from core.streaming import emit_section, stream_report, synthesis_config
+
+
+def _build_graph(llm, section):
+    async def synthesize(state):
+        response = await llm.ainvoke("write", config=synthesis_config(section.name))
+        section.content = response.content
+        emit_section(section, "synthesis")
+        return {"messages": [response]}
+
+    async def untagged(state):
+        return {"messages": [await llm.ainvoke("plan")]}
+
+    def validate_report_quality(state):
+        return {"final_report": "done", "quality_passed": True}
+
+    class State(MessagesState):
+        final_report: str
+        quality_passed: bool
+
+    sub = StateGraph(MessagesState)
+    sub.add_node("synthesize", synthesize)
+    sub.set_entry_point("synthesize")
+    sub.add_edge("synthesize", END)
+
+    builder = StateGraph(State)
+    builder.add_node("untagged", untagged)
+    builder.add_node("section", sub.compile())
+    builder.add_node("validate_report_quality", validate_report_quality)
+    builder.set_entry_point("untagged")
+    builder.add_edge("untagged", "section")
+    builder.add_edge("section", "validate_report_quality")
+    return builder.compile()
+
+
+def test_emit_section_is_noop_outside_graph_run():
+    emit_section(SimpleNamespace(name="A", content="x", research=True), "final")
+
+
+def test_stream_report_yields_tokens_sections_and_final_report():
+    llm = GenericFakeChatModel(
+        messages=iter([AIMessage(content="ignored plan"), AIMessage(content="a b")])
+    )
+    section = SimpleNamespace(name="Findings", content="", research=True)
+
+    async def collect():
+        graph = _build_graph(llm, section)
+        return [event async for event in stream_report(graph, {"messages": []})]
+
+    events = asyncio.run(collect())
+
+    tokens = [e for e in events if e["type"] == "token"]
+    assert "".join(t["text"] for t in tokens) == "a b"
+    assert {t["section"] for t in tokens} == {"Findings"}
+    sections = [e for e in events if e["type"] == "section"]
+    assert sections == [
+        {
+            "type": "section",
+            "phase": "synthesis",
+            "section": "Findings",
+            "research": True,
+            "content": "a b",
+        }
+    ]
+    assert events[-1]["type"] == "report"
+    assert events[-1]["final_report"] == "done"
+    assert events.index(sections[0]) < events.index(events[-1])
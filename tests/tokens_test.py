@@ -0,0 +1,55 @@
+from utils import tokens
+
+
+class CharTokenizer:
+    """One token per character."""
+
+    def encode(self, text, disallowed_special=()):
+        return list(text)
+
+    def decode(self, ids):
+        return "".join(ids)
+
+
+def test_count_tokens_uses_tokenizer_or_falls_back(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", CharTokenizer)
+    assert tokens.count_tokens("abcdefgh") == 8
+
+    monkeypatch.setattr(tokens, "get_tokenizer", lambda: None)
+    assert tokens.count_tokens("abcdefgh") == 2
+
+
+def test_truncate_to_tokens_cuts_at_sentence_boundary(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", CharTokenizer)
+    text = "First finding holds. Second finding (n=40) also holds. Third one trails"
+
+    truncated = tokens.truncate_to_tokens(text, 60, marker=" [...]")
+
+    assert truncated == "First finding holds. Second finding (n=40) also holds. [...]"
+    assert len(truncated) <= 60
+    assert tokens.truncate_to_tokens("short", 60) == "short"
+
+
+def test_truncate_to_tokens_falls_back_to_word_boundary(monkeypatch):
+    monkeypatch.setattr(tokens, "get_tokenizer", CharTokenizer)
+
+    truncated = tokens.truncate_to_tokens("alpha beta gamma delta", 15, marker="…")
+
+    assert truncated == "alpha beta…"
+
+
+def test_truncate_to_tokens_encodes_only_a_prefix_of_long_text(monkeypatch):
+    encoded = []
+
+    class RecordingTokenizer(CharTokenizer):
+        def encode(self, text, disallowed_special=()):
+            encoded.append(len(text))
+            return list(text)
+
+    monkeypatch.setattr(tokens, "get_tokenizer", RecordingTokenizer)
+    text = "Evidence sentence. " * 5000
+
+    truncated = tokens.truncate_to_tokens(text, 40, marker=" [...]")
+
+    assert truncated == "Evidence sentence. [...]"
+    assert max(encoded) <= 41 * tokens.MAX_CHARS_PER_TOKEN
@@ -180,3 +180,18 @@ def test_format_pubmed_rows():
 def test_build_output():
     out = pubmed_search._build_output("q", "f", ["row1"], 1)
     assert "DATASET_PATH" in out
+
+
+def test_source_records_follow_listed_rows():
+    df = _make_df(
+        [
+            {"Title": "T1", "Url": "https://example.org/1", "Authors": "Doe J"},
+            {"Title": "", "Url": "https://example.org/2", "Authors": "Roe R"},
+            {"Title": "T3", "Url": "https://example.org/3", "Authors": None},
+        ]
+    )
+
+    assert pubmed_search._source_records(df) == [
+        {"url": "https://example.org/1", "title": "T1", "authors": "Doe J"},
+        {"url": "https://example.org/3", "title": "T3", "authors": ""},
+    ]
@@ -17,6 +17,18 @@ def test_deduplicate_documents_keeps_first_instance_by_page_content():
     assert out[1].page_content == "B"
 
 
+def test_deduplicate_documents_drops_near_duplicates_with_threshold():
+    text = "Zinc supplementation shortened acute diarrhoea in children " * 8
+    docs = [
+        [Document(page_content=text, metadata={"id": 1})],
+        [Document(page_content=text + "(PMC mirror)", metadata={"id": 2})],
+    ]
+
+    assert len(retrieval.deduplicate_documents(docs)) == 2
+    out = retrieval.deduplicate_documents(docs, near_duplicate_threshold=0.8)
+    assert [doc.metadata["id"] for doc in out] == [1]
+
+
 def test_retriever_tool_error(monkeypatch):
     monkeypatch.setattr(
         retrieval,
@@ -28,7 +40,7 @@ def test_retriever_tool_error(monkeypatch):
     monkeypatch.setattr(
         retrieval,
         "RetrieverReportGenerator",
-        lambda: type(
+        lambda **limits: type(
             "R", (), {"create_report": staticmethod(lambda docs: {"markdown": ""})}
         )(),
     )
@@ -14,7 +14,7 @@ class DummyState:
                 {"tool_calls": [{"name": "WriteToScratchpad", "args": {}, "id": 1}]},
             )()
         ]
-        self.scratchpad = ""
+        self.scratchpad = []
         self.scratchpad_file = ""
 
 
@@ -22,14 +22,15 @@ def test_tool_node_handles_write(monkeypatch):
     monkeypatch.setattr(
         scratchpad,
         "handle_write",
-        lambda args, scratchpad_text, call_id: (
-            "new",
+        lambda args, call_id: (
+            [{"id": "", "text": "new"}],
             ToolMessage(content="done", tool_call_id=call_id),
         ),
     )
     state = DummyState()
     result = asyncio.run(scratchpad.tool_node(state))
     assert "messages" in result
+    assert result["scratchpad"] == [{"id": "", "text": "new"}]
 
 
 def test_tools_condition_tools():
@@ -1,6 +1,7 @@
 import asyncio
 
 from tools import web_search
+from utils.near_dedup import close_near_duplicate_scope, near_duplicate_scope
 
 
 class DummyTavily:
@@ -23,6 +24,31 @@ def test_run_tavily_returns_result(monkeypatch):
     asyncio.run(run())
 
 
+def test_run_tavily_waits_for_shared_rate_limit(monkeypatch):
+    calls = []
+
+    class RecordingLimiter:
+        async def aacquire(self):
+            calls.append("acquire")
+
+    class RecordingTavily(DummyTavily):
+        async def ainvoke(self, args):
+            calls.append("search")
+            return await super().ainvoke(args)
+
+    monkeypatch.setattr(web_search, "TavilySearch", RecordingTavily)
+    monkeypatch.setattr(
+        web_search.config.research, "web_search_requests_per_second", 1.0
+    )
+    monkeypatch.setattr(
+        web_search.config, "_rate_limiters", {"tavily": RecordingLimiter()}
+    )
+
+    asyncio.run(web_search._run_tavily("q", max_results=1, include_raw_content=True))
+
+    assert calls == ["acquire", "search"]
+
+
 def test_run_tavily_returns_empty_list_on_error(monkeypatch):
     class BrokenTavily:
         def __init__(self, **kwargs):
@@ -53,29 +79,39 @@ def test_web_search_formats_search_results(monkeypatch):
         return [{"results": [{"url": "https://example.org", "title": "Source"}]}]
 
     class DummyFormatter:
-        def __init__(self, markdown_output):
+        def __init__(self, markdown_output, query, **kwargs):
             captured["markdown_output"] = markdown_output
+            captured["formatter_query"] = query
 
-        def deduplicate_and_format_sources(self, search_response):
+        def format_with_records(self, search_response):
             captured["search_response"] = search_response
-            return "formatted"
+            return "formatted", [
+                {"url": "https://example.org", "title": "Source", "authors": ""}
+            ]
 
     monkeypatch.setattr(web_search, "_run_tavily", fake_run_tavily)
     monkeypatch.setattr(web_search, "SourceFormatter", DummyFormatter)
 
-    result = asyncio.run(
+    message = asyncio.run(
         web_search.web_search.ainvoke(
             {
-                "search_query": "pediatric trauma",
-                "max_results": 2,
-                "include_raw_content": False,
-                "markdown_output": True,
+                "type": "tool_call",
+                "name": "web_search",
+                "id": "call-1",
+                "args": {
+                    "search_query": "pediatric trauma",
+                    "max_results": 2,
+                    "include_raw_content": False,
+                    "markdown_output": True,
+                },
             }
         )
     )
 
-    assert result == "formatted"
+    assert message.content == "formatted"
+    assert message.artifact[0]["title"] == "Source"
     assert captured["markdown_output"] is True
+    assert captured["formatter_query"] == "pediatric trauma"
     assert (
         captured["search_response"][0][0]["results"][0]["url"] == "https://example.org"
     )
@@ -86,10 +122,10 @@ def test_web_search_returns_empty_list_when_formatter_fails(monkeypatch):
         return [{"results": []}]
 
     class BrokenFormatter:
-        def __init__(self, markdown_output):
+        def __init__(self, **kwargs):
             pass
 
-        def deduplicate_and_format_sources(self, search_response):
+        def format_with_records(self, search_response):
             raise RuntimeError("formatting failed")
 
     monkeypatch.setattr(web_search, "_run_tavily", fake_run_tavily)
@@ -100,3 +136,34 @@ def test_web_search_returns_empty_list_when_formatter_fails(monkeypatch):
     )
 
     assert result == []
+
+
+def test_web_search_skips_pages_seen_earlier_in_the_same_scope(monkeypatch):
+    page = "Zinc supplementation shortened acute diarrhoea in young children. " * 12
+    urls = iter(["https://who.int/zinc", "https://mirror.example/zinc"])
+
+    async def fake_run_tavily(query, max_results, include_raw_content):
+        url = next(urls)
+        return {"results": [{"url": url, "title": "Zinc", "raw_content": page}]}
+
+    monkeypatch.setattr(web_search, "_run_tavily", fake_run_tavily)
+
+    def call():
+        return asyncio.run(
+            web_search.web_search.ainvoke(
+                {
+                    "type": "tool_call",
+                    "name": "web_search",
+                    "id": "call-1",
+                    "args": {"search_query": "zinc diarrhoea"},
+                }
+            )
+        )
+
+    with near_duplicate_scope("run-1:Treatment"):
+        first, second = call(), call()
+    close_near_duplicate_scope("run-1:Treatment")
+
+    assert [r["url"] for r in first.artifact] == ["https://who.int/zinc"]
+    assert second.artifact == []
+    assert second.content == "No unique sources found after deduplication"
@@ -0,0 +1,149 @@
+import asyncio
+import json
+import operator
+from types import SimpleNamespace
+from typing import Annotated, TypedDict
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.tools import tool
+from langgraph.graph import END, StateGraph
+from langgraph.types import Send
+
+from core.tracing import (
+    RunTrace,
+    _usage_from_llm_result,
+    emit_lm_usage,
+    export_json,
+    traced_invoke,
+)
+
+
+class _State(TypedDict, total=False):
+    topics: list[str]
+    topic: str
+    results: Annotated[list[str], operator.add]
+
+
+@tool
+async def lookup(query: str) -> str:
+    """Look up a query."""
+    await asyncio.sleep(0.01)
+    return query.upper()
+
+
+def _build_graph():
+    model = GenericFakeChatModel(
+        # A list iterator, not a generator: both workers call next() from
+        # executor threads, and a generator raises if entered concurrently.
+        messages=iter(
+            [
+                AIMessage(
+                    content="ok",
+                    usage_metadata={
+                        "input_tokens": 10,
+                        "output_tokens": 3,
+                        "total_tokens": 13,
+                        "input_token_details": {"cache_read": 8},
+                    },
+                )
+                for _ in range(2)
+            ]
+        )
+    )
+
+    async def plan(state):
+        await emit_lm_usage(
+            SimpleNamespace(
+                get_lm_usage=lambda: {
+                    "deepseek": {
+                        "prompt_tokens": 100,
+                        "completion_tokens": 20,
+                        "prompt_tokens_details": {"cached_tokens": 64},
+                    }
+                }
+            )
+        )
+        return {"topics": ["a", "b"]}
+
+    async def worker(state):
+        await model.ainvoke(state["topic"])
+        return {"results": [await lookup.ainvoke({"query": state["topic"]})]}
+
+    builder = StateGraph(_State)
+    builder.add_node("plan", plan)
+    builder.add_node("worker", worker)
+    builder.add_conditional_edges(
+        "plan", lambda s: [Send("worker", {"topic": t}) for t in s["topics"]]
+    )
+    builder.add_edge("worker", END)
+    builder.set_entry_point("plan")
+    return builder.compile()
+
+
+def test_traced_invoke_records_tokens_tools_and_workers(tmp_path):
+    result, trace = asyncio.run(
+        traced_invoke(_build_graph(), {}, run_name="unit", trace_dir=tmp_path)
+    )
+
+    assert sorted(result["results"]) == ["A", "B"]
+    summary = trace.by_node()
+    assert summary["plan"].prompt_tokens == 100
+    assert summary["plan"].completion_tokens == 20
+    assert summary["worker"].runs == 2
+    assert summary["worker"].llm_calls == 2
+    assert summary["worker"].prompt_tokens == 20
+    assert summary["worker"].tool_calls == 2
+    assert summary["worker"].cache_read_tokens == 16
+    assert summary["worker"].cache_hit_rate == 0.8
+    assert summary["plan"].cache_read_tokens == 64
+    assert summary["worker"].tool_seconds > 0
+    assert all(node.queue_seconds >= 0 for node in trace.nodes)
+
+    [path] = tmp_path.glob("unit_*.json")
+    exported = json.loads(path.read_text("utf-8"))
+    assert exported["summary"]["worker"]["runs"] == 2
+    assert exported["summary"]["worker"]["cache_read_tokens"] == 16
+    assert trace.run_id[:8] in path.name
+    assert "worker" in trace.summary()
+
+
+def test_llm_usage_reads_deepseek_cache_hits_from_raw_usage():
+    message = AIMessage(
+        content="",
+        usage_metadata={
+            "input_tokens": 2000,
+            "output_tokens": 10,
+            "total_tokens": 2010,
+        },
+        response_metadata={"token_usage": {"prompt_cache_hit_tokens": 768}},
+    )
+    result = LLMResult(generations=[[ChatGeneration(message=message)]])
+
+    assert _usage_from_llm_result(result) == (2000, 10, 768, 0)
+
+
+def test_emit_lm_usage_is_a_no_op_outside_a_run():
+    prediction = SimpleNamespace(get_lm_usage=lambda: {"m": {"prompt_tokens": 1}})
+
+    asyncio.run(emit_lm_usage(prediction))
+    asyncio.run(emit_lm_usage(object()))
+
+
+def test_export_json_writes_named_trace(tmp_path):
+    _, trace = asyncio.run(traced_invoke(_build_graph(), {}, trace_dir=None))
+
+    path = export_json(trace, tmp_path / "nested")
+
+    assert path.parent == tmp_path / "nested"
+    assert json.loads(path.read_text("utf-8"))["run_name"] == "report"
+
+
+def test_export_json_keeps_runs_started_in_the_same_second(tmp_path):
+    first = RunTrace("report", "2026-01-01T00:00:00", 0, 1.0, [])
+    second = RunTrace("report", "2026-01-01T00:00:00", 0, 1.0, [])
+
+    paths = {export_json(first, tmp_path), export_json(second, tmp_path)}
+
+    assert len(paths) == 2
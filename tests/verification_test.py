@@ -1,4 +1,9 @@
-from core.verification import build_conservative_instruction, verify_scratchpad
+from core.verification import (
+    ScratchpadStats,
+    build_conservative_instruction,
+    scratchpad_stats,
+    verify_scratchpad,
+)
 
 
 def _make_quant_entry(n_points: int = 3) -> str:
@@ -76,3 +81,32 @@ def test_build_conservative_instruction_lists_failures():
     assert "Insufficient sources" in instruction
     assert "Scratchpad too short" in instruction
     assert "hedge claims" in instruction
+
+
+def test_scratchpad_stats_match_full_verification_as_notes_are_appended():
+    notes = [
+        _make_quant_entry(4) + "\n---",
+        "**SOURCE TYPE**: Web Search - no full-text indexed\n" + _make_plain_entry(),
+        "\n---\n" + _make_quant_entry(3),
+        "---\n" + _make_plain_entry() + " " * 300,
+    ]
+    stats, pad = ScratchpadStats(), ""
+    for count, note in enumerate(notes, start=1):
+        stats = stats.append(note)
+        pad = f"{pad}\n\n{note}" if pad else note
+        assert (stats.notes, stats.length) == (count, len(pad))
+        for web_only in (False, True):
+            assert stats.verify(web_only) == verify_scratchpad(pad, web_only)
+    assert stats.verify().passed
+
+
+def test_scratchpad_stats_rebuilt_when_out_of_date():
+    old = [{"id": "N1", "text": "old notes"}]
+    new = old + [{"id": "N2", "text": "more"}]
+    stale = ScratchpadStats.of("old notes")
+
+    assert scratchpad_stats(old, stale) is stale
+    rebuilt = scratchpad_stats(new, stale)
+    assert (rebuilt.notes, rebuilt.length) == (2, len("old notes\n\nmore"))
+    assert rebuilt.verify() == verify_scratchpad("old notes\n\nmore")
+    assert scratchpad_stats(old, {"length": 9}) == stale
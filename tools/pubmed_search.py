@@ -9,6 +9,7 @@ from loguru import logger
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from config import config
 from scripts.pubmed_scraper import PubMedScraper
 
 _DATA_DIR = Path("data")
@@ -38,6 +39,25 @@ def _format_pubmed_rows(df) -> list[str]:
     return rows
 
 
+def _source_records(df) -> list[dict[str, str]]:
+    """Source records for the rows listed by ``_format_pubmed_rows``."""
+    records: list[dict[str, str]] = []
+    for _, row in df.head(8).iterrows():
+        title = str(row.get("Title", "")).strip()
+        url = str(row.get("Url", "")).strip()
+        if title and url:
+            authors = row.get("Authors")
+            records.append(
+                {
+                    "url": url,
+                    "title": title,
+                    # Missing CSV cells come back as NaN
+                    "authors": authors.strip() if isinstance(authors, str) else "",
+                }
+            )
+    return records
+
+
 def _build_output(
     search_query: str, output_file: str, rows: list[str], total: int
 ) -> str:
@@ -82,35 +102,42 @@ async def _run_scraper(search_query, start_date, end_date, max_results, output_f
         temperature=0.1,
     )
 
+    # One slot per query: pymed throttles its own requests, but per scraper.
+    if (limiter := config.pubmed_rate_limiter) is not None:
+        await limiter.aacquire()
     df = await scraper.scrape_async()
 
     if df.empty:
-        return "No PubMed studies found for the provided query and date range."
+        return "No PubMed studies found for the provided query and date range.", []
 
     with _csv_write_lock:
         _deduplicate_csv(output_file)
 
     rows = _format_pubmed_rows(df)
     if not rows:
-        return "PubMed returned records, but no usable citation fields were extracted."
+        return (
+            "PubMed returned records, but no usable citation fields were extracted.",
+            [],
+        )
 
-    return _build_output(search_query, output_file, rows, len(df))
+    output = _build_output(search_query, output_file, rows, len(df))
+    return output, _source_records(df)
 
 
-@tool
+@tool(response_format="content_and_artifact")
 async def pubmed_scraper_tool(
     search_query: str,
     max_results: int = 25,
     start_date: str = "2018/01/01",
     end_date: str = "",
     csv_path: str = "",
-) -> str:
+) -> tuple[str, list[dict[str, str]]]:
     """Search PubMed live, persist to CSV, and mark that CSV as active for retrieval."""
     if not search_query.strip():
-        return "The `search_query` cannot be empty."
+        return "The `search_query` cannot be empty.", []
 
     if not os.environ.get("ENTREZ_EMAIL"):
-        return "ENTREZ_EMAIL is not configured"
+        return "ENTREZ_EMAIL is not configured", []
 
     if not end_date:
         end_date = datetime.now().strftime("%Y/%m/%d")
@@ -123,7 +150,7 @@ async def pubmed_scraper_tool(
         )
     except RuntimeError as exc:
         logger.error(f"PubMed scraper exhausted retries: {exc}")
-        return f"PubMed scraping failed after retries: {exc}"
+        return f"PubMed scraping failed after retries: {exc}", []
     except Exception as exc:
         logger.error(f"Error in pubmed_scraper_tool: {exc}")
-        return f"PubMed scraping failed: {exc}"
+        return f"PubMed scraping failed: {exc}", []
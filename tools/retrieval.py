@@ -2,11 +2,21 @@ from langchain.tools import tool
 from langchain_core.documents import Document
 from loguru import logger
 
+from config import config
 from rag.retrieval_builder import get_retriever
 from rag.retrieval_formatter import RetrieverReportGenerator
+from utils.near_dedup import NearDuplicateIndex, drop_near_duplicates, scope_index
 
 
-def deduplicate_documents(documents: list[list[Document]]):
+def deduplicate_documents(
+    documents: list[list[Document]],
+    near_duplicate_threshold: float | None = None,
+    index: NearDuplicateIndex | None = None,
+):
+    """Drop repeated chunks, keeping the first; with a threshold, near-repeats too.
+
+    ``index`` also drops chunks that nearly repeat ones it has already seen.
+    """
     seen = set()
     unique_docs = []
 
@@ -16,25 +26,36 @@ def deduplicate_documents(documents: list[list[Document]]):
                 seen.add(doc.page_content)
                 unique_docs.append(doc)
 
-    return unique_docs
+    return drop_near_duplicates(
+        unique_docs, lambda d: d.page_content, near_duplicate_threshold, index
+    )
 
 
-@tool
+@tool(response_format="content_and_artifact")
 async def retriever_tool(search_query: str, csv_path: str = ""):
     """Retrieves pubmed data using the provided query and generates a report in markdown
     format."""
     try:
         retriever = get_retriever(csv_path=csv_path or None)
-        report_gen = RetrieverReportGenerator()
+        report_gen = RetrieverReportGenerator(
+            token_budget=config.retriever.report_token_budget,
+            max_chunks_per_doc=config.retriever.report_max_chunks_per_doc,
+            max_doc_tokens=config.retriever.report_max_doc_tokens,
+        )
         result = await retriever.ainvoke(search_query)
 
         if not result:
             logger.warning(f"No results found for query: {search_query}")
-            return "No relevant documents found for the given query"
-
-        deduplicated_results = deduplicate_documents([result])
+            return "No relevant documents found for the given query", []
+
+        threshold = config.retriever.source_near_duplicate_threshold
+        deduplicated_results = deduplicate_documents(
+            [result], threshold, scope_index(threshold)
+        )
+        if not deduplicated_results:
+            return "All retrieved documents repeat earlier results for this section", []
         report = report_gen.create_report(deduplicated_results)
-        return report["markdown"]
+        return report["markdown"], report.get("sources", [])
     except Exception as e:
         logger.error(f"Error in retriever_tool: {str(e)}")
-        return f"Error retrieving data: {str(e)}"
+        return f"Error retrieving data: {str(e)}", []
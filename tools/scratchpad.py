@@ -11,10 +11,10 @@ from core.schemas import (
 from tools.retrieval import retriever_tool
 from tools.web_search import web_search
 from utils.scratchpad_helpers import (
+    append_scratchpad,
     handle_clear,
     handle_read,
     handle_write,
-    save_scratchpad,
 )
 
 SECTION_TOOLS = [
@@ -28,26 +28,26 @@ _EXTERNAL_TOOLS = [web_search, retriever_tool]
 _TOOL_BY_NAME = {t.name: t for t in _EXTERNAL_TOOLS}
 
 
-def _save_scratchpad(content: str, filepath: str) -> None:
-    save_scratchpad(content, filepath, app_config.paths.scratchpad_output_dir)
+def _append_scratchpad(delta: list, has_content: bool, filepath: str) -> None:
+    append_scratchpad(
+        delta, has_content, filepath, app_config.paths.scratchpad_output_dir
+    )
 
 
 async def _dispatch(name: str, args: dict, state: ScratchpadState, call_id: str):
     """Route a tool call to its handler.
 
-    Returns (scratchpad_update | None, ToolMessage).
+    Returns (scratchpad delta, ToolMessage).
     """
-    scratchpad = getattr(state, "scratchpad", "")
-
     if name == "WriteToScratchpad":
-        return handle_write(args, scratchpad, call_id)
+        return handle_write(args, call_id)
     if name == "ReadFromScratchpad":
-        return None, handle_read(args, scratchpad, call_id)
+        return [], handle_read(args, getattr(state, "scratchpad", []), call_id)
     if name == "ClearScratchpad":
-        return handle_clear(args, call_id, scratchpad)
+        return handle_clear(args, call_id)
 
     content = str(await _TOOL_BY_NAME[name].ainvoke(args))
-    return None, ToolMessage(content=content, tool_call_id=call_id)
+    return [], ToolMessage(content=content, tool_call_id=call_id)
 
 
 async def tool_node(state: ScratchpadState) -> dict:
@@ -57,21 +57,24 @@ async def tool_node(state: ScratchpadState) -> dict:
         return {"messages": []}
 
     result_messages: list[ToolMessage] = []
-    scratchpad_update = None
+    scratchpad_delta: list = []
     scratchpad_file = getattr(state, "scratchpad_file", "")
 
     for tc in last_message.tool_calls:
         call_id = str(tc.get("id") or "unknown")
-        update, msg = await _dispatch(tc["name"], tc["args"], state, call_id)
+        delta, msg = await _dispatch(tc["name"], tc["args"], state, call_id)
         result_messages.append(msg)
-        if update is not None:
-            scratchpad_update = update
+        scratchpad_delta.extend(delta)
 
     result: dict = {"messages": result_messages}
-    if scratchpad_update is not None:
-        result["scratchpad"] = scratchpad_update
+    if scratchpad_delta:
+        result["scratchpad"] = scratchpad_delta
         if scratchpad_file:
-            _save_scratchpad(scratchpad_update, scratchpad_file)
+            _append_scratchpad(
+                scratchpad_delta,
+                bool(getattr(state, "scratchpad", [])),
+                scratchpad_file,
+            )
 
     return result
 
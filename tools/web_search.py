@@ -2,7 +2,9 @@ from langchain_core.tools import tool
 from langchain_tavily import TavilySearch
 from loguru import logger
 
+from config import config
 from rag.source_formatter import SourceFormatter
+from utils.near_dedup import scope_index
 
 
 async def _run_tavily(
@@ -16,29 +18,37 @@ async def _run_tavily(
             include_raw_content=include_raw_content,
             topic="general",
         )
+        if (limiter := config.web_search_rate_limiter) is not None:
+            await limiter.aacquire()
         return await tavily.ainvoke({"query": query})
     except Exception as exc:
         logger.error(f"Tavily search error: {exc}")
         return []
 
 
-@tool
+@tool(response_format="content_and_artifact")
 async def web_search(
     search_query: str,
     max_results: int = 1,
     include_raw_content: bool = True,
     markdown_output: bool = False,
-) -> list:
+) -> tuple[str | list, list[dict[str, str]]]:
     """Search the web for the given query and return deduplicated formatted sources."""
     if not search_query.strip():
         logger.warning("web_search called with empty query")
-        return []
+        return [], []
 
     try:
         raw = await _run_tavily(search_query, max_results, include_raw_content)
-        return SourceFormatter(
-            markdown_output=markdown_output
-        ).deduplicate_and_format_sources([raw])
+        threshold = config.retriever.source_near_duplicate_threshold
+        formatter = SourceFormatter(
+            markdown_output=markdown_output,
+            query=search_query,
+            extract_tokens_per_source=config.research.web_extract_tokens_per_source,
+            near_duplicate_threshold=threshold,
+            near_duplicate_index=scope_index(threshold),
+        )
+        return formatter.format_with_records([raw])
     except Exception as exc:
         logger.error(f"web_search failed: {exc}")
-        return []
+        return [], []
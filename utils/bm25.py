@@ -0,0 +1,62 @@
+"""Small in-memory Okapi BM25 index for ranking short texts against a query.
+
+Used where pulling in a retriever would be overkill: scratchpad reads rank a
+section's notes, and the web-search compressor ranks sentences of a page.
+"""
+
+import math
+import re
+from collections import Counter
+
+# Keeps hyphenated and decimal terms whole ("glp-1", "1.5").
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-.][a-z0-9]+)*")
+_STOPWORDS = frozenset([
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "in",
+    "is", "it", "of", "on", "or", "that", "the", "to", "was", "were", "with",
+])  # fmt: skip
+
+
+def tokenize(text: str) -> list[str]:
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in _STOPWORDS
+    ]
+
+
+class BM25:
+    """Okapi BM25 over a fixed list of documents."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._term_counts = [Counter(tokenize(doc)) for doc in documents]
+        self._lengths = [sum(counts.values()) for counts in self._term_counts]
+        self._avg_length = sum(self._lengths) / len(documents) if documents else 0.0
+        document_frequency: Counter[str] = Counter()
+        for counts in self._term_counts:
+            document_frequency.update(counts.keys())
+        n = len(documents)
+        self._idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        terms = [t for t in set(tokenize(query)) if t in self._idf]
+        scores = []
+        for counts, length in zip(self._term_counts, self._lengths, strict=True):
+            norm = self.k1 * (1 - self.b + self.b * length / (self._avg_length or 1))
+            scores.append(
+                sum(
+                    self._idf[t] * counts[t] * (self.k1 + 1) / (counts[t] + norm)
+                    for t in terms
+                    if t in counts
+                )
+            )
+        return scores
+
+    def top_k(self, query: str, k: int) -> list[tuple[int, float]]:
+        """Indices and scores of the ``k`` best matches, excluding non-matches."""
+        ranked = sorted(enumerate(self.scores(query)), key=lambda p: p[1], reverse=True)
+        return [(index, score) for index, score in ranked[:k] if score > 0]
@@ -2,6 +2,8 @@ import os
 from pathlib import Path
 
 import pandas as pd
+from langchain_community.docstore.base import Docstore
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from langchain_experimental.text_splitter import SemanticChunker
@@ -80,8 +82,12 @@ def batch_process(
     persist_directory: str = "outputs/faiss_index",
     batch_size: int = 10,
     force_rebuild: bool = False,
+    docstore: Docstore | None = None,
 ) -> FAISS:
-    """Return a FAISS index, loading from disk if it already exists."""
+    """Return a FAISS index, loading from disk if it already exists.
+
+    ``docstore`` replaces the default ``InMemoryDocstore`` for a new index.
+    """
     ensure_directory(persist_directory)
     index_path = os.path.join(persist_directory, "index.faiss")
 
@@ -93,7 +99,9 @@ def batch_process(
     batches = [
         documents[i : i + batch_size] for i in range(0, len(documents), batch_size)
     ]
-    index = FAISS.from_documents(batches[0], embeddings)
+    if docstore is None:
+        docstore = InMemoryDocstore()
+    index = FAISS.from_documents(batches[0], embeddings, docstore=docstore)
     for batch in batches[1:]:
         index.add_documents(batch)
 
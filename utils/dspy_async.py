@@ -0,0 +1,39 @@
+"""Async execution for DSPy predictors.
+
+DSPy 3 predictors expose ``acall``, which awaits the LM through LiteLLM's async
+client instead of holding a thread for the whole request. Predictors without it
+(older DSPy releases, custom modules, test doubles) run on a dedicated bounded
+executor, so concurrent reports cannot exhaust the default thread pool that
+PubMed queries and file I/O rely on.
+"""
+
+import asyncio
+import contextvars
+import functools
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+DSPY_FALLBACK_WORKERS = 4
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _fallback_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=DSPY_FALLBACK_WORKERS, thread_name_prefix="dspy"
+        )
+    return _executor
+
+
+async def apredict(predictor, **kwargs):
+    """Run a DSPy predictor without blocking the event loop."""
+    acall = getattr(predictor, "acall", None)
+    if acall is not None and inspect.iscoroutinefunction(acall):
+        return await acall(**kwargs)
+
+    # Copy the context like asyncio.to_thread so DSPy settings and tracing
+    # callbacks still apply on the worker thread.
+    call = functools.partial(contextvars.copy_context().run, predictor, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(_fallback_executor(), call)
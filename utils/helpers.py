@@ -1,5 +1,9 @@
+import json
+import os
 import sys
+import uuid
 import warnings
+from datetime import datetime
 from pathlib import Path
 
 import nest_asyncio
@@ -86,3 +90,30 @@ def ensure_directory(dir_path: str):
         dir_path: Path to the directory
     """
     Path(dir_path).mkdir(parents=True, exist_ok=True)
+
+
+def append_report_history(history_path: str, topic: str, report: str) -> dict:
+    """Add a finished report to the JSON history store, newest first.
+
+    Args:
+        history_path: Path to the history file (a JSON list of entries)
+        topic: Topic the report was generated for
+        report: Final report markdown
+
+    Returns:
+        The entry that was added
+    """
+    path = Path(history_path)
+    history = json.loads(path.read_text(encoding="utf-8")) if path.exists() else []
+    entry = {
+        "id": str(uuid.uuid4()),
+        "topic": topic,
+        "report": report,
+        "created_at": datetime.now().strftime("%d %b %Y, %H:%M"),
+    }
+    history.insert(0, entry)
+
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return entry
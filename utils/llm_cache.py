@@ -0,0 +1,128 @@
+"""Local SQLite cache for LangChain chat model responses.
+
+Set ``LLM_CACHE_MODE`` to make DeepSeek calls reproducible:
+
+- ``off`` (default): no caching.
+- ``record``: serve hits from the cache and store every new response.
+- ``replay``: serve hits only; a miss raises ``LLMCacheMissError`` instead of
+  calling the API, so benchmarks and CI runs never touch the network.
+
+Entries are keyed by the model configuration (model, temperature, max tokens,
+bound tools) and a hash of the prompt messages with per-run noise (message ids,
+response and usage metadata) removed. DSPy predictors already cache through
+DSPy's own disk cache under ``DSPY_CACHEDIR``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import warnings
+from functools import lru_cache
+from hashlib import sha256
+from pathlib import Path
+from typing import Any, Literal
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+CacheMode = Literal["off", "record", "replay"]
+
+_DEFAULT_CACHE_PATH = "storage/llm_cache.sqlite"
+_VOLATILE_MESSAGE_FIELDS = ("id", "response_metadata", "usage_metadata")
+
+
+class LLMCacheMissError(RuntimeError):
+    """Raised in replay mode when a request has no recorded response."""
+
+
+def _strip_volatile(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    stripped = {k: _strip_volatile(v) for k, v in value.items()}
+    if value.get("lc") == 1 and isinstance(stripped.get("kwargs"), dict):
+        for name in _VOLATILE_MESSAGE_FIELDS:
+            stripped["kwargs"].pop(name, None)
+    return stripped
+
+
+def normalized_prompt_hash(prompt: str, llm_string: str) -> str:
+    """Hash a serialized prompt and model configuration, ignoring per-run noise."""
+    try:
+        prompt = json.dumps(_strip_volatile(json.loads(prompt)), sort_keys=True)
+    except json.JSONDecodeError:
+        pass
+    return sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+
+class SQLiteLLMCache(BaseCache):
+    """LangChain ``BaseCache`` backed by a single SQLite table."""
+
+    def __init__(self, path: str | Path, mode: CacheMode = "record"):
+        self.path = Path(path)
+        self.mode = mode
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, llm_string TEXT, response TEXT)"
+        )
+        self._conn.commit()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = normalized_prompt_hash(prompt, llm_string)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            if self.mode == "replay":
+                raise LLMCacheMissError(
+                    f"No recorded LLM response for request {key[:12]} in {self.path}"
+                )
+            return None
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            return [loads(generation) for generation in json.loads(row[0])]
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        if self.mode != "record":
+            return
+        key = normalized_prompt_hash(prompt, llm_string)
+        response = json.dumps([dumps(generation) for generation in return_val])
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                (key, llm_string, response),
+            )
+            self._conn.commit()
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+
+@lru_cache(maxsize=1)
+def get_llm_cache() -> SQLiteLLMCache | None:
+    """Return the process-wide LLM cache configured by ``LLM_CACHE_MODE``."""
+    mode = os.environ.get("LLM_CACHE_MODE", "off").strip().lower()
+    if mode not in ("record", "replay"):
+        return None
+    path = os.environ.get("LLM_CACHE_PATH", "").strip() or _DEFAULT_CACHE_PATH
+    return SQLiteLLMCache(path, mode)  # type: ignore[arg-type]
+
+
+def cached_model_kwargs() -> dict[str, Any]:
+    """Chat model kwargs that route calls through the configured LLM cache.
+
+    Streaming bypasses LangChain's cache, so cached models are switched to
+    non-streaming calls; ``astream`` then falls back to a single cached reply.
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return {}
+    return {"cache": cache, "disable_streaming": True}
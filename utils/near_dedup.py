@@ -0,0 +1,188 @@
+"""Near-duplicate detection with MinHash signatures and LSH banding.
+
+Exact deduplication (same URL, same chunk text) misses syndicated articles and
+an abstract reached through PubMed, PMC and the publisher. ``NearDuplicateIndex``
+compares texts by the Jaccard similarity of their word shingles. Each text gets
+a MinHash signature, and LSH buckets the signatures by band, so a new text is
+only compared with the few stored texts that share a band rather than with
+every one. ``drop_near_duplicates`` keeps the first of each group of
+near-duplicates. It is used when chunks are indexed and when tool output is
+formatted.
+
+A section's research loop makes many tool calls across tool-node rounds. The
+tool node enters ``near_duplicate_scope`` for the section, and tools then take
+``scope_index()``, one index per section kept in a process-level registry, so
+a page or chunk the section was already shown is not shown again.
+``close_near_duplicate_scope`` drops the index when the section is done.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+_WORD = re.compile(r"\w+")
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingles(text: str, size: int = 5) -> set[str]:
+    """Word ``size``-grams of ``text``; a shorter text is one shingle."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def _band_layout(threshold: float, num_perm: int) -> tuple[int, int]:
+    """Bands and rows per band with the highest S-curve midpoint <= ``threshold``.
+
+    Erring low costs a few extra candidate checks; erring high misses duplicates.
+    """
+    layouts = {
+        (1 / bands) ** (bands / num_perm): (bands, num_perm // bands)
+        for bands in range(1, num_perm + 1)
+        if num_perm % bands == 0
+    }
+    below = [midpoint for midpoint in layouts if midpoint <= threshold]
+    return layouts[max(below) if below else min(layouts)]
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index; ``is_duplicate`` checks a text and remembers new ones.
+
+    Candidates that share a band are confirmed with the signature estimate of
+    Jaccard similarity, so the result does not depend on the banding alone.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError(f"threshold must be in (0, 1], got {threshold}")
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.bands, self.rows = _band_layout(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _MERSENNE_PRIME, num_perm, dtype=np.uint64)
+        self._buckets: list[defaultdict[bytes, list[int]]] = [
+            defaultdict(list) for _ in range(self.bands)
+        ]
+        self._signatures: list[np.ndarray] = []
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def signature(self, text: str) -> np.ndarray | None:
+        """MinHash signature of ``text``, or ``None`` if it has no words."""
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return None
+        hashes = np.fromiter(
+            (zlib.crc32(gram.encode()) for gram in grams),
+            dtype=np.uint64,
+            count=len(grams),
+        )
+        # Universal hashing (a*x + b) mod p; uint64 overflow is part of the scheme.
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return (permuted & _MAX_HASH).min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> list[bytes]:
+        return [
+            signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def find(self, signature: np.ndarray) -> int | None:
+        """Position of a stored near-duplicate of ``signature``, if any."""
+        seen: set[int] = set()
+        for bucket, key in zip(self._buckets, self._band_keys(signature), strict=True):
+            for candidate in bucket.get(key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                similarity = np.mean(self._signatures[candidate] == signature)
+                if similarity >= self.threshold:
+                    return candidate
+        return None
+
+    def add(self, signature: np.ndarray) -> int:
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        for bucket, key in zip(self._buckets, self._band_keys(signature), strict=True):
+            bucket[key].append(position)
+        return position
+
+    def is_duplicate(self, text: str) -> bool:
+        """True if ``text`` nearly duplicates a stored text; otherwise store it."""
+        signature = self.signature(text)
+        if signature is None:
+            return False
+        if self.find(signature) is not None:
+            return True
+        self.add(signature)
+        return False
+
+
+def drop_near_duplicates(
+    items: Iterable[T],
+    text_of: Callable[[T], str],
+    threshold: float | None,
+    index: NearDuplicateIndex | None = None,
+) -> list[T]:
+    """Keep the first of each group of near-duplicate items, in order.
+
+    ``threshold=None`` turns the filter off. Pass ``index`` to share what has been
+    seen across calls.
+    """
+    items = list(items)
+    if threshold is None:
+        return items
+    if index is None:
+        index = NearDuplicateIndex(threshold=threshold)
+    return [item for item in items if not index.is_duplicate(text_of(item))]
+
+
+_scope: ContextVar[str | None] = ContextVar("near_duplicate_scope", default=None)
+_scope_indexes: dict[str, NearDuplicateIndex] = {}
+
+
+@contextmanager
+def near_duplicate_scope(key: str) -> Iterator[None]:
+    """Make ``scope_index`` return the index kept under ``key``."""
+    token = _scope.set(key)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+
+def scope_index(threshold: float | None) -> NearDuplicateIndex | None:
+    """The current scope's index, created on first use; ``None`` outside a scope."""
+    key = _scope.get()
+    if key is None or threshold is None:
+        return None
+    index = _scope_indexes.get(key)
+    if index is None:
+        index = _scope_indexes[key] = NearDuplicateIndex(threshold=threshold)
+    return index
+
+
+def close_near_duplicate_scope(key: str) -> NearDuplicateIndex | None:
+    return _scope_indexes.pop(key, None)
@@ -1,43 +1,170 @@
-"""Shared scratchpad handler utilities for MedReportAI."""
+"""Shared scratchpad handler utilities for MedReportAI.
+
+The scratchpad is a list of note entries (``{"id": "N1", "text": ...}``) rather
+than one growing string. Handlers return *deltas*: the entries to append,
+optionally preceded by ``SCRATCHPAD_RESET`` to drop what came before. The
+``merge_scratchpad`` reducer applies them to graph state, ``append_scratchpad``
+applies them to the scratchpad file, and ``render_scratchpad`` joins the entries
+into text only for synthesis. Reads return the entries that best match the
+query (BM25, top-k, within a token budget) or, for ``query="all"``, a one-line
+summary per entry, so they do not replay the whole scratchpad into the prompt.
+"""
 
 from pathlib import Path
 
 from langchain_core.messages import ToolMessage
 
+from utils.bm25 import BM25
+from utils.tokens import CHARS_PER_TOKEN, estimate_tokens
+
+_RESET_ID = "reset"
+_READ_TOP_K = 5
+_READ_TOKEN_BUDGET = 2000
+_HEADING_CHARS = 120
+_ENTRY_JOINER = "\n\n"
+
+SCRATCHPAD_RESET: dict[str, str] = {"id": _RESET_ID, "text": ""}
+
+
+def new_entry(text: str) -> dict[str, str]:
+    """Delta entry for ``text``; ``merge_scratchpad`` assigns its id."""
+    return {"id": "", "text": text}
+
+
+def is_reset(entry: dict[str, str]) -> bool:
+    return entry.get("id") == _RESET_ID
+
+
+def merge_scratchpad(
+    current: list[dict[str, str]] | None, delta: list[dict[str, str]] | None
+) -> list[dict[str, str]]:
+    """Reducer: append ``delta``'s entries; a reset drops every entry before it."""
+    merged = list(current or [])
+    for entry in delta or []:
+        if is_reset(entry):
+            merged = []
+        else:
+            merged.append({"id": f"N{len(merged) + 1}", "text": entry["text"]})
+    return merged
+
+
+def render_scratchpad(entries: list[dict[str, str]] | None) -> str:
+    return _ENTRY_JOINER.join(entry["text"] for entry in entries or [])
 
-def save_scratchpad(content: str, filepath: str, base_dir: str) -> None:
-    """Persist scratchpad content to the specified directory."""
+
+def append_scratchpad(
+    delta: list[dict[str, str]], has_content: bool, filepath: str, base_dir: str
+) -> None:
+    """Append ``delta`` to the scratchpad file, truncating it first on a reset.
+
+    ``has_content`` says whether the scratchpad had entries before ``delta``; the
+    file then ends up equal to ``render_scratchpad`` of the merged entries.
+    """
+    mode = "a" if has_content else "w"
+    chunks: list[str] = []
+    for entry in delta:
+        if is_reset(entry):
+            mode, chunks, has_content = "w", [], False
+            continue
+        chunks.append(
+            f"{_ENTRY_JOINER}{entry['text']}" if has_content else entry["text"]
+        )
+        has_content = True
+    if mode == "a" and not chunks:
+        return
     base = Path(base_dir)
     base.mkdir(parents=True, exist_ok=True)
-    (base / filepath).write_text(content, encoding="utf-8")
+    with open(base / filepath, mode, encoding="utf-8") as handle:
+        handle.write("".join(chunks))
 
 
-def handle_write(args: dict, scratchpad: str, call_id: str):
+def handle_write(args: dict, call_id: str):
     notes = args.get("notes", "")
-    new_content = (
-        notes
-        if args.get("mode") == "replace"
-        else (f"{scratchpad}\n\n{notes}" if scratchpad else notes)
-    )
-    return new_content, ToolMessage(
+    delta = [SCRATCHPAD_RESET] if args.get("mode") == "replace" else []
+    if notes:
+        delta.append(new_entry(notes))
+    return delta, ToolMessage(
         content=f"Wrote to scratchpad: {notes}", tool_call_id=call_id
     )
 
 
-def handle_read(args: dict, scratchpad: str, call_id: str) -> ToolMessage:
-    content = scratchpad or "Scratchpad is empty."
-    query = args.get("query", "all")
-    label = f"(query: '{query}') " if query != "all" else ""
+def _entry_heading(text: str) -> str:
+    line = next((line.strip() for line in text.splitlines() if line.strip()), "")
+    if len(line) > _HEADING_CHARS:
+        line = line[: _HEADING_CHARS - 3] + "..."
+    return line
+
+
+def _coverage_summary(entries: list[dict[str, str]], token_budget: int) -> str:
+    """One line per entry (id, size, first line) instead of the full notes."""
+    sizes = [estimate_tokens(entry["text"]) for entry in entries]
+    header = (
+        f"{len(entries)} entries, ~{sum(sizes)} tokens. Pass a query to read "
+        "the matching entries in full."
+    )
+    lines = [header]
+    used = estimate_tokens(header)
+    for position, (entry, size) in enumerate(zip(entries, sizes, strict=True)):
+        line = f"- {entry.get('id') or f'N{position + 1}'} (~{size} tokens): "
+        line += _entry_heading(entry["text"])
+        used += estimate_tokens(line)
+        if used > token_budget:
+            lines.append(f"- ... and {len(entries) - position} more entries")
+            break
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _matching_entries(
+    entries: list[dict[str, str]], query: str, top_k: int, token_budget: int
+) -> str:
+    """The best BM25 matches for ``query``, in rank order, within the budget."""
+    ranked = BM25([entry["text"] for entry in entries]).top_k(query, top_k)
+    if not ranked:
+        return "No entries match this query. Use query='all' for a coverage summary."
+    blocks: list[str] = []
+    used = 0
+    for index, _score in ranked:
+        entry_id = entries[index].get("id") or f"N{index + 1}"
+        block = f"### {entry_id}\n{entries[index]['text']}"
+        size = estimate_tokens(block)
+        if used + size > token_budget:
+            if blocks:
+                break
+            block = block[: token_budget * CHARS_PER_TOKEN] + "\n[truncated]"
+            size = token_budget
+        blocks.append(block)
+        used += size
+    header = f"Showing {len(blocks)} of {len(ranked)} matching entries."
+    return "\n\n".join([header, *blocks])
+
+
+def handle_read(
+    args: dict,
+    entries: list[dict[str, str]],
+    call_id: str,
+    top_k: int = _READ_TOP_K,
+    token_budget: int = _READ_TOKEN_BUDGET,
+) -> ToolMessage:
+    """Answer a read with matching entries, or a coverage summary for "all"."""
+    query = args.get("query", "all").strip() or "all"
+    if not entries:
+        content = "Scratchpad is empty."
+    elif query.lower() == "all":
+        content = _coverage_summary(entries, token_budget)
+    else:
+        content = _matching_entries(entries, query, top_k, token_budget)
+    label = f"(query: '{query}') " if query != "all" else "(coverage summary) "
     return ToolMessage(
         content=f"Scratchpad contents {label}:\n\n{content}", tool_call_id=call_id
     )
 
 
-def handle_clear(args: dict, call_id: str, scratchpad: str = ""):
+def handle_clear(args: dict, call_id: str):
     if args.get("confirm", False):
-        return "", ToolMessage(
+        return [SCRATCHPAD_RESET], ToolMessage(
             content="Scratchpad cleared successfully.", tool_call_id=call_id
         )
-    return scratchpad, ToolMessage(
+    return [], ToolMessage(
         content="Scratchpad clear cancelled (confirm=False).", tool_call_id=call_id
     )
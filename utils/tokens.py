@@ -0,0 +1,111 @@
+"""Token counting helpers for prompt budgeting.
+
+``estimate_tokens`` is a cheap character heuristic for hot paths (request
+compaction). ``count_tokens`` and ``truncate_to_tokens`` use a real tokenizer,
+loaded once per process, where budgets decide how much evidence reaches the
+prompt. ``TOKENIZER_ENCODING`` (default ``cl100k_base``) picks the tiktoken
+encoding, read from the copy bundled with litellm when ``TIKTOKEN_CACHE_DIR`` is
+unset so no download is needed; when it cannot be loaded they fall back to the
+heuristic.
+"""
+
+import importlib.util
+import os
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from langchain_core.messages import BaseMessage
+from loguru import logger
+
+from utils.helpers import content_to_text
+
+CHARS_PER_TOKEN = 4
+# Generous chars-per-token bound: a prefix this long holds more tokens than any
+# cap it is sized for, so long pages need not be tokenized in full.
+MAX_CHARS_PER_TOKEN = 8
+_DEFAULT_ENCODING = "cl100k_base"
+# Sentence end (with closing quotes/brackets) or paragraph break.
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*(?=\s)|\n\s*\n")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the token count of ``text``."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def count_message_tokens(messages: list[BaseMessage]) -> int:
+    """Approximate the prompt tokens of a message list, including tool-call args."""
+    total = 0
+    for message in messages:
+        total += estimate_tokens(content_to_text(message.content))
+        for call in getattr(message, "tool_calls", None) or []:
+            total += estimate_tokens(str(call.get("args", {})))
+    return total
+
+
+def _bundled_encodings_dir() -> str | None:
+    """litellm (a DSPy dependency) ships tiktoken files; find them without importing it."""
+    spec = importlib.util.find_spec("litellm")
+    if spec is None or spec.origin is None:
+        return None
+    path = Path(spec.origin).parent / "litellm_core_utils" / "tokenizers"
+    return str(path) if path.is_dir() else None
+
+
+@lru_cache(maxsize=1)
+def get_tokenizer():
+    """Return the process-wide tiktoken encoding, or ``None`` to use estimates."""
+    name = os.environ.get("TOKENIZER_ENCODING", "").strip() or _DEFAULT_ENCODING
+    try:
+        if "TIKTOKEN_CACHE_DIR" not in os.environ and (
+            bundled := _bundled_encodings_dir()
+        ):
+            os.environ["TIKTOKEN_CACHE_DIR"] = bundled
+        import tiktoken
+
+        return tiktoken.get_encoding(name)
+    except Exception as exc:  # noqa: BLE001 - missing package or offline download
+        logger.warning(f"Tokenizer '{name}' unavailable, estimating tokens: {exc}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens of ``text`` with the local tokenizer, if available."""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, marker: str = " [...]") -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens, including ``marker``.
+
+    The cut is made at the last sentence end or paragraph break in the kept text
+    if that keeps at least half of it, otherwise at the last word boundary.
+    """
+    tokenizer = get_tokenizer()
+    budget = max(max_tokens - count_tokens(marker), 0)
+    if tokenizer is None:
+        if len(text) <= max_tokens * CHARS_PER_TOKEN:
+            return text
+        head = text[: budget * CHARS_PER_TOKEN]
+    else:
+        window = text[: (max_tokens + 1) * MAX_CHARS_PER_TOKEN]
+        ids = tokenizer.encode(window, disallowed_special=())
+        if len(ids) <= max_tokens and len(window) == len(text):
+            return text
+        head = tokenizer.decode(ids[:budget])
+
+    # One character past the cut shows whether a final "." really ends a sentence.
+    probe = text[: len(head) + 1] if text.startswith(head) else head
+    sentence_ends = [
+        match.end()
+        for match in _SENTENCE_END.finditer(probe)
+        if match.end() <= len(head)
+    ]
+    if sentence_ends and sentence_ends[-1] >= len(head) // 2:
+        head = head[: sentence_ends[-1]]
+    else:
+        head = (head.rsplit(maxsplit=1) or [""])[0]
+    return head.rstrip() + marker